@@ -13,13 +13,571 @@ Disclaimer: For internal use only, reuse or dissemination of elements of the
 from abc import ABC, abstractmethod
 from os import environ
 import requests
+import json
 import logging
 import xml.etree.ElementTree as ET
 import re
 import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from functools import wraps
+from Tracing import Tracer
 
 DEBUG = True
 
+class API_Call_Ledger():
+    """
+    Class accounting for the requests made to AQ and SIMs within a scope such as
+    one Submit or one section update. Every request made while a ledger's scope
+    is open is counted against it with its payload size and latency, grouped by
+    api_type. Scopes may be nested and every open scope sees the call.
+    
+    Args:
+        name(str): A label for the scope, e.g. "Submit"
+    """
+    _active = []
+    _lock = threading.Lock()
+    
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self.calls_by_api_type: dict[str, int] = {}
+        self.bytes_by_api_type: dict[str, int] = {}
+        self.seconds_by_api_type: dict[str, float] = {}
+    
+    @classmethod
+    @contextmanager
+    def scope(cls, name: str = ""):
+        """
+        Context manager opening a new ledger for the enclosed block.
+        
+        Args:
+            name(str): A label for the scope, e.g. "Submit"
+        
+        Returns:
+            API_Call_Ledger: The ledger counting the calls made inside the block
+        """
+        ledger = cls(name)
+        with cls._lock:
+            cls._active.append(ledger)
+        try:
+            yield ledger
+        finally:
+            with cls._lock:
+                cls._active.remove(ledger)
+    
+    @classmethod
+    @contextmanager
+    def expect_max_calls(cls, limit: int, api_type: str = None, name: str = ""):
+        """
+        Test helper asserting an upper bound on the number of requests made in
+        the enclosed block, e.g. that one site-year with 20 visits needs no
+        more than N AQ calls.
+        
+        Args:
+            limit(int): The maximum number of calls allowed
+            api_type(str): Only count calls of this type, all calls if None
+            name(str): A label for the scope used in the failure message
+        """
+        with cls.scope(name) as ledger:
+            yield ledger
+        ledger.assert_max_calls(limit, api_type)
+    
+    @classmethod
+    def has_active_scope(cls) -> bool:
+        return len(cls._active) > 0
+    
+    @classmethod
+    def record_call(cls, api_type: str, payload_bytes: int, seconds: float) -> None:
+        """
+        Count a completed request against every open ledger.
+        
+        Args:
+            api_type(str): The type of request made, ex: GetSiteInfo
+            payload_bytes(int): The size of the response payload
+            seconds(float): The time the request took
+        """
+        with cls._lock:
+            for ledger in cls._active:
+                ledger.calls_by_api_type[api_type] = ledger.calls_by_api_type.get(api_type, 0) + 1
+                ledger.bytes_by_api_type[api_type] = ledger.bytes_by_api_type.get(api_type, 0) + payload_bytes
+                ledger.seconds_by_api_type[api_type] = ledger.seconds_by_api_type.get(api_type, 0.0) + seconds
+    
+    def calls(self, api_type: str = None) -> int:
+        """
+        Return the number of calls made, for one api_type or in total.
+        """
+        if api_type is not None:
+            return self.calls_by_api_type.get(api_type, 0)
+        return sum(self.calls_by_api_type.values())
+    
+    def payload_bytes(self, api_type: str = None) -> int:
+        """
+        Return the number of payload bytes received, for one api_type or in total.
+        """
+        if api_type is not None:
+            return self.bytes_by_api_type.get(api_type, 0)
+        return sum(self.bytes_by_api_type.values())
+    
+    def seconds(self, api_type: str = None) -> float:
+        """
+        Return the time spent waiting on requests, for one api_type or in total.
+        """
+        if api_type is not None:
+            return self.seconds_by_api_type.get(api_type, 0.0)
+        return sum(self.seconds_by_api_type.values())
+    
+    def assert_max_calls(self, limit: int, api_type: str = None) -> None:
+        """
+        Raise an AssertionError listing the calls made if more than limit
+        calls were counted.
+        
+        Args:
+            limit(int): The maximum number of calls allowed
+            api_type(str): Only count calls of this type, all calls if None
+        """
+        made = self.calls(api_type)
+        if made > limit:
+            counted = api_type or "API"
+            raise AssertionError(f"{self.name or 'Scope'} made {made} {counted} calls, budget is {limit}\n{self.summary()}")
+    
+    def summary(self) -> str:
+        """
+        Return a per api_type table of calls, bytes and latency for the scope.
+        """
+        lines = [f"API calls for {self.name or 'scope'}: {self.calls()} calls, {self.payload_bytes()} bytes, {self.seconds():.2f} s"]
+        for api_type in sorted(self.calls_by_api_type, key=self.calls_by_api_type.get, reverse=True):
+            lines.append(f"    {api_type}: {self.calls_by_api_type[api_type]} calls, "
+                         f"{self.bytes_by_api_type[api_type]} bytes, {self.seconds_by_api_type[api_type]:.2f} s")
+        return "\n".join(lines)
+
+class _In_Flight_Call():
+    """
+    The shared result of one request that other identical requests are waiting on.
+    """
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class Single_Flight():
+    """
+    Class coalescing identical concurrent requests. The first caller for a key
+    performs the request while later callers for the same key block until it
+    finishes and then share its result (or exception). Nothing is cached once
+    the request completes, so a later call goes to the network again.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple, _In_Flight_Call] = {}
+    
+    def do(self, key: tuple, request):
+        """
+        Perform request() unless an identical one is already in flight.
+        
+        Args:
+            key(tuple): Hashable identity of the request
+            request(function): Zero argument function performing the request
+        
+        Returns:
+            The result of the request, shared between all coalesced callers
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _In_Flight_Call()
+                self._in_flight[key] = call
+        
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = request()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        
+        return call.result
+
+def _request_key(name: str, args, kwargs) -> tuple:
+    """
+    Build a hashable key identifying a request from its name and arguments.
+    Dictionaries of request parameters are keyed by their sorted items.
+    """
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(item) for item in value)
+        return value
+    
+    return (name, freeze(args), freeze(kwargs))
+
+def _coalesce_method(method_func, single_flight: Single_Flight):
+    """
+    Wrap a concrete session's getter so concurrent identical calls share one
+    network request and one parsed result.
+    """
+    @wraps(method_func)
+    def wrapper(cls, *args, **kwargs):
+        key = _request_key(f"{cls.__name__}.{method_func.__name__}", args, kwargs)
+        return single_flight.do(key, lambda: method_func(cls, *args, **kwargs))
+    return wrapper
+
+def _coalesce_get_request(request_func, single_flight: Single_Flight, rest_type_position: int):
+    """
+    Wrap a concrete session's raw request helper so identical concurrent GET
+    requests share one response. Other REST types are never coalesced.
+    """
+    @wraps(request_func)
+    def wrapper(cls, *args, **kwargs):
+        if rest_type_position is not None:
+            rest_type = kwargs.get("rest_type", args[rest_type_position] if len(args) > rest_type_position else None)
+            if rest_type != AquariusAPISession.GET:
+                return request_func(cls, *args, **kwargs)
+        key = _request_key(f"{cls.__name__}.{request_func.__name__}", args, kwargs)
+        return single_flight.do(key, lambda: request_func(cls, *args, **kwargs))
+    return wrapper
+
+def _wrap_subclass_methods(cls, request_name: str, api_type_position: int, rest_type_position, coalesced_methods, authenticate: bool = False) -> None:
+    """
+    Install the tracing/accounting, authentication and single-flight layers on
+    the methods a concrete session subclass defines itself.
+    """
+    single_flight = Single_Flight()
+    if request_name in cls.__dict__:
+        request_func = cls.__dict__[request_name].__func__
+        request_func = _instrument_request(request_func, api_type_position)
+        if authenticate:
+            request_func = _authenticate_request(request_func)
+        request_func = _retry_request(request_func, api_type_position, rest_type_position)
+        request_func = _coalesce_get_request(request_func, single_flight, rest_type_position)
+        setattr(cls, request_name, classmethod(request_func))
+    
+    for method_name in coalesced_methods:
+        if isinstance(cls.__dict__.get(method_name), classmethod):
+            method_func = cls.__dict__[method_name].__func__
+            setattr(cls, method_name, classmethod(_coalesce_method(method_func, single_flight)))
+
+class Token_Manager():
+    """
+    Class keeping a session class authenticated for the lifetime of the
+    application rather than around each request. The first request logs in,
+    the token is proactively refreshed once it is older than the token
+    lifetime, and a 401 from AQ triggers one transparent re-authentication.
+    
+    Args:
+        session_cls(AquariusAPISession): The concrete session class to manage
+    """
+    TOKEN_LIFETIME_SECONDS = 50 * 60 # AQ expires idle tokens after an hour
+    UNAUTHORIZED = 401
+    
+    def __init__(self, session_cls) -> None:
+        self.session_cls = session_cls
+        self.authenticated = False
+        self.last_status = None
+        self.authenticated_at = 0.0
+        self._logging_in = False
+        self._lock = threading.RLock()
+    
+    def ensure_authenticated(self):
+        """
+        Log in if there is no live token. Only one thread logs in at a time.
+        
+        Returns:
+            The login response, or the last one if the token is still fresh
+        """
+        with self._lock:
+            if self._logging_in: # login itself may go through the request helper
+                return self.last_status
+            token_expired = time.monotonic() - self.authenticated_at > Token_Manager.TOKEN_LIFETIME_SECONDS
+            if not self.authenticated or token_expired:
+                self._login()
+            return self.last_status
+    
+    def reauthenticate(self, stale_token_time: float = None):
+        """
+        Force a new login, e.g. after AQ answered 401. If another thread has
+        already re-authenticated since the stale token was issued, reuse it.
+        
+        Args:
+            stale_token_time(float): authenticated_at of the token that was rejected
+        """
+        with self._lock:
+            if stale_token_time is None or self.authenticated_at == stale_token_time:
+                self.authenticated = False
+                self._login()
+            return self.last_status
+    
+    def _login(self) -> None:
+        self._logging_in = True
+        try:
+            response = self.session_cls.login()
+        finally:
+            self._logging_in = False
+        self.last_status = response
+        self.authenticated = int(response) < 400
+        self.authenticated_at = time.monotonic()
+    
+    def close(self) -> None:
+        """
+        Log out if authenticated. Called once at application exit.
+        """
+        with self._lock:
+            if self.authenticated:
+                self.authenticated = False
+                self.session_cls.logout()
+
+    @staticmethod
+    def is_unauthorized(error: Exception) -> bool:
+        """
+        Helper method to check whether a raised exception is AQ rejecting the token.
+        """
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None) == Token_Manager.UNAUTHORIZED
+
+def _authenticate_request(request_func):
+    """
+    Wrap a concrete session's raw request helper so it logs in lazily once per
+    application lifetime and re-authenticates and retries once on a 401.
+    """
+    @wraps(request_func)
+    def wrapper(cls, *args, **kwargs):
+        token_manager = cls.token_manager()
+        token_manager.ensure_authenticated()
+        token_time = token_manager.authenticated_at
+        try:
+            return request_func(cls, *args, **kwargs)
+        except requests.HTTPError as e:
+            if not Token_Manager.is_unauthorized(e):
+                raise
+            token_manager.reauthenticate(token_time)
+            return request_func(cls, *args, **kwargs)
+    return wrapper
+
+class API_Request_Error(Exception):
+    """
+    Raised when a request to AQ or SIMs fails for good, naming the call that failed.
+    
+    Args:
+        api_type(str): The type of request that failed, ex: GetFieldVisitData
+        attempts(int): How many times the request was tried
+        cause(Exception): The last underlying error
+    """
+    def __init__(self, api_type: str, attempts: int, cause: Exception = None) -> None:
+        self.api_type = api_type
+        self.attempts = attempts
+        self.cause = cause
+        super().__init__(f"{api_type} failed after {attempts} attempt(s): {cause}")
+
+class API_Unavailable_Error(API_Request_Error):
+    """
+    Raised without touching the network while the circuit breaker is open
+    because the service has been failing repeatedly.
+    """
+    def __init__(self, api_type: str, retry_in: float) -> None:
+        self.api_type = api_type
+        self.attempts = 0
+        self.cause = None
+        self.retry_in = retry_in
+        Exception.__init__(self, f"{api_type} not sent, the service is failing repeatedly (next try allowed in {retry_in:.0f} s)")
+
+class Retry_Policy():
+    """
+    Class describing how idempotent GET requests are retried: exponential
+    backoff with full jitter, capped, honouring a server's Retry-After.
+    
+    Args:
+        max_attempts(int): Total tries including the first one
+        base_delay(float): Seconds to wait before the first retry
+        max_delay(float): Upper bound for any single wait
+        jitter(bool): Whether to randomize waits to avoid synchronized retries
+    """
+    RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 10.0, jitter: bool = True) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Helper method to decide whether an error is transient: connection resets,
+        timeouts, throttling and 5xx responses.
+        """
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(error, requests.HTTPError):
+            response = getattr(error, "response", None)
+            return getattr(response, "status_code", None) in Retry_Policy.RETRYABLE_STATUS_CODES
+        return False
+    
+    def delay_for(self, attempt: int, error: Exception = None) -> float:
+        """
+        Return how long to wait before the next attempt.
+        
+        Args:
+            attempt(int): The attempt that just failed, starting at 1
+            error(Exception): The error it failed with, checked for Retry-After
+        """
+        retry_after = Retry_Policy._retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        
+        delay = min(self.base_delay * (2 ** (attempt - 1)), self.max_delay)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+    
+    @staticmethod
+    def _retry_after_seconds(error: Exception):
+        """
+        Helper method to read a Retry-After header given in seconds or as an HTTP date.
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+class Circuit_Breaker():
+    """
+    Class failing requests fast while a service is down. After
+    failure_threshold consecutive failed requests the circuit opens and
+    requests raise API_Unavailable_Error immediately; once reset_timeout has
+    passed a single trial request is let through and its outcome closes or
+    re-opens the circuit.
+    
+    Args:
+        failure_threshold(int): Consecutive failures before opening
+        reset_timeout(float): Seconds to stay open before a trial request
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = Circuit_Breaker.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def before_request(self, api_type: str) -> None:
+        """
+        Raise API_Unavailable_Error if the circuit is open.
+        """
+        with self._lock:
+            if self.state == Circuit_Breaker.CLOSED:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if self.state == Circuit_Breaker.OPEN and remaining <= 0:
+                self.state = Circuit_Breaker.HALF_OPEN
+                return
+            raise API_Unavailable_Error(api_type, max(remaining, 0.0))
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = Circuit_Breaker.CLOSED
+            self.consecutive_failures = 0
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == Circuit_Breaker.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = Circuit_Breaker.OPEN
+                self.opened_at = time.monotonic()
+
+def _retry_request(request_func, api_type_position: int, rest_type_position):
+    """
+    Wrap a concrete session's raw request helper with the class' Retry_Policy
+    and Circuit_Breaker. Only GET requests are retried; every request passes
+    the breaker once and counts as one failure only if all its attempts failed
+    transiently. Failures surface as API_Request_Error naming the call.
+    """
+    @wraps(request_func)
+    def wrapper(cls, *args, **kwargs):
+        api_type = kwargs.get("api_type", args[api_type_position] if len(args) > api_type_position else "")
+        is_get = True
+        if rest_type_position is not None:
+            is_get = kwargs.get("rest_type", args[rest_type_position] if len(args) > rest_type_position else None) == AquariusAPISession.GET
+        
+        policy = cls.retry_policy
+        max_attempts = policy.max_attempts if is_get else 1
+        attempt = 0
+        cls.circuit_breaker.before_request(api_type)
+        # One outcome per request whatever happens, a half-open trial must close or re-open the circuit
+        service_failed = True
+        try:
+            while True:
+                attempt += 1
+                try:
+                    response = request_func(cls, *args, **kwargs)
+                except Exception as e:
+                    if not policy.is_retryable(e):
+                        # The service answered, only this request was bad (404, unparsable body, ...)
+                        service_failed = False
+                        raise API_Request_Error(api_type, attempt, e) from e
+                    if attempt >= max_attempts:
+                        raise API_Request_Error(api_type, attempt, e) from e
+                    time.sleep(policy.delay_for(attempt, e))
+                    continue
+                service_failed = False
+                return response
+        finally:
+            if service_failed:
+                cls.circuit_breaker.record_failure()
+            else:
+                cls.circuit_breaker.record_success()
+    return wrapper
+
+def _instrument_request(request_func, api_type_position: int):
+    """
+    Wrap a concrete session's raw request helper so every call to AQ/SIMs is
+    recorded as an "api" span and counted against any open API_Call_Ledger.
+    
+    Args:
+        request_func(function): The undecorated _make_*_request function
+        api_type_position(int): Position of the api_type argument after cls
+    """
+    @wraps(request_func)
+    def wrapper(cls, *args, **kwargs):
+        if not Tracer.enabled and not API_Call_Ledger.has_active_scope():
+            return request_func(cls, *args, **kwargs)
+        
+        api_type = kwargs.get("api_type", args[api_type_position] if len(args) > api_type_position else "")
+        payload_bytes = 0
+        start = time.perf_counter()
+        try:
+            with Tracer.span(f"{cls.__name__}.{api_type}", Tracer.API_CATEGORY, api_type=api_type) as span:
+                response = request_func(cls, *args, **kwargs)
+                if isinstance(response, (str, bytes)):
+                    payload_bytes = len(response)
+                    span.set(bytes=payload_bytes)
+                return response
+        finally:
+            API_Call_Ledger.record_call(api_type, payload_bytes, time.perf_counter() - start)
+    return wrapper
+
 class AquariusAPISession(ABC):
     """
     Abstract class representing an individual session of HTTP request interations
@@ -35,6 +593,80 @@ class AquariusAPISession(ABC):
     DELTETE = "delete"
     POST = "post"
     
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 16
+    _http_session = None
+    _http_session_lock = threading.Lock()
+    _token_manager = None
+    retry_policy = Retry_Policy()
+    
+    # Idempotent getters whose identical concurrent calls share one request
+    COALESCED_METHODS = ("get_site_info", "get_location_descriptions", "get_gage_height_timeseries_list", "get_timeseries_list",
+                         "get_timeseries_data", "get_timeseries_raw_data", "get_timeseries_changes_since", "get_gh_corrections_list",
+                         "get_field_visits", "get_field_visit_data", "get_sensors", "get_discharge_ratings_list",
+                         "get_discharge_rating_model_info", "get_discharge_rating_base_output_by_gh")
+    
+    def __init_subclass__(cls, **kwargs):
+        """
+        Instrument the concrete subclass' request helper so that every AQ call
+        is traced and accounted for, and coalesce identical in-flight requests,
+        without each endpoint method having to opt in.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._token_manager = Token_Manager(cls)
+        cls.circuit_breaker = Circuit_Breaker()
+        _wrap_subclass_methods(cls, "_make_aq_request", 1, 0, AquariusAPISession.COALESCED_METHODS, authenticate=True)
+    
+    @classmethod
+    def http_session(cls) -> requests.Session:
+        """
+        Return the application-wide pooled HTTP session. Requests to AQ should
+        be issued through it so TLS connections are kept alive and reused
+        between requests instead of being re-established on every click.
+        
+        Returns:
+            requests.Session: The shared keep-alive session
+        """
+        with AquariusAPISession._http_session_lock:
+            if AquariusAPISession._http_session is None:
+                http_session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=AquariusAPISession.POOL_CONNECTIONS,
+                                                        pool_maxsize=AquariusAPISession.POOL_MAXSIZE)
+                http_session.mount("https://", adapter)
+                http_session.mount("http://", adapter)
+                http_session.headers.update({"Connection": "keep-alive"})
+                AquariusAPISession._http_session = http_session
+            return AquariusAPISession._http_session
+    
+    @classmethod
+    def token_manager(cls) -> Token_Manager:
+        """
+        Return the Token_Manager keeping this session class logged in.
+        """
+        return cls._token_manager
+    
+    @classmethod
+    def ensure_session(cls):
+        """
+        Make sure the session is authenticated, logging in only if there is
+        no live token. Replaces the login/logout pair around each refresh.
+        
+        Returns:
+            The login response status (the cached one if already logged in)
+        """
+        return cls.token_manager().ensure_authenticated()
+    
+    @classmethod
+    def close(cls) -> None:
+        """
+        Log out and close the pooled connections. Called at application exit.
+        """
+        cls.token_manager().close()
+        with AquariusAPISession._http_session_lock:
+            if AquariusAPISession._http_session is not None:
+                AquariusAPISession._http_session.close()
+                AquariusAPISession._http_session = None
+    
     
     @classmethod
     @abstractmethod
@@ -98,6 +730,20 @@ class AquariusAPISession(ABC):
         """
         pass
     
+    @classmethod
+    def get_location_descriptions(cls) -> dict:
+        """
+        Method to retrieve the description (identifier, name and unique ID) of
+        every location in AQ, used to fill the local metadata index in bulk.
+        
+        Returns:
+            dict: The response with its list of LocationDescriptions
+        """
+        response = cls._make_aq_request(cls.GET, "GetLocationDescriptionList", {})
+        if isinstance(response, (str, bytes)):
+            response = json.loads(response)
+        return response
+    
     @classmethod
     @abstractmethod
     def get_gage_height_timeseries_list(cls, site_no: str):
@@ -113,6 +759,22 @@ class AquariusAPISession(ABC):
         """
         pass
      
+    @classmethod
+    @abstractmethod
+    def get_timeseries_list(cls, site_no: str, parameter: str):
+        """
+        Method to retrieve the list of published, instantaneous timeseries of a
+        parameter at a site.
+        
+        Args:
+            site_no(str): The 8- or 15-digit site number assigned associated with NWIS
+            parameter(str): The AQ parameter, e.g. "Gage height" or "Discharge"
+        
+        Returns:
+            [dict]: A list of timeseries descriptions (Identifier, UniqueId, SubLocationIdentifier, ...)
+        """
+        pass
+     
     @classmethod
     @abstractmethod
     def get_timeseries_data(cls, ts_unique_id: str, query_from, query_to) -> str:
@@ -129,6 +791,72 @@ class AquariusAPISession(ABC):
             str: A list of timeseries data formatted in JSON format
         """
         pass
+    
+    @classmethod
+    def stream_timeseries_data(cls, ts_unique_id: str, query_from, query_to, return_full_coverage: bool = False, include_gap_markers: bool = False):
+        """
+        Method to retrieve the same corrected timeseries data as get_timeseries_data
+        but as raw JSON text chunks for Timeseries_Stream_Decoder, so large
+        responses are never parsed into a tree of dictionaries. Sessions that
+        can stream the HTTP body should override this to yield it in pieces.
+        
+        Args:
+            ts_unique_id(str): The unique ID associated wtih a timeseries provided by AQ
+            query_from(datetime.date): The start date of data acquisition
+            query_to(datetime.date): The end date of data acquisition
+            return_full_coverage(bool): Include the first points before/after the window
+            include_gap_markers(bool): Include empty points marking gaps
+        
+        Returns:
+            iterable[str]: The JSON response text in one or more chunks
+        """
+        params = {"TimeSeriesUniqueId": ts_unique_id,
+                  "QueryFrom": query_from.isoformat(),
+                  "QueryTo": query_to.isoformat(),
+                  "ReturnFullCoverage": str(return_full_coverage).lower(),
+                  "IncludeGapMarkers": str(include_gap_markers).lower()}
+        yield cls._make_aq_request(cls.GET, "GetTimeSeriesCorrectedData", params)
+    
+    @classmethod
+    def get_timeseries_raw_data(cls, ts_unique_id: str, query_from, query_to) -> str:
+        """
+        Method to retrieve the raw (uncorrected) data of a timeseries for a
+        provided window of time, as recorded before any corrections.
+        
+        Args:
+            ts_unique_id(str): The unique ID associated wtih a timeseries provided by AQ
+            query_from(datetime.date): The start date of data acquisition
+            query_to(datetime.date): The end date of data acquisition
+        
+        Returns:
+            str: The raw timeseries points formatted in JSON format
+        """
+        params = {"TimeSeriesUniqueId": ts_unique_id,
+                  "QueryFrom": query_from.isoformat(),
+                  "QueryTo": query_to.isoformat()}
+        return cls._make_aq_request(cls.GET, "GetTimeSeriesRawData", params)
+    
+    @classmethod
+    def get_timeseries_changes_since(cls, location_identifier: str, changes_since_token: str) -> dict:
+        """
+        Method to ask AQ which of a location's timeseries changed since a
+        previous pull, using AQ's change tracking on GetTimeSeriesUniqueIdList.
+        Each changed timeseries entry carries its FirstPointChanged when points
+        (including corrected points) were altered.
+        
+        Args:
+            location_identifier(str): The AQ location identifier, e.g. the NWIS site number
+            changes_since_token(str): The ResponseTime or NextToken of the previous pull
+        
+        Returns:
+            dict: The response with TimeSeriesUniqueIds, NextToken and TokenExpired
+        """
+        params = {"LocationIdentifier": location_identifier,
+                  "ChangesSinceToken": changes_since_token}
+        response = cls._make_aq_request(cls.GET, "GetTimeSeriesUniqueIdList", params)
+        if isinstance(response, (str, bytes)):
+            response = json.loads(response)
+        return response
         
     @classmethod
     @abstractmethod
@@ -248,6 +976,22 @@ class SIMsAPISession(ABC):
     Abstract class/interface representing an individual session of HTTP request interations
     to both SIMs. I anticipate that this may be made Asynchronous later.
     """
+    retry_policy = Retry_Policy()
+    
+    # Idempotent getters whose identical concurrent calls share one request
+    COALESCED_METHODS = ("get_office_info_by_wsc", "get_sites_by_office", "get_elements_by_site",
+                         "get_sims_site_id", "get_sims_levels_info", "get_sims_rating_info")
+    
+    def __init_subclass__(cls, **kwargs):
+        """
+        Instrument the concrete subclass' request helper so that every SIMs call
+        is traced and accounted for, and coalesce identical in-flight requests,
+        without each endpoint method having to opt in.
+        """
+        super().__init_subclass__(**kwargs)
+        cls.circuit_breaker = Circuit_Breaker()
+        _wrap_subclass_methods(cls, "_make_sims_request", 0, None, SIMsAPISession.COALESCED_METHODS)
+    
     @classmethod
     @abstractmethod
     def configure_logging(cls):
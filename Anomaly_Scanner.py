@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+import numpy as np
+from Compressed_Values import Compressed_Values
+from Interval_Set import Interval_Set
+
+
+class Anomaly():
+    """
+    A candidate anomaly in a dataset's unit values, for the analyst to review.
+
+    Args:
+        kind(str): Anomaly_Scanner.SPIKE or Anomaly_Scanner.FLAT_LINE
+        start_datetime(datetime): Datetime of the first affected unit value
+        end_datetime(datetime): Datetime of the last affected unit value
+        points(int): Number of affected unit values
+        magnitude(float): Largest departure from the rolling median in feet for spikes, hours held for flat lines
+        severity(str): Low, Medium or High
+    """
+    def __init__(self, kind: str, start_datetime: datetime, end_datetime: datetime, points: int, magnitude: float, severity: str) -> None:
+        self.kind = kind
+        self.start_datetime = start_datetime
+        self.end_datetime = end_datetime
+        self.points = points
+        self.magnitude = magnitude
+        self.severity = severity
+        self.deleted = False
+        self.qualifiers: list[str] = []
+
+
+class Anomaly_Scanner():
+    """
+    Scans a gage height dataset's unit values for spikes and flat lines, the
+    candidates an analyst would otherwise look for by scrolling the hydrograph.
+
+        Spikes: unit values departing by at least SPIKE_MIN from the median of
+            the unit values within SPIKE_HALF_WINDOW points around them, which
+            catches up to SPIKE_HALF_WINDOW consecutive points while a step in
+            the record moves the median with it. Only points next to a jump
+            of at least SPIKE_MIN are checked. Consecutive spike points make
+            one anomaly.
+        Flat lines: runs of an unchanged value held for at least
+            FLAT_LINE_DURATION, read straight from the compressed runs and
+            split where they span a gap.
+
+    Gaps are skipped. Each anomaly is cross-referenced with the dataset's
+    deletions and qualifiers through Interval_Sets.
+
+    Args:
+        dataset(Dataset.Dataset): The gathered dataset, with its gaps, qualifiers and general corrections assessed
+    """
+    SPIKE = "Spike"
+    FLAT_LINE = "Flat Line"
+    SPIKE_HALF_WINDOW = 3
+    SPIKE_MIN = 0.25
+    # Departure in feet from which a spike is Medium and High
+    SPIKE_SEVERITIES = (0.5, 1.0)
+    FLAT_LINE_DURATION = timedelta(days=1)
+    # Duration from which a flat line is Medium and High
+    FLAT_LINE_SEVERITIES = (timedelta(days=3), timedelta(days=7))
+
+    def __init__(self, dataset) -> None:
+        self.dataset = dataset
+        self.anomalies: list[Anomaly] = []
+        if dataset.has_data():
+            self.anomalies = sorted(self._scan_spikes() + self._scan_flat_lines(), key=lambda anomaly: anomaly.start_datetime)
+            self._cross_reference()
+
+    @staticmethod
+    def _severity(magnitude, thresholds: tuple) -> str:
+        """
+        Helper method to grade a magnitude against the Medium and High thresholds.
+        """
+        if magnitude >= thresholds[1]:
+            return "High"
+        if magnitude >= thresholds[0]:
+            return "Medium"
+        return "Low"
+
+    def _scan_spikes(self) -> list:
+        """
+        Helper method to find the spikes over the unit values with the gaps left out.
+        """
+        values = self.dataset.values
+        present = ~np.isnan(values)
+        times = self.dataset.timestamps[present]
+        values = values[present]
+        half = Anomaly_Scanner.SPIKE_HALF_WINDOW
+        if len(values) < 2 * half + 1:
+            return []
+
+        jumps = np.abs(np.diff(values)) >= Anomaly_Scanner.SPIKE_MIN - 1e-9
+        candidates = np.flatnonzero(np.concatenate((jumps, [False])) | np.concatenate(([False], jumps)))
+        if len(candidates) == 0:
+            return []
+
+        # Rolling median centred on each candidate, an odd window so a step leaves its edges on their own side
+        offsets = np.arange(-half, half + 1)
+        padded = np.concatenate((np.full(half, np.nan), values, np.full(half, np.nan)))
+        medians = np.nanmedian(padded[candidates[:, None] + half + offsets], axis=1)
+        departures = np.abs(values[candidates] - medians)
+        is_spike = departures >= Anomaly_Scanner.SPIKE_MIN - 1e-9
+        spike_points = candidates[is_spike]
+        spike_departures = departures[is_spike]
+        if len(spike_points) == 0:
+            return []
+
+        # Consecutive spike points are one spike
+        first_of_spike = np.concatenate(([True], np.diff(spike_points) > 1))
+        spike_starts = np.flatnonzero(first_of_spike)
+        spike_ends = np.append(spike_starts[1:], len(spike_points)) - 1
+        largest_departures = np.maximum.reduceat(spike_departures, spike_starts)
+        spikes = []
+        for start, end, departure in zip(spike_starts.tolist(), spike_ends.tolist(), largest_departures.tolist()):
+            spikes.append(Anomaly(Anomaly_Scanner.SPIKE, times[spike_points[start]].astype(object), times[spike_points[end]].astype(object),
+                                  end - start + 1, round(departure, 2), Anomaly_Scanner._severity(departure, Anomaly_Scanner.SPIKE_SEVERITIES)))
+        return spikes
+
+    def _split_runs_at_gaps(self, run_values: np.ndarray, run_starts: np.ndarray, run_lengths: np.ndarray) -> tuple:
+        """
+        Helper method to split the runs of equal values where they span one of the
+        dataset's gaps, unit values being gathered without gap markers.
+        """
+        timestamps = self.dataset.timestamps
+        if len(self.dataset.gaps) == 0 or len(timestamps) < 2:
+            return run_values, run_starts, run_lengths
+        midpoints = timestamps[:-1] + (timestamps[1:] - timestamps[:-1]) // 2
+        after_gap = np.flatnonzero(Interval_Set.from_periods(self.dataset.gaps).locate(midpoints) >= 0) + 1
+        starts = np.union1d(run_starts, after_gap)
+        lengths = np.diff(np.append(starts, len(timestamps)))
+        values = run_values[np.searchsorted(run_starts, starts, side="right") - 1]
+        return values, starts, lengths
+
+    def _scan_flat_lines(self) -> list:
+        """
+        Helper method to find the flat lines from the runs of equal values, split at gaps.
+        """
+        run_values, run_starts, run_lengths = self._split_runs_at_gaps(*self.dataset.unit_values.runs())
+        run_ends = run_starts + run_lengths - 1
+        held = self.dataset.timestamps[run_ends] - self.dataset.timestamps[run_starts]
+        is_flat = (run_values != Compressed_Values.MISSING) & (held >= np.timedelta64(Anomaly_Scanner.FLAT_LINE_DURATION, "s"))
+
+        flat_lines = []
+        for start, end, length, duration in zip(run_starts[is_flat].tolist(), run_ends[is_flat].tolist(), run_lengths[is_flat].tolist(), held[is_flat].astype(object).tolist()):
+            flat_lines.append(Anomaly(Anomaly_Scanner.FLAT_LINE, self.dataset.timestamps[start].astype(object), self.dataset.timestamps[end].astype(object),
+                                      length, round(duration.total_seconds() / 3600, 1), Anomaly_Scanner._severity(duration, Anomaly_Scanner.FLAT_LINE_SEVERITIES)))
+        return flat_lines
+
+    @staticmethod
+    def _overlaps(periods: Interval_Set, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Helper method to tell which of the closed periods starts..ends touch the set,
+        single point periods included.
+        """
+        return (periods.covered_between(starts, ends) > np.timedelta64(0, "s")) | (periods.locate(starts) >= 0) | (periods.locate(ends) >= 0)
+
+    def _cross_reference(self) -> None:
+        """
+        Helper method to flag the anomalies falling in deletions and list the qualifiers they fall in.
+        """
+        if len(self.anomalies) == 0:
+            return
+        starts = np.array([anomaly.start_datetime for anomaly in self.anomalies], dtype="datetime64[s]")
+        ends = np.array([anomaly.end_datetime for anomaly in self.anomalies], dtype="datetime64[s]")
+
+        deletions = Interval_Set.from_periods(correction for correction in self.dataset.general_corrections if correction.correction_type == "DeleteRegion")
+        for anomaly, deleted in zip(self.anomalies, Anomaly_Scanner._overlaps(deletions, starts, ends).tolist()):
+            anomaly.deleted = deleted
+
+        for identifier in sorted({qualifier.identifier for qualifier in self.dataset.qualifiers}):
+            qualified = Interval_Set.from_periods(qualifier for qualifier in self.dataset.qualifiers if qualifier.identifier == identifier)
+            for anomaly, in_qualifier in zip(self.anomalies, Anomaly_Scanner._overlaps(qualified, starts, ends).tolist()):
+                if in_qualifier:
+                    anomaly.qualifiers.append(identifier)
+
+    def unaddressed(self) -> list:
+        """
+        The anomalies neither deleted nor qualified.
+        """
+        return [anomaly for anomaly in self.anomalies if not anomaly.deleted and len(anomaly.qualifiers) == 0]
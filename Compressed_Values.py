@@ -0,0 +1,197 @@
+import numpy as np
+
+
+class Compressed_Values():
+    """
+    Unit values stored as scaled integers (hundredths) with optional run-length
+    encoding. Values are rounded to 2 decimals when gathered, so hundredths hold
+    them exactly, and the long flat runs of low water collapse to a single run.
+    Extremes, counts, gaps and interpolation are answered from the runs without
+    expanding them back to one value per point.
+
+    Gaps (NaN) are stored as the MISSING sentinel and never take part in extremes.
+
+    Args:
+        run_values(np.ndarray): Scaled integer value of each run (or of each point when not run-length encoded)
+        run_starts(np.ndarray): Index of the first point of each run, None when not run-length encoded
+        length(int): Number of points represented
+    """
+    SCALE = 100
+    MISSING = np.iinfo(np.int32).min
+
+    def __init__(self, run_values: np.ndarray, run_starts: np.ndarray, length: int) -> None:
+        self.run_values = run_values
+        self.run_starts = run_starts
+        self.length = length
+
+    @staticmethod
+    def from_values(values: np.ndarray, run_length: bool = True):
+        """
+        Compress float unit values.
+
+        Args:
+            values(np.ndarray): float64 values, already rounded to hundredths, NaN for gaps
+            run_length(bool): Whether consecutive equal values are stored as a single run
+
+        Returns:
+            Compressed_Values: The compressed values
+        """
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        scaled = np.rint(np.where(missing, 0, values) * Compressed_Values.SCALE)
+        # int32 covers +-21 million in hundredths, larger discharges fall back to int64
+        dtype = np.int32 if len(scaled) == 0 or np.abs(scaled).max() < np.iinfo(np.int32).max else np.int64
+        scaled = scaled.astype(dtype)
+        scaled[missing] = Compressed_Values.MISSING
+
+        if not run_length:
+            return Compressed_Values(scaled, None, len(scaled))
+
+        run_starts = np.flatnonzero(np.diff(scaled)) + 1
+        run_starts = np.concatenate((np.zeros(min(len(scaled), 1), dtype=run_starts.dtype), run_starts))
+        return Compressed_Values(scaled[run_starts], run_starts.astype(np.int32), len(scaled))
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def is_run_length_encoded(self) -> bool:
+        return self.run_starts is not None
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory taken by the compressed arrays, for comparing against 8 bytes per float64 point.
+        """
+        return self.run_values.nbytes + (self.run_starts.nbytes if self.is_run_length_encoded else 0)
+
+    def run_lengths(self) -> np.ndarray:
+        """
+        Number of points in each run.
+        """
+        if not self.is_run_length_encoded:
+            return np.ones(self.length, dtype=np.int64)
+        return np.diff(np.append(self.run_starts, self.length))
+
+    def runs(self) -> tuple:
+        """
+        Runs of equal consecutive values, found on the fly when not run-length encoded.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray, np.ndarray): The scaled value, first point and number of points of each run
+        """
+        if self.is_run_length_encoded:
+            return self.run_values, self.run_starts.astype(np.int64), self.run_lengths()
+        run_starts = np.concatenate((np.zeros(min(self.length, 1), dtype=np.int64), np.flatnonzero(np.diff(self.run_values)) + 1))
+        return self.run_values[run_starts], run_starts, np.diff(np.append(run_starts, self.length))
+
+    def scaled(self) -> np.ndarray:
+        """
+        The scaled integer value of every point, MISSING for gaps.
+        """
+        if not self.is_run_length_encoded:
+            return self.run_values.copy()
+        return np.repeat(self.run_values, self.run_lengths())
+
+    def to_values(self) -> np.ndarray:
+        """
+        The float64 value of every point, NaN for gaps.
+        """
+        scaled = self.scaled()
+        values = scaled / Compressed_Values.SCALE
+        values[scaled == Compressed_Values.MISSING] = np.nan
+        return values
+
+    def _run_index(self, index: int) -> int:
+        """
+        Helper method to find the run holding a point.
+        """
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f"Point {index} is outside of {self.length} values")
+        if not self.is_run_length_encoded:
+            return index
+        return int(np.searchsorted(self.run_starts, index, side="right")) - 1
+
+    def scaled_at(self, index: int) -> int:
+        """
+        The scaled integer value of one point.
+        """
+        return int(self.run_values[self._run_index(index)])
+
+    def value_at(self, index: int) -> float:
+        """
+        The value of one point, NaN for a gap.
+        """
+        scaled = self.scaled_at(index)
+        return float("nan") if scaled == Compressed_Values.MISSING else scaled / Compressed_Values.SCALE
+
+    def _extreme_index(self, reducer) -> int:
+        """
+        Helper method to find the first point holding the extreme picked by reducer (np.max or np.min).
+        """
+        present = self.run_values != Compressed_Values.MISSING
+        if not present.any():
+            return None
+        extreme = reducer(self.run_values[present])
+        run = int(np.flatnonzero(self.run_values == extreme)[0])
+        return int(self.run_starts[run]) if self.is_run_length_encoded else run
+
+    def argmax(self) -> int:
+        """
+        Index of the first occurrence of the maximum, None when every point is a gap.
+        """
+        return self._extreme_index(np.max)
+
+    def argmin(self) -> int:
+        """
+        Index of the first occurrence of the minimum, None when every point is a gap.
+        """
+        return self._extreme_index(np.min)
+
+    def count_equal(self, index: int) -> int:
+        """
+        Number of points holding exactly the same value as the point at index.
+        """
+        return int(self.run_lengths()[self.run_values == self.scaled_at(index)].sum())
+
+    def is_unique(self, index: int) -> bool:
+        """
+        Whether no other point holds exactly the same value as the point at index.
+        """
+        return self.count_equal(index) == 1
+
+    def gap_indices(self) -> np.ndarray:
+        """
+        Indices of the points that are gaps (NaN).
+        """
+        missing_runs = np.flatnonzero(self.run_values == Compressed_Values.MISSING)
+        if not self.is_run_length_encoded:
+            return missing_runs
+        run_lengths = self.run_lengths()
+        if len(missing_runs) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(self.run_starts[run], self.run_starts[run] + run_lengths[run]) for run in missing_runs])
+
+    def interpolate_at(self, timestamps: np.ndarray, at: np.datetime64) -> float:
+        """
+        Linearly interpolated value at a time between two points.
+
+        Args:
+            timestamps(np.ndarray): datetime64 time of every point, sorted
+            at(np.datetime64): Time to interpolate at
+
+        Returns:
+            float: The interpolated value, None if there is no point on both sides or one of them is a gap
+        """
+        prior = int(np.searchsorted(timestamps, at, side="right")) - 1
+        if prior < 0 or prior + 1 >= self.length:
+            return None
+        prior_scaled = self.scaled_at(prior)
+        next_scaled = self.scaled_at(prior + 1)
+        if Compressed_Values.MISSING in (prior_scaled, next_scaled):
+            return None
+
+        fraction = (at - timestamps[prior]) / (timestamps[prior + 1] - timestamps[prior])
+        return (prior_scaled + fraction * (next_scaled - prior_scaled)) / Compressed_Values.SCALE
@@ -0,0 +1,157 @@
+from datetime import timedelta
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Correction_Check():
+    """
+    What re-applying one multi-point correction to the raw unit values gave,
+    compared with the corrected record.
+
+    Args:
+        correction(Dataset.Multi_Point_Correction): The correction
+        applied(np.ndarray): Offset applied to each raw unit value within the correction
+        mismatch_periods(Interval_Set): Periods where the corrected record departs from the re-applied correction
+        compared_points(int): Number of unit values compared
+        mismatch_points(int): Number of compared unit values departing by more than the tolerance
+        max_mismatch(float): Largest departure of the corrected record, None if nothing was compared
+    """
+    def __init__(self, correction, applied: np.ndarray, mismatch_periods: Interval_Set, compared_points: int, mismatch_points: int, max_mismatch: float) -> None:
+        self.correction = correction
+        self.points = len(applied)
+        self.min_applied = float(applied.min()) if len(applied) else None
+        self.max_applied = float(applied.max()) if len(applied) else None
+        self.mean_applied = float(applied.mean()) if len(applied) else None
+        self.mismatch_periods = mismatch_periods
+        self.compared_points = compared_points
+        self.mismatch_points = mismatch_points
+        self.max_mismatch = max_mismatch
+
+    @property
+    def matches(self) -> bool:
+        """
+        Whether every compared unit value agrees with the re-applied correction.
+        """
+        return self.mismatch_points == 0
+
+
+class Correction_Evaluator():
+    """
+    Re-applies a gage height dataset's multi-point corrections to its raw unit
+    values and checks the result against the corrected record.
+
+    Each correction's offset is interpolated by stage between its shift input
+    points (held constant past the first and last) and, when it has end shift
+    points, prorated linearly in time from the start to the end offsets. The
+    corrections are applied in processing order (Set 1, 2, 3), then by start,
+    each at the stage left by the ones before it, over [start, end) so touching
+    corrections do not both apply at the boundary.
+
+    Unit values missing from either series or falling within a general
+    correction (deletion, copy & paste, ...) are not compared, those change the
+    record on their own.
+
+    Args:
+        dataset(Dataset.Dataset): The gathered dataset, its raw unit values are pulled from AQ once
+    """
+    # Both series are in hundredths, a hundredth of rounding is not a mismatch
+    MISMATCH_TOLERANCE = 0.011
+    # Mismatching unit values this close together are reported as one period
+    MISMATCH_MERGE_TOLERANCE = timedelta(hours=1)
+
+    def __init__(self, dataset) -> None:
+        self.dataset = dataset
+        dataset._gather_raw_data()
+        self.times = dataset.raw_timestamps
+        self.raw_values = dataset.raw_values
+        self.corrected_values = Correction_Evaluator._values_at(dataset, self.times)
+        self.expected_values = self.raw_values.copy()
+        self.checks: list[Correction_Check] = []
+        self._evaluate()
+
+    @staticmethod
+    def _values_at(dataset, times: np.ndarray) -> np.ndarray:
+        """
+        Helper method to look up the corrected unit values at the raw times, NaN
+        where the corrected record has no unit value at that exact time.
+        """
+        values = np.full(len(times), np.nan)
+        if not dataset.has_data() or len(times) == 0:
+            return values
+        index = np.clip(np.searchsorted(dataset.timestamps, times), 0, len(dataset.timestamps) - 1)
+        same_time = dataset.timestamps[index] == times
+        values[same_time] = dataset.values[index[same_time]]
+        return values
+
+    @staticmethod
+    def _offsets_by_stage(shift_points: list, stages: np.ndarray) -> np.ndarray:
+        """
+        Helper method to interpolate a set of (stage, offset) shift input points at each stage.
+        """
+        if len(shift_points) == 0:
+            return np.zeros(len(stages))
+        shift_points = np.array(sorted(shift_points), dtype=np.float64)
+        return np.interp(stages, shift_points[:, 0], shift_points[:, 1])
+
+    @staticmethod
+    def offsets(correction, times: np.ndarray, stages: np.ndarray) -> np.ndarray:
+        """
+        The offset a multi-point correction applies at each time and stage.
+
+        Args:
+            correction(Dataset.Multi_Point_Correction): The correction
+            times(np.ndarray): datetime64[s] times within the correction
+            stages(np.ndarray): Stage at each time, before the correction
+
+        Returns:
+            np.ndarray: The offsets
+        """
+        start_offsets = Correction_Evaluator._offsets_by_stage(correction.start_shifts, stages)
+        if len(correction.end_shifts) == 0:
+            return start_offsets
+        end_offsets = Correction_Evaluator._offsets_by_stage(correction.end_shifts, stages)
+        start = np.datetime64(correction.start_datetime, "s")
+        span = max((np.datetime64(correction.end_datetime, "s") - start).astype(np.int64), 1)
+        fraction = np.clip((times - start).astype(np.int64) / span, 0.0, 1.0)
+        return start_offsets + fraction * (end_offsets - start_offsets)
+
+    def _window(self, correction) -> slice:
+        """
+        Helper method to slice the raw unit values within [start, end) of a correction.
+        """
+        first = np.searchsorted(self.times, np.datetime64(correction.start_datetime, "s"), side="left")
+        last = np.searchsorted(self.times, np.datetime64(correction.end_datetime, "s"), side="left")
+        return slice(int(first), int(last))
+
+    def _evaluate(self) -> None:
+        """
+        Helper method to apply the corrections in order and compare each one's window.
+        """
+        corrections = sorted(self.dataset.multipoint_corrections, key=lambda correction: (correction.processing_order, correction.start_datetime))
+        applied_by_correction = []
+        for correction in corrections:
+            window = self._window(correction)
+            offsets = Correction_Evaluator.offsets(correction, self.times[window], self.expected_values[window])
+            self.expected_values[window] = self.expected_values[window] + offsets
+            applied_by_correction.append((correction, window, offsets[~np.isnan(offsets)]))
+
+        general_corrections = Interval_Set.from_periods(self.dataset.general_corrections)
+        comparable = ~np.isnan(self.expected_values) & ~np.isnan(self.corrected_values) & (general_corrections.locate(self.times) < 0)
+        departures = np.abs(self.corrected_values - self.expected_values)
+        for correction, window, applied in applied_by_correction:
+            compared = comparable[window]
+            window_departures = departures[window]
+            mismatched = compared & (window_departures > Correction_Evaluator.MISMATCH_TOLERANCE)
+            max_mismatch = round(float(window_departures[compared].max()), 3) if compared.any() else None
+            mismatch_times = self.times[window][mismatched]
+            mismatch_periods = Interval_Set(mismatch_times, mismatch_times, Correction_Evaluator.MISMATCH_MERGE_TOLERANCE)
+            self.checks.append(Correction_Check(correction, applied, mismatch_periods, int(np.count_nonzero(compared)), int(np.count_nonzero(mismatched)), max_mismatch))
+
+    def mismatches(self) -> list:
+        """
+        The corrections whose window departs from the corrected record.
+
+        Returns:
+            list[Correction_Check]: The checks with mismatching unit values
+        """
+        return [check for check in self.checks if not check.matches]
@@ -0,0 +1,102 @@
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Correction_Impact():
+    """
+    How much a correction changed the record within its window, from the raw
+    and corrected unit values aligned on the union of their times. Unit values
+    within the dataset's other corrections are left out so their changes are
+    not attributed to this one, unless the other correction spans the whole
+    window and the changes cannot be told apart.
+
+    Args:
+        points_affected(int): Unit values changed, deleted or added (e.g. pasted)
+        max_change(float): Largest change by absolute value, signed, None if no unit value is in both series
+        mean_change(float): Mean absolute change
+        net_change(float): Mean signed change, rises and falls cancelling out
+    """
+    # Both series are in hundredths, smaller differences are rounding
+    CHANGE_TOLERANCE = 0.005
+
+    def __init__(self, points_affected: int, max_change: float = None, mean_change: float = None, net_change: float = None) -> None:
+        self.points_affected = points_affected
+        self.max_change = max_change
+        self.mean_change = mean_change
+        self.net_change = net_change
+
+    @staticmethod
+    def _window_values(timestamps: np.ndarray, values: np.ndarray, times: np.ndarray, first: int, last: int) -> np.ndarray:
+        """
+        Helper method to look up a series' values of its slice first:last at the
+        window's times, NaN where the series has no unit value at that time.
+        """
+        window_values = np.full(len(times), np.nan)
+        window_values[np.searchsorted(times, timestamps[first:last])] = values[first:last]
+        return window_values
+
+    @staticmethod
+    def _is_other_correction(correction, period) -> bool:
+        """
+        Helper method to tell whether a dataset correction is another one than the
+        period, neither the period itself, one merged into it, nor one spanning it.
+        """
+        within = period.start_datetime <= correction.start_datetime and correction.end_datetime <= period.end_datetime
+        same_kind = (type(correction) is type(period)
+                     and getattr(correction, "correction_type", None) == getattr(period, "correction_type", None)
+                     and getattr(correction, "processing_order", None) == getattr(period, "processing_order", None))
+        spans_period = correction.start_datetime <= period.start_datetime and period.end_datetime <= correction.end_datetime
+        return not (within and same_kind) and not spans_period
+
+    @staticmethod
+    def for_periods(dataset, periods: list) -> list:
+        """
+        The impact of the corrections within each period, pulling the raw unit
+        values once. Each period is sliced from both series by binary search and
+        the times within the dataset's other corrections are left out.
+
+        Args:
+            dataset(Dataset.Dataset): The gathered dataset
+            periods(list): Objects with start_datetime and end_datetime, such as Correction or Multi_Point_Correction
+
+        Returns:
+            list[Correction_Impact]: The impact within each period, inclusive of its start and end
+        """
+        dataset._gather_raw_data()
+        raw_timestamps = dataset.raw_timestamps
+        raw_values = dataset.raw_values
+        corrected_timestamps = dataset.timestamps if dataset.has_data() else np.array([], dtype="datetime64[s]")
+        corrected_values = dataset.values if dataset.has_data() else np.array([])
+        dataset_corrections = dataset.general_corrections + dataset.multipoint_corrections
+
+        impacts = []
+        for period in periods:
+            start = np.datetime64(period.start_datetime, "s")
+            end = np.datetime64(period.end_datetime, "s")
+            raw_first = np.searchsorted(raw_timestamps, start, side="left")
+            raw_last = np.searchsorted(raw_timestamps, end, side="right")
+            corrected_first = np.searchsorted(corrected_timestamps, start, side="left")
+            corrected_last = np.searchsorted(corrected_timestamps, end, side="right")
+
+            times = np.union1d(raw_timestamps[raw_first:raw_last], corrected_timestamps[corrected_first:corrected_last])
+            raw = Correction_Impact._window_values(raw_timestamps, raw_values, times, raw_first, raw_last)
+            corrected = Correction_Impact._window_values(corrected_timestamps, corrected_values, times, corrected_first, corrected_last)
+            other_corrections = Interval_Set.from_periods(correction for correction in dataset_corrections if Correction_Impact._is_other_correction(correction, period))
+            outside_others = other_corrections.locate(times) < 0
+            raw = raw[outside_others]
+            corrected = corrected[outside_others]
+
+            raw_present = ~np.isnan(raw)
+            corrected_present = ~np.isnan(corrected)
+            both = raw_present & corrected_present
+            changes = corrected[both] - raw[both]
+            changed = np.abs(changes) > Correction_Impact.CHANGE_TOLERANCE
+            points_affected = int(np.count_nonzero(changed) + np.count_nonzero(raw_present != corrected_present))
+            if len(changes) == 0:
+                impacts.append(Correction_Impact(points_affected))
+                continue
+            impacts.append(Correction_Impact(points_affected,
+                                             round(float(changes[np.argmax(np.abs(changes))]), 2),
+                                             round(float(np.mean(np.abs(changes))), 3),
+                                             round(float(np.mean(changes)), 3)))
+        return impacts
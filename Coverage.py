@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Coverage():
+    """
+    Durations and percentages of a dataset's period falling in each coverage
+    category, for the whole period and for each month of it. Categories are
+    built as Interval_Sets, so overlapping qualifiers or corrections are only
+    counted once and the cost depends on the number of periods, not of unit
+    values.
+
+        Data: first to last unit value, minus the gaps
+        Gap: the rest of the period, including before the first and after the last unit value
+        Estimated: ESTIMATED qualifiers (and copy & paste corrections, for discharge)
+        Ice: ICE qualifiers
+        Deleted: DeleteRegion corrections
+
+    Args:
+        period_start(datetime): Start of the period
+        period_end(datetime): End of the period
+        category_periods(dict[str: Interval_Set]): The periods of each category, within the period
+    """
+    DATA = "Data"
+    GAP = "Gap"
+    ESTIMATED = "Estimated"
+    ICE = "Ice"
+    DELETED = "Deleted"
+    CATEGORIES = (DATA, GAP, ESTIMATED, ICE, DELETED)
+    # Share of a period gapped, estimated, ice affected or deleted for the suggested quality ratings
+    GOOD_MAX_AFFECTED_PERCENT = 5.0
+    FAIR_MAX_AFFECTED_PERCENT = 15.0
+
+    def __init__(self, period_start: datetime, period_end: datetime, category_periods: dict) -> None:
+        self.period_start = period_start
+        self.period_end = period_end
+        self.category_periods = category_periods
+
+    @staticmethod
+    def from_dataset(dataset, copy_paste_is_estimate: bool = False):
+        """
+        Compute the coverage of a gathered dataset.
+
+        Args:
+            dataset(Dataset.Dataset): The dataset, with its gaps, qualifiers and general corrections assessed
+            copy_paste_is_estimate(bool): Whether copy & paste corrections count as estimates, as they do for discharge
+
+        Returns:
+            Coverage: The dataset's coverage
+        """
+        period = Interval_Set([dataset.dataset_start_date], [dataset.dataset_end_date])
+        gaps = Interval_Set.from_periods(dataset.gaps)
+        if dataset.has_data():
+            data = Interval_Set(dataset.timestamps[0:1], dataset.timestamps[-1:]).difference(gaps).intersection(period)
+        else:
+            data = Interval_Set()
+
+        estimated_periods = [qualifier for qualifier in dataset.qualifiers if qualifier.identifier == "ESTIMATED"]
+        if copy_paste_is_estimate:
+            estimated_periods += [correction for correction in dataset.general_corrections if correction.correction_type == "CopyPaste"]
+
+        category_periods = {Coverage.DATA: data,
+                            Coverage.GAP: period.difference(data),
+                            Coverage.ESTIMATED: Interval_Set.from_periods(estimated_periods).intersection(period),
+                            Coverage.ICE: Interval_Set.from_periods(qualifier for qualifier in dataset.qualifiers if qualifier.identifier == "ICE").intersection(period),
+                            Coverage.DELETED: Interval_Set.from_periods(correction for correction in dataset.general_corrections if correction.correction_type == "DeleteRegion").intersection(period)}
+        return Coverage(dataset.dataset_start_date, dataset.dataset_end_date, category_periods)
+
+    @property
+    def period_duration(self) -> timedelta:
+        return self.period_end - self.period_start
+
+    def duration(self, category: str) -> timedelta:
+        """
+        Time of the period in a category.
+        """
+        return self.category_periods[category].total_duration()
+
+    def percent(self, category: str) -> float:
+        """
+        Share of the period in a category, in percent.
+        """
+        if self.period_duration.total_seconds() <= 0:
+            return 0.0
+        return 100.0 * self.duration(category).total_seconds() / self.period_duration.total_seconds()
+
+    def affected_periods(self) -> Interval_Set:
+        """
+        Periods gapped, estimated, ice affected or deleted, each moment counted once.
+        """
+        affected = Interval_Set()
+        for category in (Coverage.GAP, Coverage.ESTIMATED, Coverage.ICE, Coverage.DELETED):
+            affected = affected.union(self.category_periods[category])
+        return affected
+
+    def month_bounds(self) -> tuple:
+        """
+        Start and end of each calendar month of the period, clipped to the period.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): datetime64[s] starts and ends
+        """
+        period_start = np.datetime64(self.period_start, "s")
+        period_end = np.datetime64(self.period_end, "s")
+        months = np.arange(period_start.astype("datetime64[M]"), period_end.astype("datetime64[M]") + 2)
+        month_edges = months.astype("datetime64[s]")
+        month_starts = np.maximum(month_edges[:-1], period_start)
+        month_ends = np.minimum(month_edges[1:], period_end)
+        in_period = month_ends > month_starts
+        return month_starts[in_period], month_ends[in_period]
+
+    def monthly_percentages(self) -> tuple:
+        """
+        Share of each month of the period in each category, in percent of the
+        part of the month inside the period.
+
+        Returns:
+            tuple(np.ndarray, dict[str: np.ndarray]): The month starts and the percentages of each category by month
+        """
+        month_starts, month_ends = self.month_bounds()
+        month_seconds = np.maximum((month_ends - month_starts).astype(np.int64), 1)
+        percentages = {}
+        for category, periods in self.category_periods.items():
+            percentages[category] = 100.0 * periods.covered_between(month_starts, month_ends).astype(np.int64) / month_seconds
+        return month_starts, percentages
+
+    @staticmethod
+    def suggested_quality(affected_percent: float) -> str:
+        """
+        Quality rating suggested for a period from the share of it affected.
+        """
+        if affected_percent <= Coverage.GOOD_MAX_AFFECTED_PERCENT:
+            return "Good"
+        if affected_percent <= Coverage.FAIR_MAX_AFFECTED_PERCENT:
+            return "Fair"
+        return "Poor"
+
+    def suggested_quality_periods(self) -> list:
+        """
+        Quality table rows suggested by month, consecutive months of the same
+        rating merged into one row.
+
+        Returns:
+            list[tuple(date, date, str, str)]: Period start, period end, quality and a comment summarizing the coverage
+        """
+        month_starts, month_ends = self.month_bounds()
+        month_seconds = np.maximum((month_ends - month_starts).astype(np.int64), 1)
+        affected_percent = 100.0 * self.affected_periods().covered_between(month_starts, month_ends).astype(np.int64) / month_seconds
+        qualities = [Coverage.suggested_quality(percent) for percent in affected_percent]
+
+        quality_periods = []
+        first_month = 0
+        for month in range(1, len(qualities) + 1):
+            if month == len(qualities) or qualities[month] != qualities[first_month]:
+                window = Coverage(month_starts[first_month].astype(object), month_ends[month - 1].astype(object),
+                                  {category: periods.intersection(Interval_Set(month_starts[first_month:first_month + 1], month_ends[month - 1:month]))
+                                   for category, periods in self.category_periods.items()})
+                quality_periods.append((month_starts[first_month].astype(object).date(),
+                                        (month_ends[month - 1] - np.timedelta64(1, "s")).astype(object).date(),
+                                        qualities[first_month],
+                                        window.summary_comment()))
+                first_month = month
+        return quality_periods
+
+    def summary_comment(self) -> str:
+        """
+        Short comment listing the categories affecting the period, e.g. "Gap 2.1%, Ice 10.0%".
+        """
+        affecting = [f"{category} {self.percent(category):.1f}%" for category in (Coverage.GAP, Coverage.ESTIMATED, Coverage.ICE, Coverage.DELETED)
+                     if self.percent(category) >= 0.05]
+        return ", ".join(affecting)
@@ -0,0 +1,165 @@
+from datetime import date
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Daily_Values():
+    """
+    Daily statistics of a dataset's unit values, as compact arrays with one
+    entry per calendar day of the dataset's period:
+
+        days: datetime64[D] day
+        water_years: water year of the day
+        mean: time-weighted mean, the unit values linearly interpolated and
+            integrated over the part of the day they cover
+        min, max: smallest and largest unit value of the day
+        completeness: percent of the day covered by unit values
+
+    Intervals between two unit values spanning a gap are not integrated. Days
+    without any unit value hold NaN.
+
+    Args:
+        days(np.ndarray): datetime64[D] day of each entry
+        water_years(np.ndarray): Water year of each day
+        mean(np.ndarray): Time-weighted daily mean
+        min(np.ndarray): Daily minimum unit value
+        max(np.ndarray): Daily maximum unit value
+        completeness(np.ndarray): Percent of each day covered
+    """
+    SECONDS_PER_DAY = 86400
+
+    def __init__(self, days: np.ndarray, water_years: np.ndarray, mean: np.ndarray, min: np.ndarray, max: np.ndarray, completeness: np.ndarray) -> None:
+        self.days = days
+        self.water_years = water_years
+        self.mean = mean
+        self.min = min
+        self.max = max
+        self.completeness = completeness
+
+    @staticmethod
+    def from_dataset(dataset):
+        """
+        Aggregate a gathered dataset's unit values by day in one grouped pass.
+
+        Args:
+            dataset(Dataset.Dataset): The dataset, with its unit values and gaps gathered
+
+        Returns:
+            Daily_Values: The daily values over the dataset's period
+        """
+        days = np.arange(np.datetime64(dataset.dataset_start_date, "D"), np.datetime64(dataset.dataset_end_date, "D") + 1)
+        mean = np.full(len(days), np.nan)
+        daily_min = np.full(len(days), np.nan)
+        daily_max = np.full(len(days), np.nan)
+        completeness = np.zeros(len(days))
+        water_years = Daily_Values._water_years(days)
+        if not dataset.has_data():
+            return Daily_Values(days, water_years, mean, daily_min, daily_max, completeness)
+
+        times = (dataset.timestamps - dataset.timestamps[0]).astype(np.int64).astype(np.float64)
+        values = dataset.values
+        present = ~np.isnan(values)
+        filled_values = np.where(present, values, 0.0)
+
+        # Interval following each unit value, left out when it spans a gap; the last one is empty
+        interval_seconds = np.append(np.diff(times), 0.0)
+        interval_midpoints = dataset.timestamps + (np.append(np.diff(dataset.timestamps), 0) // 2)
+        bridged = ((Interval_Set.from_periods(dataset.gaps).locate(interval_midpoints) < 0)
+                   & present & np.append(present[1:], False) & (interval_seconds > 0))
+        slopes = np.where(bridged, np.append(np.diff(filled_values), 0.0) / np.where(bridged, interval_seconds, 1.0), 0.0)
+        interval_integrals = np.where(bridged, interval_seconds * (filled_values + 0.5 * slopes * interval_seconds), 0.0)
+
+        # Cumulative integral and covered time up to each midnight; days are their differences
+        midnights = np.concatenate((days, days[-1:] + 1)).astype("datetime64[s]")
+        midnight_times = (midnights - dataset.timestamps[0]).astype(np.int64).astype(np.float64)
+        index = np.clip(np.searchsorted(times, midnight_times, side="right") - 1, 0, len(times) - 1)
+        within = np.clip(midnight_times - times[index], 0.0, interval_seconds[index])
+        partial_integral = np.where(bridged[index], within * (filled_values[index] + 0.5 * slopes[index] * within), 0.0)
+        after_first = midnight_times >= times[0]
+        integral_at = np.where(after_first, np.concatenate(([0.0], np.cumsum(interval_integrals)))[index] + partial_integral, 0.0)
+        covered_at = np.where(after_first, np.concatenate(([0.0], np.cumsum(np.where(bridged, interval_seconds, 0.0))))[index] + np.where(bridged[index], within, 0.0), 0.0)
+
+        day_integrals = np.diff(integral_at)
+        day_covered = np.diff(covered_at)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(day_covered > 0, day_integrals / day_covered, np.nan)
+        completeness = 100.0 * day_covered / Daily_Values.SECONDS_PER_DAY
+
+        # Unit values are sorted, so each day's points are contiguous for reduceat
+        point_days = dataset.timestamps[present].astype("datetime64[D]")
+        present_values = values[present]
+        if len(present_values) > 0:
+            day_of_first_point, first_point = np.unique(point_days, return_index=True)
+            day_index = (day_of_first_point - days[0]).astype(np.int64)
+            in_period = (day_index >= 0) & (day_index < len(days))
+            daily_min[day_index[in_period]] = np.minimum.reduceat(present_values, first_point)[in_period]
+            daily_max[day_index[in_period]] = np.maximum.reduceat(present_values, first_point)[in_period]
+
+        return Daily_Values(days, water_years, np.round(mean, 2), daily_min, daily_max, completeness)
+
+    @staticmethod
+    def _water_years(days: np.ndarray) -> np.ndarray:
+        """
+        Helper method to find the water year of each day, using the timeseries'
+        water year rule once per calendar month.
+        """
+        # Imported here, Timeseries imports Dataset which builds daily values
+        from Timeseries import Generic_Timeseries
+
+        months, month_of_day = np.unique(days.astype("datetime64[M]"), return_inverse=True)
+        month_water_years = np.array([Generic_Timeseries._determine_water_year_by_date(month.astype(object)) for month in months.astype("datetime64[D]")], dtype=np.int16)
+        return month_water_years[month_of_day] if len(days) > 0 else np.empty(0, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def water_year(self, water_year: int):
+        """
+        The daily values falling in one water year.
+
+        Args:
+            water_year(int): The water year
+
+        Returns:
+            Daily_Values: The days of that water year
+        """
+        in_year = self.water_years == int(water_year)
+        return Daily_Values(self.days[in_year], self.water_years[in_year], self.mean[in_year], self.min[in_year], self.max[in_year], self.completeness[in_year])
+
+    def complete_days(self, min_completeness: float = 100.0):
+        """
+        Mask of the days whose unit values cover at least min_completeness percent.
+        """
+        return self.completeness >= min_completeness - 1e-9
+
+    def max_mean_day(self) -> tuple:
+        """
+        Day of the highest daily mean, the first one if it occurs more than once.
+
+        Returns:
+            tuple(date, float): The day and its mean, (None, None) if no day has a mean
+        """
+        if np.all(np.isnan(self.mean)):
+            return None, None
+        index = int(np.nanargmax(self.mean))
+        return self.days[index].astype(date), float(self.mean[index])
+
+    def min_mean_day(self) -> tuple:
+        """
+        Day of the lowest daily mean, the first one if it occurs more than once.
+
+        Returns:
+            tuple(date, float): The day and its mean, (None, None) if no day has a mean
+        """
+        if np.all(np.isnan(self.mean)):
+            return None, None
+        index = int(np.nanargmin(self.mean))
+        return self.days[index].astype(date), float(self.mean[index])
+
+    def rows(self) -> list:
+        """
+        The daily values as [day, water year, mean, min, max, completeness] rows for exports.
+        """
+        return [[day.isoformat(), int(water_year), mean, day_min, day_max, round(completeness, 1)]
+                for day, water_year, mean, day_min, day_max, completeness
+                in zip(self.days.astype(date), self.water_years.tolist(), self.mean.tolist(), self.min.tolist(), self.max.tolist(), self.completeness.tolist())]
@@ -1,5 +1,12 @@
 from API_Session_V3 import SynchronousAquariusAPISession
-from datetime import datetime
+from Compressed_Values import Compressed_Values
+from Daily_Values import Daily_Values
+from Range_Extremes import Range_Extremes
+from datetime import datetime, timedelta
+from os import environ
+import numpy as np
+from Timeseries_Stream import Timeseries_Stream_Decoder
+from Tracing import traced
 
 
 class Dataset():
@@ -17,13 +24,29 @@ class Dataset():
     """
     
     EMPTY ="EMPTY"
+    # Raw AQ payloads are discarded once decoded unless debugging
+    KEEP_RAW_RESPONSES = environ.get("ARS_DEBUG") == "1"
+    # AQ reports FirstPointChanged with its own UTC offset, refreshes re-pull this much earlier to be safe
+    CHANGE_MARGIN = timedelta(days=1)
+    # Flat runs of unit values are stored once, set ARS_RLE=0 to keep one scaled value per point
+    RUN_LENGTH_ENCODE = environ.get("ARS_RLE", "1") != "0"
     
     def __init__(self, ts_unique_id : str, dataset_start_date: datetime.date, dataset_end_date: datetime.date, api_session: SynchronousAquariusAPISession = None) -> None:
         """
         Initialize the dataset object with default null and empty values
         """
         
-        self.data: list[Data_Point] = []
+        # Unit values as typed arrays, datetime64[s] times and values as Compressed_Values hundredths
+        self.timestamps = None
+        self.unit_values: Compressed_Values = None
+        self._values: np.ndarray = None
+        self._range_extremes: Range_Extremes = None
+        self._daily_values: Daily_Values = None
+        self._data: list[Data_Point] = None
+        # Uncorrected unit values, only pulled from AQ when corrections are checked
+        self.raw_timestamps = None
+        self.raw_unit_values: Compressed_Values = None
+        self._raw_values: np.ndarray = None
         self.max_point = None
         self.min_point = None
         self.general_corrections: list[Correction] = []
@@ -32,16 +55,21 @@ class Dataset():
         self.gap_tolerances: list[Gap_Tolerance] = []
         self.gaps: list[Gap] = []
         
+        # Raw payloads, only kept when KEEP_RAW_RESPONSES is on
         self.ts_data_response = None
         # Full coverage entails having first values before start datetime and after end datetime with gap markers
         self.ts_data_response_full_coverage = None
+        self._full_coverage = None
         self.dataset_corrections_response = None
+        # AQ's ResponseTime of the last data pull, usable as a ChangesSinceToken
+        self.change_token = None
         
         self.ts_unique_id = ts_unique_id
         self.dataset_start_date = dataset_start_date
         self.dataset_end_date = dataset_end_date
         self.api_session = api_session or SynchronousAquariusAPISession()
     
+    @traced()
     def gather_data_for_records(self) -> None:
         """
         Conveniency method to populate the dataset object with all information pertinent to
@@ -55,26 +83,204 @@ class Dataset():
         self._assess_max()
         self._assess_min()
     
+    def __getstate__(self):
+        # The linked Data_Point list is rebuilt on demand, pickling its chain would only recurse
+        state = self.__dict__.copy()
+        state["_data"] = None
+        state["_values"] = None
+        state["_raw_values"] = None
+        state["_range_extremes"] = None
+        state["_daily_values"] = None
+        state["_full_coverage"] = None
+        return state
     
-    def _gather_data(self) -> None:
+    def __setstate__(self, state):
+        state.setdefault("_values", None)
+        state.setdefault("_raw_values", None)
+        state.setdefault("_range_extremes", None)
+        state.setdefault("_daily_values", None)
+        state.setdefault("raw_timestamps", None)
+        state.setdefault("raw_unit_values", None)
+        self.__dict__.update(state)
+    
+    @property
+    def values(self) -> np.ndarray:
+        """
+        The unit values as float64, expanded from the compressed hundredths on
+        first use and kept until the values change. NaN marks a gap. The array
+        is shared and read-only, assign a new one to change the values.
+        """
+        if self._values is None and self.unit_values is not None:
+            self._values = self.unit_values.to_values()
+            self._values.flags.writeable = False
+        return self._values
+    
+    @values.setter
+    def values(self, values: np.ndarray) -> None:
+        self.unit_values = None if values is None else Compressed_Values.from_values(values, Dataset.RUN_LENGTH_ENCODE)
+        self._values = None
+        self._range_extremes = None
+        self._daily_values = None
+        self.raw_timestamps = None
+        self.raw_unit_values = None
+        self._raw_values = None
+    
+    @property
+    def raw_values(self) -> np.ndarray:
+        """
+        The uncorrected unit values as float64, NaN marking a gap. None until
+        _gather_raw_data is called, then expanded once and kept as values is.
+        """
+        if self._raw_values is None and self.raw_unit_values is not None:
+            self._raw_values = self.raw_unit_values.to_values()
+            self._raw_values.flags.writeable = False
+        return self._raw_values
+    
+    @property
+    def daily_values(self) -> Daily_Values:
+        """
+        Time-weighted daily mean, min, max and completeness of the unit values,
+        aggregated on first use and kept until the values change.
         """
-        Method to gather timeseries unit value data from AQ (if not already done),
-        convert to a data_point object with datetime and value, and finally append
-        to a list of data_point objects.
+        if self._daily_values is None and self.unit_values is not None:
+            self._daily_values = Daily_Values.from_dataset(self)
+        return self._daily_values
+    
+    @property
+    def range_extremes(self) -> Range_Extremes:
+        """
+        Block sparse tables answering window max/min queries, built from the
+        unit values on first use and kept until the values change.
+        """
+        if self._range_extremes is None and self.unit_values is not None:
+            self._range_extremes = Range_Extremes(self.unit_values.scaled())
+        return self._range_extremes
+    
+    @property
+    def data(self) -> list:
+        """
+        The unit values as a list of Data_Point objects linked to their successor.
+        Built from the typed arrays on first use only; pipeline steps work on
+        timestamps/values directly.
+        """
+        if self._data is None:
+            self._data = []
+            if self.timestamps is not None:
+                previous_point = None
+                for pt_time, value in zip(self.timestamps.astype(object), self.values.tolist()):
+                    point = Data_Point(pt_time, value, None)
+                    if previous_point is not None:
+                        previous_point.next = point
+                    self._data.append(point)
+                    previous_point = point
+        return self._data
+    
+    def has_data(self) -> bool:
+        """
+        Helper method to check whether any unit values were retrieved for the dataset.
+        """
+        return self.timestamps is not None and len(self.timestamps) > 0
+    
+    def _data_point_at(self, index: int):
         """
-        if self.ts_data_response == None:
-            self.ts_data_response = self.api_session.get_timeseries_data(self.ts_unique_id, self.dataset_start_date, self.dataset_end_date, False, False)
+        Helper method to return the Data_Point for an index into the arrays,
+        reusing the linked Data_Point list if it was already built.
+        """
+        if self._data is not None:
+            return self._data[index]
+        return Data_Point(self.timestamps[index].astype(object), self.unit_values.value_at(index), None)
+    
+    def interpolate_at(self, dt: datetime):
+        """
+        Method to linearly interpolate the unit values at a datetime, straight
+        from the compressed values.
         
-        for index, point in enumerate(self.ts_data_response['Points']):
-            pt_time = datetime.strptime(point['Timestamp'][0:19], "%Y-%m-%dT%H:%M:%S")
-            
-            value = point['Value']['Numeric']
-            if index > 0:
-                self.data.append(Data_Point(pt_time, round(float(value), 2), None))
-                self.data[index-1].next = self.data[index]
-            else:
-                self.data.append(Data_Point(pt_time, round(float(value), 2), None))
+        Args:
+            dt(datetime): The datetime to interpolate at
         
+        Returns:
+            float: The interpolated value, None if there is no unit value on both sides of dt
+        """
+        if not self.has_data():
+            return None
+        return self.unit_values.interpolate_at(self.timestamps, np.datetime64(dt, "s"))
+    
+    def _decode_timeseries(self, return_full_coverage: bool, include_gap_markers: bool, query_from: datetime = None):
+        """
+        Helper method to stream the dataset's corrected timeseries from AQ and
+        decode its points straight into typed arrays. query_from defaults to
+        the dataset's start date.
+        """
+        query_from = query_from or self.dataset_start_date
+        chunks = self.api_session.stream_timeseries_data(self.ts_unique_id, query_from, self.dataset_end_date, return_full_coverage, include_gap_markers)
+        return Timeseries_Stream_Decoder(Dataset.KEEP_RAW_RESPONSES).decode(chunks)
+    
+    def extremes_between(self, window_start: datetime, window_end: datetime) -> tuple:
+        """
+        Method to find the maximum and minimum unit values within a window of the
+        dataset without re-scanning the values, e.g. between visits or within an
+        ice period. unique and estimated are assessed as for the dataset's own
+        max_point/min_point, unique counting only the window's points.
+        
+        Args:
+            window_start(datetime): Start of the window, inclusive
+            window_end(datetime): End of the window, inclusive
+        
+        Returns:
+            tuple(Data_Point, Data_Point): The max and min points, (None, None) if the window holds no unit values
+        """
+        if not self.has_data():
+            return None, None
+        
+        first = int(np.searchsorted(self.timestamps, np.datetime64(window_start, "s"), side="left"))
+        last = int(np.searchsorted(self.timestamps, np.datetime64(window_end, "s"), side="right")) - 1
+        extreme_points = []
+        for extreme_index in (self.range_extremes.max_index(first, last), self.range_extremes.min_index(first, last)):
+            if extreme_index is None:
+                extreme_points.append(None)
+                continue
+            point = Data_Point(self.timestamps[extreme_index].astype(object), self.unit_values.value_at(extreme_index), None)
+            point.unique = self.range_extremes.count_equal(extreme_index, first, last) == 1
+            point.estimated = self._check_if_estimated(point)
+            extreme_points.append(point)
+        return tuple(extreme_points)
+    
+    @traced()
+    def _gather_data(self) -> None:
+        """
+        Method to gather timeseries unit value data from AQ (if not already done)
+        into the dataset's timestamp and value arrays.
+        """
+        if self.timestamps is None:
+            decoded = self._decode_timeseries(False, False)
+            self.ts_data_response = decoded.raw_response
+            self.change_token = decoded.response_time
+            self.timestamps = decoded.timestamps
+            self.values = np.round(decoded.values, 2)
+            self._data = None
+    
+    @traced()
+    def _gather_raw_data(self) -> None:
+        """
+        Method to gather the uncorrected unit values of the dataset's period from
+        AQ (if not already done), for checking what the corrections did.
+        """
+        if self.raw_timestamps is None:
+            decoded = Timeseries_Stream_Decoder().decode(self.api_session.get_timeseries_raw_data(self.ts_unique_id, self.dataset_start_date, self.dataset_end_date))
+            self.raw_timestamps = decoded.timestamps
+            self.raw_unit_values = Compressed_Values.from_values(np.round(decoded.values, 2), Dataset.RUN_LENGTH_ENCODE)
+            self._raw_values = None
+    
+    def _gather_full_coverage(self) -> None:
+        """
+        Helper method to retrieve the full coverage response (if not already done)
+        used for the qualifiers and gaps.
+        """
+        if self._full_coverage is None:
+            self._full_coverage = self._decode_timeseries(True, True)
+            self.ts_data_response_full_coverage = self._full_coverage.raw_response
+        
+    @traced()
     def _assess_qualifiers(self) -> None:
         """
         Method to assess whether the a timeseries dataset has qualifiers, converts
@@ -82,15 +288,24 @@ class Dataset():
         Qualifier objects. The dataset being evaluated must have full coverage
         (contain starting at start of period or before and v/v for end of period).
         """
-        if self.ts_data_response_full_coverage == None:
-            self.ts_data_response_full_coverage = self.api_session.get_timeseries_data(self.ts_unique_id, self.dataset_start_date, self.dataset_end_date, True, True)
-        
-        for qualifier in self.ts_data_response_full_coverage['Qualifiers']:
+        self._gather_full_coverage()
+        self.qualifiers = Dataset._parse_qualifiers(self._full_coverage.qualifiers)
+    
+    @staticmethod
+    def _parse_qualifiers(qualifiers_json) -> list:
+        """
+        Helper method to convert the qualifier entries of a timeseries response
+        into Qualifier objects.
+        """
+        qualifiers = []
+        for qualifier in qualifiers_json:
             start = datetime.strptime(qualifier['StartTime'][0:19], "%Y-%m-%dT%H:%M:%S")
             end = datetime.strptime(qualifier['EndTime'][0:19], "%Y-%m-%dT%H:%M:%S")
             identifier = qualifier['Identifier']
-            self.qualifiers.append(Qualifier(start, end, identifier))  
+            qualifiers.append(Qualifier(start, end, identifier))
+        return qualifiers
     
+    @traced()
     def _assess_general_corrections(self) -> None:
         """
         Method to gather and populate a list of generic timeseries corrections/
@@ -144,6 +359,7 @@ class Dataset():
         
         return shift_input_point_list
     
+    @traced()
     def _gather_usgs_multipoint_corrections(self) -> None:
         """
         Method to populate a list of Multi-Point corrections from a provided 
@@ -166,32 +382,93 @@ class Dataset():
                 comment = correction['Comment']
                 self.multipoint_corrections.append(Multi_Point_Correction(correction_start_datetime, correction_end_datetime, start_shifts, end_shifts, processing_order, comment))
     
+    @traced()
     def _assess_gaps(self) -> None:
         """
         Method to assess whether there are in gaps in a given timeseries, convert
-        them into Gap objects, and append them to a list of Gap objects.
+        them into Gap objects, and append them to a list of Gap objects. A gap
+        spans from the unit value before a gap marker to the one after it.
         """
-        if self.ts_data_response_full_coverage == None:
-            self.ts_data_response_full_coverage = self.api_session.get_timeseries_data(self.ts_unique_id, self.dataset_start_date, self.dataset_end_date, True, True)
+        self._gather_full_coverage()
+        full_coverage = self._full_coverage
         
-        if self.ts_data_response_full_coverage['NumPoints'] == 0:
+        self.gaps = []
+        if full_coverage.num_points == 0:
             period_duration = self.dataset_end_date-self.dataset_start_date
             self.gaps.append(Gap(self.dataset_start_date, self.dataset_end_date, period_duration))
         
-        for index, point in enumerate(self.ts_data_response_full_coverage['Points']):
-            if len(point['Value']) > 0:
-                value = point['Value']['Numeric']
-                if value == Dataset.EMPTY:
-                    previous_uv_time = datetime.strptime(self.ts_data_response_full_coverage['Points'][index-1]['Timestamp'][0:16], "%Y-%m-%dT%H:%M")
-                    next_uv_time = datetime.strptime(self.ts_data_response_full_coverage['Points'][index+1]['Timestamp'][0:16], "%Y-%m-%dT%H:%M")
-                    gap_duration = next_uv_time-previous_uv_time
-                    self.gaps.append(Gap(previous_uv_time, next_uv_time, gap_duration))
-            elif len(point['Value']) == 0 and index != len(self.ts_data_response_full_coverage['Points'])-1:
-                curr_uv_time = datetime.strptime(self.ts_data_response_full_coverage['Points'][index-1]['Timestamp'][0:16], "%Y-%m-%dT%H:%M")
-                next_uv_time = datetime.strptime(self.ts_data_response_full_coverage['Points'][index+1]['Timestamp'][0:16], "%Y-%m-%dT%H:%M")
-                gap_duration = next_uv_time - curr_uv_time
-                self.gaps.append(Gap(curr_uv_time, next_uv_time, gap_duration))
+        self.gaps.extend(Dataset._find_gaps(full_coverage))
+        
+        # The full coverage points are only needed for the qualifiers and gaps
+        self._full_coverage = None
                 
+    @staticmethod
+    def _find_gaps(full_coverage) -> list:
+        """
+        Helper method to locate the gap markers of a full coverage response and
+        convert them to Gap objects spanning the unit values on either side.
+        """
+        minute_times = full_coverage.timestamps.astype("datetime64[m]")
+        gap_indices = Compressed_Values.from_values(full_coverage.values).gap_indices()
+        gap_indices = gap_indices[(gap_indices > 0) & (gap_indices < len(minute_times) - 1)]
+        gaps = []
+        for previous_uv_time, next_uv_time in zip(minute_times[gap_indices - 1].astype(object), minute_times[gap_indices + 1].astype(object)):
+            gaps.append(Gap(previous_uv_time, next_uv_time, next_uv_time - previous_uv_time))
+        return gaps
+    
+    @traced()
+    def refresh(self, first_point_changed: datetime) -> None:
+        """
+        Method to bring an already gathered dataset up to date after AQ reported
+        changed points. Only the points from first_point_changed onwards are
+        pulled and spliced into the existing arrays; qualifiers and gaps before
+        that are kept, and the corrections and extremes are reassessed.
+        
+        Args:
+            first_point_changed(datetime): AQ's earliest changed point of the timeseries
+        """
+        if self.timestamps is None:
+            self.gather_data_for_records()
+            return
+        
+        if first_point_changed <= self.dataset_start_date + Dataset.CHANGE_MARGIN:
+            refresh_from = self.dataset_start_date
+        else:
+            refresh_from = first_point_changed - Dataset.CHANGE_MARGIN
+        
+        if refresh_from > self.dataset_end_date:
+            return
+        
+        delta = self._decode_timeseries(False, False, refresh_from)
+        kept = self.timestamps < np.datetime64(refresh_from)
+        self.timestamps = np.concatenate((self.timestamps[kept], delta.timestamps))
+        self.values = np.concatenate((self.values[kept], np.round(delta.values, 2)))
+        self._data = None
+        self.ts_data_response = delta.raw_response
+        self.change_token = delta.response_time or self.change_token
+        
+        delta_coverage = self._decode_timeseries(True, True, refresh_from)
+        self.ts_data_response_full_coverage = delta_coverage.raw_response
+        kept_qualifiers = [qualifier for qualifier in self.qualifiers if qualifier.end_datetime < refresh_from]
+        seen_qualifiers = {(qualifier.start_datetime, qualifier.end_datetime, qualifier.identifier) for qualifier in kept_qualifiers}
+        self.qualifiers = kept_qualifiers
+        for qualifier in Dataset._parse_qualifiers(delta_coverage.qualifiers):
+            if (qualifier.start_datetime, qualifier.end_datetime, qualifier.identifier) not in seen_qualifiers:
+                self.qualifiers.append(qualifier)
+        self.gaps = [gap for gap in self.gaps if gap.end_datetime < refresh_from] + Dataset._find_gaps(delta_coverage)
+        
+        # A changed point usually means a correction was applied or removed
+        self.dataset_corrections_response = None
+        self.general_corrections = []
+        self.multipoint_corrections = []
+        self._assess_general_corrections()
+        self._gather_usgs_multipoint_corrections()
+        
+        self.max_point = None
+        self.min_point = None
+        self._assess_max()
+        self._assess_min()
+    
     def _check_if_estimated(self, data_point_to_check) -> bool:
         estimated = False
         for qualifier in self.qualifiers:
@@ -200,33 +477,38 @@ class Dataset():
                     estimated = False
         return estimated
     
+    @traced()
     def _assess_min(self) -> None:
         """
         Method to determine and assign the minimum unit value of the dataset.
+        The first occurrence is reported if the minimum occurs more than once.
+        Answered by range_extremes, which later window queries reuse.
         """
-        if len(self.data) > 0:
-            self.data.sort(key=lambda x: x.value, reverse = False)
-            self.min_point = self.data[0]
+        if not self.has_data():
+            return
+        last = len(self.timestamps) - 1
+        min_index = self.range_extremes.min_index(0, last)
+        if min_index is not None:
+            self.min_point = self._data_point_at(min_index)
             self.min_point.estimated = self._check_if_estimated(self.min_point)
-            if self.min_point.value == self.data[1].value:
+            if self.range_extremes.count_equal(min_index, 0, last) > 1:
                 self.min_point.unique = False
     
+    @traced()
     def _assess_max(self) -> None:
         """
         Method to determine and assign the maximum unit value of the dataset.
+        The first occurrence is reported if the maximum occurs more than once.
+        Answered by range_extremes, which later window queries reuse.
         """
-        if len(self.data) > 0:
-            self.data.sort(key=lambda x: x.value, reverse = True)
-            first_valid_point_index = 0
-
-            while(self.data[first_valid_point_index].value == Dataset.EMPTY):
-                first_valid_point_index = first_valid_point_index + 1
-            
-            self.max_point = self.data[first_valid_point_index]
-            self.max_point.estimated = self._check_if_estimated(self.max_point)
-            if first_valid_point_index != len(self.data) - 1:
-                if self.max_point.value == self.data[first_valid_point_index + 1].value:
-                    self.max_point.unique = False
+        if not self.has_data():
+            return
+        last = len(self.timestamps) - 1
+        max_index = self.range_extremes.max_index(0, last)
+        if max_index is not None:
+            self.max_point = self._data_point_at(max_index)
+            if self.range_extremes.count_equal(max_index, 0, last) > 1:
+                self.max_point.unique = False
             self.max_point.estimated = self._check_if_estimated(self.max_point)
 
 class Correction():
@@ -326,3 +608,9 @@ class Data_Point():
         self.next = next_pt
         self.estimated = False
         self.unique = True
+    
+    def __getstate__(self):
+        # Drop the link to the following point so pickling a single point does not pull in the whole series
+        state = self.__dict__.copy()
+        state["next"] = None
+        return state
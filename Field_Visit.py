@@ -4,6 +4,7 @@ import re
 import SiteV3
 import Reading
 import User_Inputs
+from Tracing import traced
 
 
 class Field_Visit():
@@ -37,6 +38,7 @@ class Field_Visit():
         self.control_condition = ""
         self.levels_performed = False
         
+    @traced()
     def retrieve_records_related_data(self,  gh_ts_list: list) -> None:
         """
         Helper method to retrieve all pertinent information for a field field to
@@ -100,10 +102,14 @@ class Field_Visit():
         """
 
         for reading in self.data_response['InspectionActivity']['Readings']:
-            if reading['ReadingType'] == self.EXTREME_MAX and self._has_time(reading):
-                reading_datetime = datetime.strptime(reading['Time'][0:19], "%Y-%m-%dT%H:%M:%S")
+            if reading['ReadingType'] == self.EXTREME_MAX:
+                # CSG marks often cannot be tied to a time, they are kept without one and matched to the peak between visits
+                reading_datetime = None
+                if self._has_time(reading):
+                    reading_datetime = datetime.strptime(reading['Time'][0:19], "%Y-%m-%dT%H:%M:%S")
                 hwm_reading_obj = Reading.Reading(reading['Parameter'], reading['MonitoringMethod'], reading['ReadingType'], reading_datetime, reading['Value']['Numeric'], sublocation = Field_Visit._return_reading_sublocation(reading))
-                hwm_reading_obj.check_discrepancy(gh_ts_list)
+                if reading_datetime is not None:
+                    hwm_reading_obj.check_discrepancy(gh_ts_list)
                 self.high_water_marks.append(hwm_reading_obj)
 
     @staticmethod
@@ -115,7 +121,7 @@ class Field_Visit():
         """
         for param in reading_json:
             if param == "SubLocationIdentifier":
-                return param["SubLocationIdentifier"]
+                return reading_json["SubLocationIdentifier"]
         return ""
 
     def _retrieve_csg_intake_vent_insp(self) -> None:
@@ -346,6 +352,9 @@ class Discharge_Measurement():
         self.discharge = discharge
         self.quality = quality
         self.difference_from_base_rating = None
+        self.applied_shift = None
+        self.measured_shift = None
+        self.difference_from_shifted_rating = None
         self.rating_num_compared = ""
         self.comment = comment
              
\ No newline at end of file
@@ -0,0 +1,336 @@
+"""
+File-backed AQ and SIMs sessions replaying an exported data bundle, and the
+"export bundle" command writing one while connected.
+
+A bundle is a directory holding a manifest.json and, per session method, one
+JSON file per distinct call: the call's arguments and the response it got.
+Replaying the same calls (same site and record dates) serves them from disk,
+so records can be made on air-gapped machines and the pipeline's compute can
+be benchmarked without network latency.
+
+Usage:
+    python File_API_Session.py <site_no> <start YYYY-MM-DD> <end YYYY-MM-DD> <bundle_dir>
+    python ars_template_v7.py --bundle <bundle_dir>
+"""
+
+from API_Session_V3 import AquariusAPISession, SIMsAPISession, SynchronousAquariusAPISession, SynchronousSIMsAPISession
+from datetime import datetime, date, timedelta
+from os import environ, path, makedirs
+import hashlib
+import inspect
+import json
+import sys
+import threading
+
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+CHUNKED_METHODS = ("stream_timeseries_data",)
+
+
+class Bundle_Miss_Error(LookupError):
+    """
+    Raised when a call was not captured in the data bundle.
+
+    Args:
+        method(str): The session method called
+        arguments(list): The call's arguments
+    """
+    def __init__(self, method: str, arguments: list) -> None:
+        self.method = method
+        self.arguments = arguments
+        super().__init__(f"{method}{tuple(arguments)} is not in the data bundle, export the bundle again for this site and period while connected")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return str(value)
+
+
+def _call_arguments(base_cls, method: str, args: tuple, kwargs: dict) -> list:
+    """
+    Helper method to put a call's arguments in the order of the abstract
+    method's signature, with defaults filled in, so a call is recognized the
+    same however it was spelled.
+    """
+    try:
+        bound = inspect.signature(getattr(base_cls, method)).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = list(bound.arguments.values())
+    except TypeError: # concrete sessions may take more arguments than the abstract method declares
+        arguments = list(args) + [kwargs[name] for name in sorted(kwargs)]
+    return json.loads(json.dumps(arguments, default=_json_default))
+
+
+def _response_path(bundle_dir: str, method: str, arguments: list) -> str:
+    key = hashlib.sha1(json.dumps(arguments, sort_keys=True).encode("utf-8")).hexdigest()[0:20]
+    return path.join(bundle_dir, method, f"{key}.json")
+
+
+class File_Aquarius_API_Session(AquariusAPISession):
+    """
+    Concrete AquariusAPISession serving every call from an exported bundle
+    directory instead of AQ. Timeseries never change in a bundle, so change
+    tracking always reports nothing new.
+    """
+    bundle_dir = environ.get("ARS_BUNDLE_DIR")
+
+    @classmethod
+    def use_bundle(cls, bundle_dir: str) -> None:
+        """
+        Point the session at a bundle directory.
+
+        Args:
+            bundle_dir(str): Directory written by export_bundle
+        """
+        cls.bundle_dir = bundle_dir
+
+    @classmethod
+    def _replay(cls, method: str, *args, **kwargs):
+        """
+        Helper method to look up the response recorded for a call.
+        """
+        arguments = _call_arguments(AquariusAPISession, method, args, kwargs)
+        return _read_response(cls.bundle_dir, method, arguments)
+
+    @classmethod
+    def configure_logging(cls):
+        pass
+
+    @classmethod
+    def _make_aq_request(cls, rest_type: str, api_type: str, params):
+        return cls._replay("_make_aq_request", rest_type, api_type, params)
+
+    @classmethod
+    def login(cls) -> int:
+        return 200
+
+    @classmethod
+    def logout(cls) -> int:
+        return 200
+
+    @classmethod
+    def get_site_info(cls, site_no: str):
+        return tuple(cls._replay("get_site_info", site_no))
+
+    @classmethod
+    def get_location_descriptions(cls) -> dict:
+        return cls._replay("get_location_descriptions")
+
+    @classmethod
+    def get_gage_height_timeseries_list(cls, site_no: str):
+        return cls._replay("get_gage_height_timeseries_list", site_no)
+
+    @classmethod
+    def get_timeseries_list(cls, site_no: str, parameter: str):
+        return cls._replay("get_timeseries_list", site_no, parameter)
+
+    @classmethod
+    def get_timeseries_data(cls, ts_unique_id: str, query_from, query_to, *args):
+        return cls._replay("get_timeseries_data", ts_unique_id, query_from, query_to, *args)
+
+    @classmethod
+    def stream_timeseries_data(cls, ts_unique_id: str, query_from, query_to, return_full_coverage: bool = False, include_gap_markers: bool = False):
+        yield cls._replay("stream_timeseries_data", ts_unique_id, query_from, query_to, return_full_coverage, include_gap_markers)
+
+    @classmethod
+    def get_timeseries_raw_data(cls, ts_unique_id: str, query_from, query_to) -> str:
+        return cls._replay("get_timeseries_raw_data", ts_unique_id, query_from, query_to)
+
+    @classmethod
+    def get_timeseries_changes_since(cls, location_identifier: str, changes_since_token: str) -> dict:
+        return {"TimeSeriesUniqueIds": [], "NextToken": changes_since_token, "TokenExpired": False}
+
+    @classmethod
+    def get_gh_corrections_list(cls, ts_unique_id: str, query_from, query_to) -> str:
+        return cls._replay("get_gh_corrections_list", ts_unique_id, query_from, query_to)
+
+    @classmethod
+    def get_field_visits(cls, site_no: str, query_from, query_to) -> str:
+        return cls._replay("get_field_visits", site_no, query_from, query_to)
+
+    @classmethod
+    def get_field_visit_data(cls, field_visit_id: str) -> str:
+        return cls._replay("get_field_visit_data", field_visit_id)
+
+    @classmethod
+    def get_sensors(cls, site_no: str) -> str:
+        return cls._replay("get_sensors", site_no)
+
+    @classmethod
+    def get_discharge_ratings_list(cls, site_no: str) -> str:
+        return cls._replay("get_discharge_ratings_list", site_no)
+
+    @classmethod
+    def get_discharge_rating_model_info(cls, rating_model_id: str, query_from = "", query_to = "") -> str:
+        return cls._replay("get_discharge_rating_model_info", rating_model_id, query_from, query_to)
+
+    @classmethod
+    def get_discharge_rating_base_output_by_gh(cls, rating_model_id: str, gage_height: float, datetime) -> str:
+        return cls._replay("get_discharge_rating_base_output_by_gh", rating_model_id, gage_height, datetime)
+
+
+class File_SIMs_API_Session(SIMsAPISession):
+    """
+    Concrete SIMsAPISession serving every call from an exported bundle directory.
+    """
+    bundle_dir = environ.get("ARS_BUNDLE_DIR")
+
+    @classmethod
+    def use_bundle(cls, bundle_dir: str) -> None:
+        """
+        Point the session at a bundle directory.
+
+        Args:
+            bundle_dir(str): Directory written by export_bundle
+        """
+        cls.bundle_dir = bundle_dir
+
+    @classmethod
+    def _replay(cls, method: str, *args, **kwargs):
+        arguments = _call_arguments(SIMsAPISession, method, args, kwargs)
+        return _read_response(cls.bundle_dir, method, arguments)
+
+    @classmethod
+    def configure_logging(cls):
+        pass
+
+    @classmethod
+    def _make_sims_request(cls, api_type: str, params):
+        return cls._replay("_make_sims_request", api_type, params)
+
+    @classmethod
+    def get_office_info_by_wsc(cls, wsc_id: int) -> str:
+        return cls._replay("get_office_info_by_wsc", wsc_id)
+
+    @classmethod
+    def get_sites_by_office(cls, wsc_id: int, office_id: int) -> str:
+        return cls._replay("get_sites_by_office", wsc_id, office_id)
+
+    @classmethod
+    def get_elements_by_site(cls, doc_type: str, site_no: str, agency_cd: str) -> str:
+        return cls._replay("get_elements_by_site", doc_type, site_no, agency_cd)
+
+    @classmethod
+    def get_sims_site_id(cls, site_no) -> str:
+        return cls._replay("get_sims_site_id", site_no)
+
+    @classmethod
+    def get_sims_levels_info(cls, site_no) -> str:
+        return cls._replay("get_sims_levels_info", site_no)
+
+    @classmethod
+    def get_sims_rating_info(cls, site_no) -> str:
+        return cls._replay("get_sims_rating_info", site_no)
+
+
+def _read_response(bundle_dir: str, method: str, arguments: list):
+    """
+    Helper method to read a recorded response from a bundle.
+    """
+    if bundle_dir is None:
+        raise Bundle_Miss_Error(method, arguments)
+    try:
+        with open(_response_path(bundle_dir, method, arguments), "r", encoding="utf-8") as response_file:
+            return json.load(response_file)["response"]
+    except FileNotFoundError:
+        raise Bundle_Miss_Error(method, arguments) from None
+
+
+class Recording_Session():
+    """
+    Wrapper around a live AQ or SIMs session writing the response of every
+    data call into a bundle directory, for File_Aquarius_API_Session and
+    File_SIMs_API_Session to replay later.
+
+    Args:
+        live_session: The live session (class or instance) making the real calls
+        base_cls: AquariusAPISession or SIMsAPISession, whose signatures key the calls
+        bundle_dir(str): Directory the bundle is written to
+    """
+    # Session management and change tracking are not data, a bundle never changes
+    NOT_RECORDED = ("login", "logout", "ensure_session", "close", "configure_logging", "http_session",
+                    "token_manager", "get_timeseries_changes_since")
+
+    def __init__(self, live_session, base_cls, bundle_dir: str) -> None:
+        self.live_session = live_session
+        self.base_cls = base_cls
+        self.bundle_dir = bundle_dir
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.live_session, name)
+        if name.startswith("__") or name in Recording_Session.NOT_RECORDED or not callable(attribute) or not hasattr(self.base_cls, name):
+            return attribute
+
+        def record_call(*args, **kwargs):
+            response = attribute(*args, **kwargs)
+            if name in CHUNKED_METHODS:
+                response = "".join(chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk for chunk in response)
+            self._write_response(name, _call_arguments(self.base_cls, name, args, kwargs), response)
+            return [response] if name in CHUNKED_METHODS else response
+        return record_call
+
+    def _write_response(self, method: str, arguments: list, response) -> None:
+        response_path = _response_path(self.bundle_dir, method, arguments)
+        with self._lock:
+            makedirs(path.dirname(response_path), exist_ok=True)
+            with open(response_path, "w", encoding="utf-8") as response_file:
+                json.dump({"method": method, "arguments": arguments, "response": response}, response_file, default=_json_default)
+
+
+def export_bundle(site_no: str, record_start_date: datetime, record_end_date: datetime, bundle_dir: str) -> None:
+    """
+    Gather everything a record of the site needs from AQ and SIMs, as a Submit
+    would, and write every response into a bundle directory.
+
+    Args:
+        site_no(str): The 8- or 15-digit site number assigned associated with NWIS
+        record_start_date(datetime): Date of when the record begins
+        record_end_date(datetime): Date of when the record ends
+        bundle_dir(str): Directory the bundle is written to
+    """
+    # Imported here so the sessions above can be used without the record pipeline
+    import SiteV3
+
+    makedirs(bundle_dir, exist_ok=True)
+    SynchronousAquariusAPISession.ensure_session()
+    aq_recorder = Recording_Session(SynchronousAquariusAPISession, AquariusAPISession, bundle_dir)
+    sims_recorder = Recording_Session(SynchronousSIMsAPISession, SIMsAPISession, bundle_dir)
+
+    site = SiteV3.Site(site_no, aq_recorder, sims_recorder)
+    site.gather_records_info_from_dates(record_start_date, record_end_date)
+    # The raw series are only pulled when the corrections are checked, after the gather
+    for gh_ts in site.gage_height_timeseries_list:
+        gh_ts.record_dataset._gather_raw_data()
+
+    manifest = {"format_version": BUNDLE_FORMAT_VERSION,
+                "exported": datetime.now().isoformat(timespec="seconds"),
+                "site_no": site_no,
+                "start_date": record_start_date.isoformat(),
+                "end_date": record_end_date.isoformat()}
+    with open(path.join(bundle_dir, MANIFEST_NAME), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+
+
+def main():
+    if len(sys.argv) != 5:
+        print(__doc__)
+        sys.exit(1)
+
+    site_no, start, end, bundle_dir = sys.argv[1:5]
+    # Same record bounds as the Site Select tab: start of the first day to the end of the last
+    record_start_date = datetime.strptime(start, "%Y-%m-%d")
+    record_end_date = datetime.strptime(end, "%Y-%m-%d") + timedelta(hours=23, minutes=59, seconds=59)
+    try:
+        export_bundle(site_no, record_start_date, record_end_date, bundle_dir)
+    finally:
+        SynchronousAquariusAPISession.close()
+    print(f"Bundle for {site_no} written to {bundle_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from API_Session_V3 import SynchronousAquariusAPISession
+from API_Session_V3 import API_Call_Ledger, API_Request_Error
+import logging
 from PyQt5.QtWidgets import QScrollArea, QWidget, QLabel, QTextEdit, QFormLayout
 from PyQt5 import QtCore
 from Text_Line import Text_Line
@@ -79,6 +80,11 @@ class GHTab(QScrollArea):
         
         self.gh_quality_section.setup_quality_tables()
 
+        self.setup_section("Record Coverage Section Preview",
+                           self._update_gh_ts,
+                           lambda: User_Inputs.record.create_gh_coverage_section(User_Inputs.site.gage_height_timeseries_list),
+                           "gh_coverage_section")
+
         self.setup_section("Datum Section Preview",
                             User_Inputs.site._gather_levels_description,
                             lambda: User_Inputs.record.create_datum_section(User_Inputs.site.levels_description),
@@ -98,12 +104,12 @@ class GHTab(QScrollArea):
 
         self.setup_section("Edits Section Preview",
                            self._update_gh_ts,
-                           lambda: User_Inputs.record.create_edits_section(User_Inputs.site.gage_height_timeseries_list),
+                           lambda: User_Inputs.record.create_edits_section(User_Inputs.site.gage_height_timeseries_list, User_Inputs.site.field_visits),
                            "edits_section")
 
         self.setup_section("Gage Height Corrections Section Preview",
                            self._update_gh_ts,
-                           lambda: User_Inputs.record.create_gh_correction_section(User_Inputs.site.gage_height_timeseries_list),
+                           lambda: User_Inputs.record.create_gh_correction_section(User_Inputs.site.gage_height_timeseries_list, User_Inputs.site.field_visits),
                            "gh_corrections_section")
 
         self.setup_section("Gaps Section Preview",
@@ -116,9 +122,16 @@ class GHTab(QScrollArea):
                            lambda: User_Inputs.record.create_other_corrections_section(User_Inputs.site.gage_height_timeseries_list),
                            "other_gh_corrections_section")
 
+        self.setup_section("Sensor Comparison Section Preview",
+                           self._update_gh_ts,
+                           lambda: User_Inputs.record.create_sensor_comparison_section(User_Inputs.site.gage_height_timeseries_list),
+                           "sensor_comparison_section")
+
         self.setup_section("Peak Verifications Section Preview",
                            self._update_gh_ts,
-                           lambda: User_Inputs.record.create_peak_verifications_section(User_Inputs.site.field_visits),
+                           lambda: User_Inputs.record.create_peak_verifications_section(User_Inputs.site.field_visits,
+                                                                                        User_Inputs.site.gage_height_timeseries_list,
+                                                                                        User_Inputs.site.discharge_timeseries_list[0] if len(User_Inputs.site.discharge_timeseries_list) > 0 else None),
                            "peak_verifications_section",
                            1000)
         
@@ -138,20 +151,22 @@ class GHTab(QScrollArea):
 
     def update_section(self, data_getter, data_creator, web_window, html_attribute):
         try:
-            response = SynchronousAquariusAPISession.login()
-            if int(response) >= 400:
-                User_Inputs.critical_error_message(response.text)
-                return False
+            with API_Call_Ledger.scope(f"Update {html_attribute}") as ledger:
+                response = User_Inputs.aq_session().ensure_session()
+                if int(response) >= 400:
+                    User_Inputs.critical_error_message(response.text)
+                    return False
 
-            data_getter()
-            data_creator()
-            new_html = getattr(User_Inputs.record, html_attribute)
-            web_window.web_view.setHtml(new_html)
+                data_getter()
+                data_creator()
+                new_html = getattr(User_Inputs.record, html_attribute)
+                web_window.web_view.setHtml(new_html)
+            logging.info(ledger.summary())
 
-            response = SynchronousAquariusAPISession.logout()
-            if response >= 400:
-                User_Inputs.critical_error_message(response.text)
-                return False
+        except API_Request_Error as e:
+            print(str(e))
+            User_Inputs.critical_error_message(f"Error: Request to AQ failed\n\n{e}\n\nCheck your connection and VPN.")
+            return False
 
         except Exception as e:
             print(str(e))
@@ -195,7 +210,7 @@ class GHTab(QScrollArea):
         
     def update_peak_recorder_gh_window(self):
         try:
-            response = SynchronousAquariusAPISession.login()  # Capture the response
+            response = User_Inputs.aq_session().ensure_session()  # Capture the response
             if int(response) >= 400:  # Check for error status codes
                 User_Inputs.critical_error_message(response.text)  # Display error message
                 return False
@@ -203,15 +218,10 @@ class GHTab(QScrollArea):
             else:
                 gh_ts_list = User_Inputs.site.gage_height_timeseries_list 
                 for ts in gh_ts_list:
-                    ts.populate_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
-                response = SynchronousAquariusAPISession.logout()  # Capture the response
+                    ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
                 User_Inputs.record.create_peak_recorder_stage_section(gh_ts_list, self.peak_verification_input_combo_box_array)
                 new_html = User_Inputs.record.peak_recorder_stage_section
                 self.peak_recorder_gh_web_window.web_view.setHtml(new_html)
-                
-                if response >= 400:  # Check for error status codes
-                    User_Inputs.critical_error_message(response.text)  # Display error message
-                    return False
         
         except Exception as e:
             print(str(e.with_traceback))
@@ -262,7 +272,8 @@ class GHTab(QScrollArea):
         self.special_notes_text_box.setAlignment(QtCore.Qt.AlignmentFlag.AlignTop)
         self.special_notes_text_box.textChanged.connect(self.update_user_inputs)
 
-        if User_Inputs.successfulSubmissionCnt > 1:
+        # Kept from a previous submission or restored from a snapshot
+        if User_Inputs.successfulSubmissionCnt > 1 or User_Inputs.special_notes != "":
             self.special_notes_text_box.setText(User_Inputs.special_notes)
 
         self.layout.addRow(self.special_notes_text_box)
@@ -304,7 +315,7 @@ class GHTab(QScrollArea):
         
     def update_backup_window(self):
         try:
-            response = SynchronousAquariusAPISession.login()  # Capture the response
+            response = User_Inputs.aq_session().ensure_session()  # Capture the response
             if int(response) >= 400:  # Check for error status codes
                 User_Inputs.critical_error_message(response.text)  # Display error message
                 return False
@@ -312,15 +323,10 @@ class GHTab(QScrollArea):
             else:
                 gh_ts_list = User_Inputs.site.gage_height_timeseries_list 
                 for ts in gh_ts_list:
-                    ts.populate_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
-                response = SynchronousAquariusAPISession.logout()  # Capture the response
+                    ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
                 User_Inputs.record.create_backup_data_section(gh_ts_list, self.edl_data_condition_combo_box_array)
                 new_html = User_Inputs.record.backup_data_section
                 self.backup_web_window.web_view.setHtml(new_html)
-                
-                if response >= 400:  # Check for error status codes
-                    User_Inputs.critical_error_message(response.text)  # Display error message
-                    return False
         
         except Exception as e:
             print(str(e.with_traceback))
@@ -356,5 +362,5 @@ class GHTab(QScrollArea):
     def _update_gh_ts(self):
         gh_ts_list = User_Inputs.site.gage_height_timeseries_list 
         for ts in gh_ts_list:
-            ts.populate_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
+            ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
 
@@ -1,4 +1,5 @@
-from API_Session_V3 import SynchronousAquariusAPISession
+from API_Session_V3 import API_Call_Ledger, API_Request_Error
+import logging
 from PyQt5.QtWidgets import QScrollArea, QWidget, QLabel, QFormLayout
 from PyQt5 import QtCore
 from Text_Line import Text_Line
@@ -56,20 +57,22 @@ class Generic_Tab(QScrollArea):
 
     def update_section(self, data_getter, data_creator, web_window, html_attribute):
         try:
-            response = SynchronousAquariusAPISession.login()
-            if int(response) >= 400:
-                User_Inputs.critical_error_message(response.text)
-                return False
-
-            data_getter()
-            data_creator()
-            new_html = getattr(User_Inputs.record, html_attribute)
-            web_window.web_view.setHtml(new_html)
-
-            response = SynchronousAquariusAPISession.logout()
-            if response >= 400:
-                User_Inputs.critical_error_message(response.text)
-                return False
+            with API_Call_Ledger.scope(f"Update {html_attribute}") as ledger:
+                response = User_Inputs.aq_session().ensure_session()
+                if int(response) >= 400:
+                    User_Inputs.critical_error_message(response.text)
+                    return False
+
+                data_getter()
+                data_creator()
+                new_html = getattr(User_Inputs.record, html_attribute)
+                web_window.web_view.setHtml(new_html)
+            logging.info(ledger.summary())
+
+        except API_Request_Error as e:
+            print(str(e))
+            User_Inputs.critical_error_message(f"Error: Request to AQ failed\n\n{e}\n\nCheck your connection and VPN.")
+            return False
 
         except Exception as e:
             print(str(e))
@@ -124,10 +127,10 @@ class Generic_Tab(QScrollArea):
     def _update_gh_ts(self):
         gh_ts_list = User_Inputs.site.gage_height_timeseries_list 
         for ts in gh_ts_list:
-            ts.populate_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
+            ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
         
     def _update_q_ts(self):
         q_ts_list = User_Inputs.site.discharge_timeseries_list 
         for ts in q_ts_list:
-            ts.populate_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
+            ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
 
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+
+class Interval_Set():
+    """
+    A set of time periods kept as sorted, disjoint [start, end] intervals in
+    datetime64[s] arrays. AQ hands back qualifier and correction periods as
+    entered, so touching or overlapping periods show up separately; building
+    an Interval_Set merges them. Set operations are vectorized over the arrays.
+
+    Intersection and difference only keep pieces of positive length, two
+    periods that merely touch do not overlap.
+
+    Args:
+        starts(np.ndarray): Start of each period
+        ends(np.ndarray): End of each period
+        tolerance(timedelta): Periods separated by no more than this are merged
+    """
+    def __init__(self, starts = (), ends = (), tolerance: timedelta = timedelta(0)) -> None:
+        starts = np.asarray(starts, dtype="datetime64[s]")
+        ends = np.asarray(ends, dtype="datetime64[s]")
+        valid = ends >= starts
+        self.starts, self.ends = Interval_Set._merge(starts[valid], ends[valid], np.timedelta64(tolerance, "s"))
+
+    @staticmethod
+    def from_periods(periods: list, tolerance: timedelta = timedelta(0)):
+        """
+        Build a set from objects with start_datetime and end_datetime, such as
+        Qualifier, Correction or Gap.
+
+        Args:
+            periods(list): The periods to merge
+            tolerance(timedelta): Periods separated by no more than this are merged
+
+        Returns:
+            Interval_Set: The merged periods
+        """
+        periods = list(periods)
+        return Interval_Set([period.start_datetime for period in periods], [period.end_datetime for period in periods], tolerance)
+
+    @staticmethod
+    def _merge(starts: np.ndarray, ends: np.ndarray, tolerance: np.timedelta64) -> tuple:
+        """
+        Helper method to sort periods and merge the overlapping, touching or
+        close enough ones.
+        """
+        if len(starts) == 0:
+            return starts, ends
+        order = np.lexsort((ends, starts))
+        starts = starts[order]
+        running_ends = np.maximum.accumulate(ends[order])
+        new_interval = starts[1:] > running_ends[:-1] + tolerance
+        return starts[np.concatenate(([True], new_interval))], running_ends[np.concatenate((new_interval, [True]))]
+
+    @staticmethod
+    def _from_sorted(starts: np.ndarray, ends: np.ndarray):
+        """
+        Helper method to wrap arrays already sorted and disjoint without merging them again.
+        """
+        interval_set = Interval_Set()
+        interval_set.starts = starts
+        interval_set.ends = ends
+        return interval_set
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(self.periods())
+
+    def periods(self) -> list:
+        """
+        The merged periods as (start, end) datetime tuples.
+        """
+        return list(zip(self.starts.astype(object), self.ends.astype(object)))
+
+    def durations(self) -> list:
+        """
+        The length of each merged period as timedeltas.
+        """
+        return (self.ends - self.starts).astype(object).tolist()
+
+    def total_duration(self) -> timedelta:
+        """
+        Total time covered by the set.
+        """
+        return timedelta(seconds=int((self.ends - self.starts).astype(np.int64).sum()))
+
+    def coalesce(self, tolerance: timedelta):
+        """
+        Merge periods separated by no more than tolerance.
+        """
+        return Interval_Set(self.starts, self.ends, tolerance)
+
+    def union(self, other):
+        """
+        Periods covered by either set.
+        """
+        return Interval_Set(np.concatenate((self.starts, other.starts)), np.concatenate((self.ends, other.ends)))
+
+    def intersection(self, other):
+        """
+        Periods covered by both sets.
+        """
+        # For each of our intervals, the run of the other set's intervals it can overlap
+        first = np.searchsorted(other.ends, self.starts, side="right")
+        last = np.searchsorted(other.starts, self.ends, side="left") - 1
+        counts = np.maximum(last - first + 1, 0)
+        ours = np.repeat(np.arange(len(self)), counts)
+        theirs = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+
+        starts = np.maximum(self.starts[ours], other.starts[theirs])
+        ends = np.minimum(self.ends[ours], other.ends[theirs])
+        positive = ends > starts
+        return Interval_Set._from_sorted(starts[positive], ends[positive])
+
+    def complement(self, span_start: datetime, span_end: datetime):
+        """
+        Periods of span_start..span_end not covered by the set.
+        """
+        span_start = np.datetime64(span_start, "s")
+        span_end = np.datetime64(span_end, "s")
+        starts = np.concatenate(([span_start], self.ends))
+        ends = np.concatenate((self.starts, [span_end]))
+        positive = ends > starts
+        return Interval_Set._from_sorted(starts[positive], ends[positive]).intersection(Interval_Set._from_sorted(np.array([span_start]), np.array([span_end])))
+
+    def difference(self, other):
+        """
+        Periods covered by this set but not by the other.
+        """
+        if len(self) == 0:
+            return self
+        return self.intersection(other.complement(self.starts[0], self.ends[-1]))
+
+    def covered_between(self, window_starts, window_ends) -> np.ndarray:
+        """
+        Time covered by the set within each window, e.g. each month of a record.
+
+        Args:
+            window_starts(np.ndarray): Start of each window
+            window_ends(np.ndarray): End of each window
+
+        Returns:
+            np.ndarray: timedelta64[s] covered within each window
+        """
+        return self._covered_until(window_ends) - self._covered_until(window_starts)
+
+    def _covered_until(self, times) -> np.ndarray:
+        """
+        Helper method for the total time covered by the set before each time.
+        """
+        times = np.asarray(times, dtype="datetime64[s]")
+        if len(self) == 0:
+            return np.zeros(len(times), dtype="timedelta64[s]")
+        durations = self.ends - self.starts
+        covered_before = np.concatenate(([np.timedelta64(0, "s")], np.cumsum(durations)))
+        # Last interval starting at or before each time, counted fully before it and partly up to the time
+        index = np.searchsorted(self.starts, times, side="right") - 1
+        clamped = np.maximum(index, 0)
+        covered = covered_before[clamped] + np.minimum(times - self.starts[clamped], durations[clamped])
+        return np.where(index >= 0, covered, np.timedelta64(0, "s"))
+
+    def locate(self, times) -> np.ndarray:
+        """
+        Index of the merged period holding each time, -1 for times outside the set.
+        Used to tell which source periods were merged together.
+
+        Args:
+            times(list[datetime]): The times to look up
+
+        Returns:
+            np.ndarray: Index into periods() of each time
+        """
+        times = np.asarray(times, dtype="datetime64[s]")
+        index = np.searchsorted(self.starts, times, side="right") - 1
+        inside = (index >= 0) & (times <= self.ends[np.maximum(index, 0)]) if len(self) else np.zeros(len(times), dtype=bool)
+        return np.where(inside, index, -1)
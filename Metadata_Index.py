@@ -0,0 +1,336 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import environ, path, makedirs
+import difflib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+
+class Metadata_Index():
+    """
+    Local SQLite index of offices, sites, timeseries and sensors metadata. It is
+    filled in bulk from SIMs (offices and their sites) and AQ (location
+    descriptions), backs the site number autocomplete, and serves Site's
+    metadata calls so a Submit does not have to wait on them.
+
+    Entries older than STALE_AFTER are still served, with a refresh started in
+    the background; only missing entries are fetched while the caller waits.
+
+    Args:
+        db_path(str): The SQLite file, ":memory:" for a throwaway index
+    """
+    DEFAULT_PATH = environ.get("ARS_METADATA_INDEX", path.join(path.expanduser("~"), ".ars", "metadata_index.sqlite3"))
+    STALE_AFTER = 24 * 60 * 60 # seconds
+    # SIMs water science center whose offices and sites are indexed in bulk, unset skips the SIMs bulk fill
+    WSC_ID = environ.get("ARS_WSC_ID")
+
+    # Lower-cased, underscore-free tag names accepted for each field of the SIMs XML
+    OFFICE_ID_TAGS = ("officeid", "office", "id")
+    OFFICE_NAME_TAGS = ("officename", "officenm", "name")
+    SITE_NO_TAGS = ("siteno", "sitenumber", "stationno", "stationnumber")
+    SITE_NAME_TAGS = ("stationnm", "stationname", "sitename", "sitenm", "name")
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str = None) -> None:
+        db_path = db_path or Metadata_Index.DEFAULT_PATH
+        if db_path != ":memory:":
+            try:
+                makedirs(path.dirname(db_path), exist_ok=True)
+            except OSError as e:
+                logging.warning(f"Metadata index falling back to memory, cannot create {db_path}: {e}")
+                db_path = ":memory:"
+
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ars-index")
+        self._refreshing = set()
+        self._create_tables()
+
+    @classmethod
+    def shared(cls):
+        """
+        Return the application-wide index, opening it on first use.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = Metadata_Index()
+            return cls._shared
+
+    def _create_tables(self) -> None:
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS offices (office_id TEXT PRIMARY KEY, name TEXT);
+                CREATE TABLE IF NOT EXISTS sites (site_no TEXT PRIMARY KEY, name TEXT, office_id TEXT, aq_unique_id TEXT, updated REAL);
+                CREATE INDEX IF NOT EXISTS sites_name ON sites (name COLLATE NOCASE);
+                CREATE TABLE IF NOT EXISTS responses (method TEXT, key TEXT, payload TEXT, updated REAL, PRIMARY KEY (method, key));
+                CREATE TABLE IF NOT EXISTS refreshes (source TEXT PRIMARY KEY, updated REAL);
+            """)
+
+    def close(self) -> None:
+        """
+        Stop background refreshes and close the database.
+        """
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._connection.close()
+
+    # ---- Site search ----
+
+    def search(self, text: str, limit: int = 10) -> list:
+        """
+        Search the indexed sites for autocomplete. Site numbers and names starting
+        with the text (or with a word of the name starting with it) come first,
+        then fuzzy matches of the names to make up the limit.
+
+        Args:
+            text(str): What the user typed so far
+            limit(int): The maximum number of matches
+
+        Returns:
+            list[(str, str)]: (site number, station name) matches
+        """
+        text = text.strip()
+        if text == "":
+            return []
+
+        like_text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            matches = self._connection.execute(
+                """SELECT site_no, name FROM sites
+                   WHERE site_no LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\'
+                   ORDER BY site_no LIKE ? ESCAPE '\\' DESC, site_no LIMIT ?""",
+                (like_text + "%", like_text + "%", "% " + like_text + "%", like_text + "%", limit)).fetchall()
+
+        if len(matches) < limit and not text.isdigit():
+            with self._lock:
+                all_sites = dict(self._connection.execute("SELECT name, site_no FROM sites WHERE name IS NOT NULL").fetchall())
+            found = {site_no for site_no, _ in matches}
+            lowered_names = {name.lower(): name for name in all_sites}
+            for close_name in difflib.get_close_matches(text.lower(), list(lowered_names), n=limit, cutoff=0.5):
+                name = lowered_names[close_name]
+                if all_sites[name] not in found and len(matches) < limit:
+                    matches.append((all_sites[name], name))
+                    found.add(all_sites[name])
+
+        return [tuple(match) for match in matches]
+
+    def upsert_sites(self, sites: list) -> None:
+        """
+        Add or update indexed sites. Fields given as None keep their indexed value.
+
+        Args:
+            sites(list[dict]): Entries with site_no and any of name, office_id, aq_unique_id
+        """
+        now = time.time()
+        rows = [(site["site_no"], site.get("name"), site.get("office_id"), site.get("aq_unique_id"), now) for site in sites]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                """INSERT INTO sites (site_no, name, office_id, aq_unique_id, updated) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(site_no) DO UPDATE SET
+                       name = COALESCE(excluded.name, sites.name),
+                       office_id = COALESCE(excluded.office_id, sites.office_id),
+                       aq_unique_id = COALESCE(excluded.aq_unique_id, sites.aq_unique_id),
+                       updated = excluded.updated""", rows)
+
+    # ---- Cached metadata calls ----
+
+    def cached_call(self, method: str, key: str, fetch):
+        """
+        Serve a metadata call from the index. A missing entry is fetched now,
+        a stale one is returned as is and refreshed in the background.
+
+        Args:
+            method(str): The name of the call, e.g. "get_sensors"
+            key(str): The call's arguments flattened to a string
+            fetch(callable): Zero-argument callable making the real call, its result must be JSON serializable
+
+        Returns:
+            The (possibly cached) result of fetch
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT payload, updated FROM responses WHERE method = ? AND key = ?", (method, key)).fetchone()
+
+        if row is None:
+            return self._fetch_and_store(method, key, fetch)
+
+        payload, updated = row
+        if time.time() - updated > Metadata_Index.STALE_AFTER:
+            self._refresh_in_background((method, key), lambda: self._fetch_and_store(method, key, fetch))
+        return json.loads(payload)
+
+    def _fetch_and_store(self, method: str, key: str, fetch):
+        result = fetch()
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses (method, key, payload, updated) VALUES (?, ?, ?, ?)",
+                                     (method, key, json.dumps(result), time.time()))
+        return result
+
+    def get_site_info(self, site_no: str, fetch):
+        """
+        Serve get_site_info from the indexed sites, falling back to fetch (and
+        indexing its result) for sites without a known AQ unique ID.
+
+        Args:
+            site_no(str): The 8- or 15-digit site number assigned associated with NWIS
+            fetch(callable): Zero-argument callable making the real get_site_info call
+
+        Returns:
+            (str, str): A tuple consisting of the site name and its unique AQ ID
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT name, aq_unique_id FROM sites WHERE site_no = ?", (site_no,)).fetchone()
+        if row is not None and row[0] and row[1]:
+            return (row[0], row[1])
+
+        site_name, unique_id = fetch()
+        self.upsert_sites([{"site_no": site_no, "name": site_name, "aq_unique_id": unique_id}])
+        return (site_name, unique_id)
+
+    # ---- Bulk refresh ----
+
+    def is_stale(self, source: str) -> bool:
+        """
+        Check whether a bulk source ("sims" or "aq") has not been refreshed within STALE_AFTER.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT updated FROM refreshes WHERE source = ?", (source,)).fetchone()
+        return row is None or time.time() - row[0] > Metadata_Index.STALE_AFTER
+
+    def _mark_refreshed(self, source: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO refreshes (source, updated) VALUES (?, ?)", (source, time.time()))
+
+    def refresh_from_sims(self, sims_session, wsc_id) -> None:
+        """
+        Index every office of a water science center and the sites of each office.
+
+        Args:
+            sims_session(SynchronousSIMsAPISession): The session to SIMs
+            wsc_id(int): The unique ID of the WSC
+        """
+        offices = Metadata_Index._parse_xml_records(sims_session.get_office_info_by_wsc(wsc_id),
+                                                    {"office_id": Metadata_Index.OFFICE_ID_TAGS, "name": Metadata_Index.OFFICE_NAME_TAGS},
+                                                    "office_id")
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO offices (office_id, name) VALUES (?, ?)",
+                                         [(office["office_id"], office.get("name")) for office in offices])
+
+        for office in offices:
+            sites = Metadata_Index._parse_xml_records(sims_session.get_sites_by_office(wsc_id, office["office_id"]),
+                                                      {"site_no": Metadata_Index.SITE_NO_TAGS, "name": Metadata_Index.SITE_NAME_TAGS},
+                                                      "site_no")
+            for site in sites:
+                site["office_id"] = office["office_id"]
+            self.upsert_sites(sites)
+
+        self._mark_refreshed("sims")
+
+    def refresh_from_aq(self, aq_session) -> None:
+        """
+        Index the site names and AQ unique IDs of every AQ location description.
+
+        Args:
+            aq_session(SynchronousAquariusAPISession): The session to AQ
+        """
+        response = aq_session.get_location_descriptions()
+        sites = [{"site_no": location["Identifier"], "name": location.get("Name"), "aq_unique_id": location.get("UniqueId")}
+                 for location in response.get("LocationDescriptions", []) if location.get("Identifier")]
+        self.upsert_sites(sites)
+        self._mark_refreshed("aq")
+
+    def refresh_stale_sources_in_background(self, aq_session, sims_session) -> None:
+        """
+        Start a background bulk refresh of whichever sources are stale. The SIMs
+        source is only used when WSC_ID is configured.
+        """
+        if Metadata_Index.WSC_ID and self.is_stale("sims"):
+            self._refresh_in_background("sims", lambda: self.refresh_from_sims(sims_session, Metadata_Index.WSC_ID))
+        if self.is_stale("aq"):
+            self._refresh_in_background("aq", lambda: self.refresh_from_aq(aq_session))
+
+    def _refresh_in_background(self, refresh_key, refresh) -> None:
+        """
+        Helper method to queue a refresh unless the same one is already queued.
+        Failures are logged, the stale entries keep being served meanwhile.
+        """
+        with self._lock:
+            if refresh_key in self._refreshing:
+                return
+            self._refreshing.add(refresh_key)
+
+        def run_refresh():
+            try:
+                refresh()
+            except Exception as e:
+                logging.warning(f"Metadata index refresh {refresh_key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(refresh_key)
+
+        self._refresher.submit(run_refresh)
+
+    # ---- Tolerant XML parsing ----
+
+    @staticmethod
+    def _normalize_tag(tag: str) -> str:
+        return tag.rsplit("}", 1)[-1].replace("_", "").replace("-", "").lower()
+
+    @staticmethod
+    def _parse_xml(xml_text):
+        """
+        Helper method to parse SIMs XML that is not always well formed: leading
+        junk before the root, control characters and bare ampersands are cleaned
+        up before a second attempt.
+        """
+        if isinstance(xml_text, bytes):
+            xml_text = xml_text.decode("utf-8", errors="replace")
+        try:
+            return ET.fromstring(xml_text)
+        except ET.ParseError:
+            cleaned = xml_text[xml_text.find("<"):] if "<" in xml_text else xml_text
+            cleaned = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", cleaned)
+            cleaned = re.sub(r"&(?!(?:[a-zA-Z]+|#\d+|#x[0-9a-fA-F]+);)", "&amp;", cleaned)
+            return ET.fromstring(cleaned)
+
+    @staticmethod
+    def _parse_xml_records(xml_text, fields: dict, required_field: str) -> list:
+        """
+        Helper method to pull records out of SIMs XML without relying on its exact
+        layout: every element with a child (or attribute) matching the required
+        field's accepted tags becomes a record.
+
+        Args:
+            xml_text(str): The XML response
+            fields(dict[str: tuple]): Record field name to its accepted normalized tags, in preference order
+            required_field(str): The field every record must have
+
+        Returns:
+            list[dict]: The records found
+        """
+        root = Metadata_Index._parse_xml(xml_text)
+        records = []
+        seen = set()
+        for element in root.iter():
+            values = {Metadata_Index._normalize_tag(name): value.strip() for name, value in element.attrib.items() if value}
+            for child in element:
+                if len(child) == 0 and child.text and child.text.strip():
+                    values.setdefault(Metadata_Index._normalize_tag(child.tag), child.text.strip())
+
+            record = {}
+            for field, accepted_tags in fields.items():
+                for tag in accepted_tags:
+                    if tag in values:
+                        record[field] = values[tag]
+                        break
+
+            if required_field in record and record[required_field] not in seen:
+                seen.add(record[required_field])
+                records.append(record)
+        return records
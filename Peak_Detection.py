@@ -0,0 +1,234 @@
+from datetime import datetime, timedelta
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import Dataset
+
+
+class Peak_Detection():
+    """
+    Peaks of a gage height dataset's unit values: local maxima that are the
+    highest unit value within PEAK_WINDOW on either side and rise at least a
+    prominence above the lowest unit value within PROMINENCE_WINDOW on both
+    sides. Candidates are found with sliding-window reductions over the whole
+    dataset, their prominences from the dataset's range extremes.
+
+    On a plateau the first point is the peak. Gaps are never peaks.
+
+    Args:
+        dataset(Dataset.Dataset): The gathered dataset
+        prominence(float): Minimum rise of a peak above its surroundings, in feet, defaults to MIN_PROMINENCE
+    """
+    # A peak is the highest unit value within this on either side
+    PEAK_WINDOW = timedelta(hours=12)
+    # The drop on both sides of a peak is looked for within this
+    PROMINENCE_WINDOW = timedelta(days=3)
+    MIN_PROMINENCE = 0.2
+
+    def __init__(self, dataset, prominence: float = None) -> None:
+        self.dataset = dataset
+        self.min_prominence = Peak_Detection.MIN_PROMINENCE if prominence is None else prominence
+        self.peak_indices = np.array([], dtype=np.int64)
+        self.prominences = np.array([])
+        if dataset.has_data() and len(dataset.timestamps) > 1:
+            candidates = self._local_maxima()
+            prominences = self._prominences(candidates)
+            stands_out = prominences >= self.min_prominence - 1e-9
+            self.peak_indices = candidates[stands_out]
+            self.prominences = prominences[stands_out]
+
+    def _half_window_points(self, window: timedelta) -> int:
+        """
+        Helper method to convert a time window to a number of points from the
+        dataset's typical spacing between unit values.
+        """
+        spacing = float(np.median(np.diff(self.dataset.timestamps).astype(np.int64)))
+        return max(1, int(round(window.total_seconds() / max(spacing, 1.0))))
+
+    def _local_maxima(self) -> np.ndarray:
+        """
+        Helper method to find the points equal to the maximum of the points
+        within PEAK_WINDOW around them and above every point shortly before them.
+        """
+        values = self.dataset.values
+        keys = np.where(np.isnan(values), -np.inf, values)
+        half = min(self._half_window_points(Peak_Detection.PEAK_WINDOW), len(keys))
+
+        centered_max = sliding_window_view(np.pad(keys, half, constant_values=-np.inf), 2 * half + 1).max(axis=1)
+        preceding_max = sliding_window_view(np.pad(keys, (half, 0), constant_values=-np.inf)[:-1], half).max(axis=1)
+        return np.flatnonzero(np.isfinite(keys) & (keys >= centered_max) & (keys > preceding_max))
+
+    def _prominences(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Helper method to measure how far each candidate rises above the higher of
+        the lowest unit values before and after it within PROMINENCE_WINDOW.
+        """
+        timestamps = self.dataset.timestamps
+        window = np.timedelta64(Peak_Detection.PROMINENCE_WINDOW, "s")
+        firsts = np.searchsorted(timestamps, timestamps[candidates] - window, side="left")
+        lasts = np.searchsorted(timestamps, timestamps[candidates] + window, side="right") - 1
+
+        prominences = np.zeros(len(candidates))
+        for position, (index, first, last) in enumerate(zip(candidates.tolist(), firsts.tolist(), lasts.tolist())):
+            bases = [self.dataset.unit_values.value_at(base_index)
+                     for base_index in (self.dataset.range_extremes.min_index(first, index - 1), self.dataset.range_extremes.min_index(index + 1, last))
+                     if base_index is not None]
+            if len(bases) > 0:
+                prominences[position] = self.dataset.unit_values.value_at(index) - max(bases)
+        return prominences
+
+    def peaks_between(self, window_start: datetime, window_end: datetime) -> list:
+        """
+        The peaks within a window, e.g. between two visits.
+
+        Args:
+            window_start(datetime): Start of the window, inclusive
+            window_end(datetime): End of the window, inclusive
+
+        Returns:
+            list[Dataset.Data_Point]: The peaks in time order
+        """
+        peak_times = self.dataset.timestamps[self.peak_indices]
+        in_window = (peak_times >= np.datetime64(window_start, "s")) & (peak_times <= np.datetime64(window_end, "s"))
+        return [Dataset.Data_Point(self.dataset.timestamps[index].astype(object), self.dataset.unit_values.value_at(index), None)
+                for index in self.peak_indices[in_window].tolist()]
+
+    def governing_peak(self, window_start: datetime, window_end: datetime, mark_datetime: datetime = None):
+        """
+        The recorder peak a peak verification mark is compared to: the peak
+        closest in time to the mark if it was timed, the highest peak of the
+        window otherwise. Without any peak standing out, e.g. when the stage was
+        still rising at the visit, the window's maximum unit value.
+
+        Args:
+            window_start(datetime): Start of the window, inclusive
+            window_end(datetime): End of the window, inclusive
+            mark_datetime(datetime): When the mark was left, None for marks without a time such as most CSG marks
+
+        Returns:
+            Dataset.Data_Point: The recorder peak, None if the window holds no unit values
+        """
+        peaks = self.peaks_between(window_start, window_end)
+        if len(peaks) == 0:
+            return self.dataset.extremes_between(window_start, window_end)[0]
+        if mark_datetime is None:
+            # max keeps the first of equal peaks
+            return max(peaks, key=lambda peak: peak.value)
+        return min(peaks, key=lambda peak: abs(peak.datetime - mark_datetime))
+
+
+class Peak_Verification():
+    """
+    A peak verification mark (HWM or CSG) matched to the governing recorder peak
+    between the previous visit and the visit it was read on.
+
+    Args:
+        field_visit(Field_Visit.Field_Visit): The visit the mark was read on
+        mark(Reading.Reading): The mark
+        recorder_peak(Dataset.Data_Point): The governing recorder peak, None if there are no unit values
+        discharge_percent_difference(float): Difference of the discharge at the recorder peak from the discharge at the mark's stage, in percent of the peak discharge, None if not computed
+    """
+    STAGE_CRITERION = 0.05
+    DISCHARGE_PERCENT_CRITERION = 8.0
+    # Span of stage below the peak used to estimate the stage-discharge slope at the peak
+    RATING_SLOPE_SPAN = 0.5
+
+    def __init__(self, field_visit, mark, recorder_peak, discharge_percent_difference: float = None) -> None:
+        self.field_visit = field_visit
+        self.mark = mark
+        self.recorder_peak = recorder_peak
+        self.stage_difference = None
+        self.discharge_percent_difference = discharge_percent_difference
+        if recorder_peak is not None:
+            self.stage_difference = round(recorder_peak.value - mark.value, 3)
+
+    @property
+    def verified(self) -> bool:
+        """
+        Whether the mark is within STAGE_CRITERION of the recorder peak and, if
+        discharge was compared, within DISCHARGE_PERCENT_CRITERION of its discharge.
+        None when there is no recorder peak to compare to.
+        """
+        if self.stage_difference is None:
+            return None
+        within_stage = abs(self.stage_difference) <= Peak_Verification.STAGE_CRITERION + 1e-9
+        within_discharge = self.discharge_percent_difference is None or abs(self.discharge_percent_difference) <= Peak_Verification.DISCHARGE_PERCENT_CRITERION + 1e-9
+        return within_stage and within_discharge
+
+    @staticmethod
+    def _discharge_percent_difference(gh_dataset, q_dataset, recorder_peak, mark_value: float, window_start: datetime, window_end: datetime) -> float:
+        """
+        Helper method to estimate the percent difference of the computed discharge
+        at the recorder peak from the discharge at the mark's stage, using the
+        slope of the window's own gage height-discharge pairs near the peak.
+        """
+        peak_discharge = q_dataset.interpolate_at(recorder_peak.datetime)
+        if peak_discharge is None or peak_discharge <= 0:
+            return None
+
+        in_window = (gh_dataset.timestamps >= np.datetime64(window_start, "s")) & (gh_dataset.timestamps <= np.datetime64(window_end, "s"))
+        gh_values = gh_dataset.values[in_window]
+        q_values = q_dataset.values
+        q_present = ~np.isnan(q_values)
+        if np.count_nonzero(q_present) < 2:
+            return None
+        discharges = np.interp(gh_dataset.timestamps[in_window].astype(np.int64), q_dataset.timestamps[q_present].astype(np.int64), q_values[q_present])
+        near_peak = ~np.isnan(gh_values) & (gh_values >= recorder_peak.value - Peak_Verification.RATING_SLOPE_SPAN)
+        if len(np.unique(gh_values[near_peak])) < 2:
+            return None
+
+        slope = np.polyfit(gh_values[near_peak], discharges[near_peak], 1)[0]
+        mark_discharge = peak_discharge + slope * (mark_value - recorder_peak.value)
+        return round(100.0 * (peak_discharge - mark_discharge) / peak_discharge, 1)
+
+    @staticmethod
+    def match_marks(field_visit_list: list, gh_ts_list: list, q_ts = None) -> list:
+        """
+        Match every peak verification mark of the visits to the governing recorder
+        peak of its gage height timeseries between the previous visit and the
+        visit it was read on, the first visit's window starting with the record.
+
+        Args:
+            field_visit_list(list[Field_Visit.Field_Visit]): List of field visits during record period
+            gh_ts_list(list[Timeseries.Generic_Timeseries]): List of gage height timeseries, marks matched by sublocation when there are several
+            q_ts(Timeseries.Generic_Timeseries): The primary discharge timeseries, None to only compare stage
+
+        Returns:
+            list[Peak_Verification]: One entry per mark, in visit order
+        """
+        detections = {}
+        verifications = []
+        previous_visit_date = None
+        for field_visit in sorted(field_visit_list, key=lambda visit: visit.date):
+            for mark in field_visit.high_water_marks:
+                gh_ts = Peak_Verification._mark_timeseries(mark, gh_ts_list)
+                gh_dataset = None if gh_ts is None else gh_ts.record_dataset
+                if gh_dataset is None or not gh_dataset.has_data():
+                    verifications.append(Peak_Verification(field_visit, mark, None))
+                    continue
+
+                window_start = previous_visit_date or gh_dataset.dataset_start_date
+                window_end = min(field_visit.date + timedelta(days=1), gh_dataset.dataset_end_date)
+                if id(gh_dataset) not in detections:
+                    detections[id(gh_dataset)] = Peak_Detection(gh_dataset)
+                recorder_peak = detections[id(gh_dataset)].governing_peak(window_start, window_end, mark.datetime)
+
+                discharge_percent_difference = None
+                q_dataset = None if q_ts is None else q_ts.record_dataset
+                if recorder_peak is not None and q_dataset is not None and q_dataset.has_data():
+                    discharge_percent_difference = Peak_Verification._discharge_percent_difference(gh_dataset, q_dataset, recorder_peak, mark.value, window_start, window_end)
+                verifications.append(Peak_Verification(field_visit, mark, recorder_peak, discharge_percent_difference))
+            previous_visit_date = field_visit.date
+        return verifications
+
+    @staticmethod
+    def _mark_timeseries(mark, gh_ts_list: list):
+        """
+        Helper method to pick the gage height timeseries a mark is compared to,
+        the one of the mark's sublocation when there are several.
+        """
+        if len(gh_ts_list) == 1:
+            return gh_ts_list[0]
+        for gh_ts in gh_ts_list:
+            if mark.sublocation == gh_ts.TS_sublocation:
+                return gh_ts
+        return None
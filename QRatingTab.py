@@ -54,7 +54,7 @@ class QRatingTab(Generic_Tab):
         
         self.setup_section("Shift Table Section Preview",
                            lambda: User_Inputs.site._populate_rating_models(User_Inputs.start_date, User_Inputs.end_date),
-                           lambda: User_Inputs.record.create_shift_curves_section(User_Inputs.site.rating_model.ratings_list),
+                           lambda: User_Inputs.record.create_shift_curves_section(User_Inputs.site.rating_model.ratings_list, User_Inputs.site.gage_height_timeseries_list, User_Inputs.site.field_visits),
                            "shift_section",
                            1000)
     
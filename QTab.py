@@ -41,10 +41,16 @@ class QTab(Generic_Tab):
                                             User_Inputs.site.discharge_timeseries_list, 
                                             User_Inputs.q_tables_list,
                                             self.layout,
-                                            self.policy)
+                                            self.policy,
+                                            copy_paste_is_estimate=True)
         
         self.q_quality_section.setup_quality_tables()
 
+        self.setup_section("Record Coverage Section Preview",
+                           self._update_q_ts,
+                           lambda: User_Inputs.record.create_q_coverage_section(User_Inputs.site.discharge_timeseries_list),
+                           "q_coverage_section")
+
         self.setup_section("Discharge Gaps Section Preview",
                                 self._update_q_ts,
                                 lambda: User_Inputs.record.create_q_data_gaps_section(User_Inputs.site.discharge_timeseries_list[0].record_dataset.gaps),
@@ -52,7 +58,7 @@ class QTab(Generic_Tab):
 
         self.setup_section("Discharge Estimates Section Preview",
                            self._update_q_ts,
-                           lambda: User_Inputs.record.create_estimate_section(User_Inputs.site.discharge_timeseries_list[0].record_dataset.general_corrections),
+                           lambda: User_Inputs.record.create_estimate_section(User_Inputs.site.discharge_timeseries_list[0].record_dataset.general_corrections, User_Inputs.site.discharge_timeseries_list[0].record_dataset),
                            "estimates_section")
         
         self.setup_section("Backwater Section Preview",
@@ -79,7 +85,8 @@ class QTab(Generic_Tab):
         self.hydro_comp_text_box.setAlignment(QtCore.Qt.AlignmentFlag.AlignTop)
         self.hydro_comp_text_box.textChanged.connect(self.update_user_inputs)
 
-        if User_Inputs.successfulSubmissionCnt > 1:
+        # Kept from a previous submission or restored from a snapshot
+        if User_Inputs.successfulSubmissionCnt > 1 or User_Inputs.hydro_comp != "":
             self.hydro_comp_text_box.setText(User_Inputs.hydro_comp)
 
         self.layout.addRow(self.hydro_comp_text_box)
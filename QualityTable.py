@@ -57,6 +57,52 @@ class Quality_Table(QTableWidget):
         new_row = quality_table_row(start_date, end_date, quality_combo, comment_item)
         self.data_rows.append(new_row)
 
+    def add_entry_with_values(self, period_start: date, period_end: date, quality: str, comment: str):
+        """
+        Add a row filled in with the provided values, e.g. when restoring a snapshot.
+        """
+        self.add_entry_gh()
+        new_row = self.data_rows[-1]
+        new_row.start_date.setDate(period_start)
+        new_row.end_date.setDate(period_end)
+        new_row.quality.setCurrentText(quality)
+        new_row.comment.setText(comment)
+
+    def prefill_from_coverage(self, coverage):
+        """
+        Add the rows suggested by a record's coverage, one per run of months with
+        the same suggested quality, unless the table already has rows.
+
+        Args:
+            coverage(Coverage): The coverage of the timeseries the table rates
+        """
+        if len(self.data_rows) > 0:
+            return
+        for period_start, period_end, quality, comment in coverage.suggested_quality_periods():
+            self.add_entry_with_values(period_start, period_end, quality, comment)
+
+    def clear_entries(self):
+        """
+        Remove every row of the table.
+        """
+        self.setRowCount(0)
+        self.data_rows.clear()
+
+    def return_row_values(self) -> list:
+        """
+        Return the rows as plain [period start, period end, quality, comment] values
+        with ISO formatted dates.
+        """
+        row_values = []
+        for data_row in self.data_rows:
+            period_start_Qdate = data_row.start_date.date()
+            period_end_Qdate = data_row.end_date.date()
+            row_values.append([date(period_start_Qdate.year(), period_start_Qdate.month(), period_start_Qdate.day()).isoformat(),
+                               date(period_end_Qdate.year(), period_end_Qdate.month(), period_end_Qdate.day()).isoformat(),
+                               data_row.quality.currentText(),
+                               data_row.comment.text()])
+        return row_values
+
     def create_remove_button(self):
         remove_button = QPushButton("Remove Entry")
         remove_button.setFixedWidth(400)
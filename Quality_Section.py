@@ -1,14 +1,17 @@
 from PyQt5.QtWidgets import QLabel
+from Coverage import Coverage
 from QualityTable import Quality_Table
 
 
 class Quality_Section():
-    def __init__(self, label, ts_list, tables_list, layout, size_policy):
+    def __init__(self, label, ts_list, tables_list, layout, size_policy, copy_paste_is_estimate: bool = False):
         self.layout = layout
         self.policy = size_policy
         self.label = label
         self.ts_list = ts_list
         self.tables_list = tables_list
+        # Copy & paste corrections are estimates on discharge, backup fills on gage height
+        self.copy_paste_is_estimate = copy_paste_is_estimate
 
     def setup_quality_tables(self):
         """
@@ -68,11 +71,24 @@ class Quality_Section():
         table_label.setSizePolicy(self.policy)
         self.layout.addRow(table_label)
 
+    def _prefill_table(self, table, ts):
+        """
+        Pre-fill a new table with the quality ratings suggested by the timeseries'
+        record coverage.
+
+        Args:
+            table (QualityTable): The new, empty table
+            ts (Generic_Timeseries): The timeseries the table rates
+        """
+        if ts.record_dataset is not None:
+            table.prefill_from_coverage(Coverage.from_dataset(ts.record_dataset, self.copy_paste_is_estimate))
+
     def _add_one_table(self):
         self._add_label(self.label)
 
         gh_table = Quality_Table("")
         gh_table.setSizePolicy(self.policy)
+        self._prefill_table(gh_table, self.ts_list[0])
         self.tables_list.append(gh_table)
         
         self._add_buttons(gh_table)
@@ -82,6 +98,7 @@ class Quality_Section():
             self._add_label(f"{self.label} ({gh_ts.TS_identifier})")
 
             gh_table = Quality_Table(f"{gh_ts.TS_sublocation}")            
+            self._prefill_table(gh_table, gh_ts)
             self.tables_list.append(gh_table)
             self._add_buttons(gh_table)
     
@@ -0,0 +1,140 @@
+import numpy as np
+from Compressed_Values import Compressed_Values
+
+
+class Range_Extremes():
+    """
+    Block sparse tables over a dataset's unit values answering the position of
+    the maximum and minimum of any window of points in O(1). The points are cut
+    into blocks of BLOCK_SIZE; the extreme of every block is kept and a sparse
+    table over the blocks answers the run of whole blocks in a window, the
+    partial blocks at its ends are scanned. Memory stays O(n): the scaled
+    values plus O(n / BLOCK_SIZE * log n) for the tables.
+
+    Ties keep the earliest point, matching the first occurrence reported by
+    Dataset._assess_max/_assess_min. Gaps never win.
+
+    Args:
+        scaled(np.ndarray): Scaled integer value of every point, as from Compressed_Values.scaled()
+    """
+    BLOCK_SIZE = 64
+    MIN_SENTINEL = np.iinfo(np.int32).max
+
+    def __init__(self, scaled: np.ndarray) -> None:
+        self.length = len(scaled)
+        # MISSING is the smallest int32, so gaps already lose every maximum comparison
+        self._keys = np.asarray(scaled, dtype=np.int32)
+        block_count = -(-self.length // Range_Extremes.BLOCK_SIZE)
+        padded = np.full(block_count * Range_Extremes.BLOCK_SIZE, Compressed_Values.MISSING, dtype=np.int32)
+        padded[:self.length] = self._keys
+        blocks = padded.reshape(block_count, Range_Extremes.BLOCK_SIZE)
+        block_starts = np.arange(block_count, dtype=np.int64) * Range_Extremes.BLOCK_SIZE
+
+        # argmax/argmin return the first occurrence, so ties keep the earlier point within a block
+        self._block_max = (block_starts + np.argmax(blocks, axis=1)).astype(np.int32)
+        self._block_min = (block_starts + np.argmin(Range_Extremes._min_keys(blocks), axis=1)).astype(np.int32)
+        self._max_table = Range_Extremes._build(self._keys[self._block_max], np.greater)
+        self._min_table = Range_Extremes._build(Range_Extremes._min_keys(self._keys[self._block_min]), np.less)
+
+    @staticmethod
+    def _min_keys(keys: np.ndarray) -> np.ndarray:
+        """
+        Helper method to map gaps to the largest int32, so they lose every minimum comparison.
+        """
+        return np.where(keys == Compressed_Values.MISSING, Range_Extremes.MIN_SENTINEL, keys)
+
+    @staticmethod
+    def _build(keys: np.ndarray, better) -> list:
+        """
+        Helper method to build the levels of one sparse table over the block extremes.
+        Each level k holds, for every block, the position of the best of the 2^k
+        blocks starting there.
+        """
+        length = len(keys)
+        levels = [np.arange(length, dtype=np.int32)]
+        span = 1
+        while 2 * span <= length:
+            previous = levels[-1]
+            left = previous[0:length - 2 * span + 1]
+            right = previous[span:length - span + 1]
+            # Strictly better only, so ties keep the earlier block
+            levels.append(np.where(better(keys[right], keys[left]), right, left))
+            span *= 2
+        return levels
+
+    def _scan(self, first: int, last: int, maximum: bool) -> int:
+        """
+        Helper method to find the extreme of points first..last (inclusive) by scanning them.
+        """
+        keys = self._keys[first:last + 1]
+        if maximum:
+            return first + int(np.argmax(keys))
+        return first + int(np.argmin(Range_Extremes._min_keys(keys)))
+
+    def _query(self, first: int, last: int, maximum: bool) -> int:
+        """
+        Helper method to find the extreme of points first..last (inclusive): the
+        partial blocks at the ends are scanned, the whole blocks in between come
+        from two overlapping runs of the sparse table.
+        """
+        first = max(int(first), 0)
+        last = min(int(last), self.length - 1)
+        if first > last:
+            return None
+        better = np.greater if maximum else np.less
+        key = (lambda index: self._keys[index]) if maximum else (lambda index: Range_Extremes._min_keys(self._keys[index]))
+
+        first_block = first // Range_Extremes.BLOCK_SIZE
+        last_block = last // Range_Extremes.BLOCK_SIZE
+        if first_block == last_block:
+            candidates = [self._scan(first, last, maximum)]
+        else:
+            candidates = [self._scan(first, (first_block + 1) * Range_Extremes.BLOCK_SIZE - 1, maximum)]
+            if first_block + 1 < last_block:
+                table = self._max_table if maximum else self._min_table
+                block_extremes = self._block_max if maximum else self._block_min
+                low, high = first_block + 1, last_block - 1
+                level = int(high - low + 1).bit_length() - 1
+                left = int(block_extremes[table[level][low]])
+                right = int(block_extremes[table[level][high - (1 << level) + 1]])
+                candidates.append(right if better(key(right), key(left)) else left)
+            candidates.append(self._scan(last_block * Range_Extremes.BLOCK_SIZE, last, maximum))
+
+        # Candidates are in time order, strictly better only keeps the earliest of tied points
+        index = candidates[0]
+        for candidate in candidates[1:]:
+            if better(key(candidate), key(index)):
+                index = candidate
+        return None if self._keys[index] == Compressed_Values.MISSING else index
+
+    def max_index(self, first: int, last: int) -> int:
+        """
+        Index of the first maximum of points first..last (inclusive).
+
+        Args:
+            first(int): Index of the window's first point
+            last(int): Index of the window's last point
+
+        Returns:
+            int: The index, None if the window is empty or only holds gaps
+        """
+        return self._query(first, last, True)
+
+    def min_index(self, first: int, last: int) -> int:
+        """
+        Index of the first minimum of points first..last (inclusive).
+
+        Args:
+            first(int): Index of the window's first point
+            last(int): Index of the window's last point
+
+        Returns:
+            int: The index, None if the window is empty or only holds gaps
+        """
+        return self._query(first, last, False)
+
+    def count_equal(self, index: int, first: int, last: int) -> int:
+        """
+        Number of points of first..last (inclusive) holding exactly the value of the point at index.
+        """
+        return int(np.count_nonzero(self._keys[first:last + 1] == self._keys[index]))
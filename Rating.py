@@ -79,6 +79,9 @@ class Rating():
         self.start_datetime = start_datetime
         self.end_datetime = end_datetime
         self.shift_curve_list = []
+        self.rating_type = ""
+        self.base_rating_points = []
+        self.offset_points = []
         self.api_session = api_session or SynchronousAquariusAPISession()
     
     def _append_shift_curves_to_list_from_json(self, json_shifts_list) -> None:
@@ -99,29 +102,47 @@ class Rating():
                 shift_points_list.append([float(shift_point["InputValue"]), float(shift_point["Shift"])])
             shift_comment = shift['PeriodOfApplicability']["Remarks"]
             shift_curve_obj = Shift_Curve(shift_start_datetime, shift_end_datetime, shift_points_list, shift_comment)
-            shift_curve_obj.gather_records_info()
             
             if index > 0:
                 shift_curve_obj.previous = self.shift_curve_list[index-1]
-                self.shift_curve_list[index-1].previous = shift_curve_obj
+                self.shift_curve_list[index-1].next = shift_curve_obj
 
+            # Linked first so the input point gage heights are compared with the previous shift's
+            shift_curve_obj.gather_records_info()
             self.shift_curve_list.append(shift_curve_obj)
             
     
+    def _append_base_rating_from_json(self, rating_curve_json) -> None:
+        """
+        Helper method to keep the rating's base rating table and offsets so discharge can be rated
+        locally, e.g. by Shift_Engine. Both stay empty when the response does not carry them.
+        
+        Args:
+            rating_curve_json(json): The rating curve's entry of the rating model response
+        """
+        self.rating_type = rating_curve_json.get("Type", "")
+        for rating_point in rating_curve_json.get("BaseRatingTable", []):
+            self.base_rating_points.append([float(rating_point["InputValue"]), float(rating_point["OutputValue"])])
+        for offset_point in rating_curve_json.get("Offsets", []):
+            self.offset_points.append([float(offset_point["InputValue"]), float(offset_point["Offset"])])
+    
     def populate_shift_list(self, rating_model_response_info = None) -> None:
         """
         Method to populated the rating's list of shift curves and all their information pertinent to a surface water reocord.
+        The base rating table and offsets are kept along with them.
         
         Args:
             rating_model_response_info(json): The AQ response containing info on the discharge rating model.
         """
         if rating_model_response_info == None:
-            self.rating_model_repsonse = self.api_session.get_discharge_rating_model_info(self.rating_model_id)          
+            # Concurrent fallbacks for curves of the same model share one request through the session
+            rating_model_response_info = self.api_session.get_discharge_rating_model_info(self.rating_model_id)
         
         shifts_list = []
         for rating_curve in rating_model_response_info['RatingCurves']:
             if rating_curve["Id"] == self.rating_id:
                 shifts_list = rating_curve["Shifts"]
+                self._append_base_rating_from_json(rating_curve)
                 
         self._append_shift_curves_to_list_from_json(shifts_list)
 
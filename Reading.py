@@ -28,7 +28,7 @@ class Reading():
         self.comment = comment  
     
     @staticmethod
-    def _retrieve_bordering_dataset(reading_datetime, ts_id: str) -> Dataset.Dataset:
+    def _retrieve_bordering_dataset(reading_datetime, ts_id: str, api_session = None) -> Dataset.Dataset:
         """
         Helper method to retrieve the timeseries dataset surrounding a particular reading for later comparison to determine
         the recorder unit value (uv) prior the reading and then after the reading
@@ -36,63 +36,32 @@ class Reading():
         Args:
             reading_datetime(datetime.datetime): Datetime of when the reading occurred
             ts_id(str): Unique timeseries ID for which the reading is being compared to
+            api_session(SynchronousAquariusAPISession): The api_session, if provided, that connects to the NWIS family of web services
         """
         ONE_DAY = 1
         
         one_day_timedelta = timedelta(days=ONE_DAY)
         day_prior = reading_datetime - one_day_timedelta
         day_after = reading_datetime + one_day_timedelta
-        bordering_dataset = Dataset.Dataset(ts_id, day_prior, day_after)
+        bordering_dataset = Dataset.Dataset(ts_id, day_prior, day_after, api_session)
         bordering_dataset._gather_data()
         return bordering_dataset
     
     @staticmethod
-    def _return_recorder_data_point_prior_to_reading(reading_datetime, bordering_dataset: Dataset.Dataset) -> Dataset.Data_Point:
+    def _return_discrepancy(reading_value: float, interpolated_value: float) -> float:
         """
-        Helper method to determine a Data_Point object representing the unit value prior to the reading.
+        Helper method to determine the discrepancy of a reading provided its value and the
+        recorder value interpolated at the reading's datetime.
         
         Args:
-            reading_datetime(datetime.datetime): Datetime of when the reading occurred
-             bordering_dataset(Dataset.Dataset): Dataset containing data_points for the day prior, day of reading, and day after the reading
-             
-        Return:
-            prior_pt(Dataset.Data_Point): Data_Point object for the unit value occurring just prior to the reading
-        """
-        DAYS_IN_YEAR = 365
-        
-        shortest_duration = timedelta(days=DAYS_IN_YEAR)
-        prior_pt = None
-        
-        for pt in bordering_dataset.data:
-            if (reading_datetime - pt.datetime) < shortest_duration and (reading_datetime - pt.datetime) >= timedelta(seconds=0):
-                shortest_duration = reading_datetime - pt.datetime
-                prior_pt = pt
+            reading_value(float): Value of the reading
+            interpolated_value(float): The recorder unit values interpolated at the reading's datetime, None if not bordered by unit values
         
-        return prior_pt
-    
-    @staticmethod
-    def _return_discrepancy(reading_datetime, reading_value: float, prior_uv: Dataset.Data_Point, next_uv: Dataset.Data_Point) -> float:
-        """
-        Helper method to determine the discrepancy of a reading provided its datetime, value, a Data_Point representation of
-        the previous occurring unit value, data_point representation of the next unit value.
-        
-        Args:
-            reading_datetime(datetime.datetime): Datetime of when the reading occurred
-            readign_value(float): The reading's value
-            prior_uv(Dataset.Data_Point): The Data_Point object representation of the unit value occurring at or just prior to the reading
-            next_uv(Dataset.Data_Point): The Data_Point object representation of the unit value occurring after the reading
-             
-        Return:
+        Returns:
             discrepancy(float): The reading's discrepancy
         """
         discrepancy = None
-        if next_uv != None:
-            bordering_uv_diff = next_uv.datetime - prior_uv.datetime
-            time_elapsed_in_window = reading_datetime - prior_uv.datetime
-            percent_in_time_elapsed = time_elapsed_in_window/bordering_uv_diff
-            
-            value_diff = float(next_uv.value) - float(prior_uv.value)
-            interpolated_value = float(prior_uv.value) + (percent_in_time_elapsed * value_diff)
+        if interpolated_value is not None:
             discrepancy = round(interpolated_value - reading_value, 3)
         return discrepancy
     
@@ -106,20 +75,14 @@ class Reading():
         
         if len(gh_ts_list) == 1:
             # dataset containing data for the day prior and after the reading's occurence, used to acquire record uvs before and after the reading
-            bordering_dataset = Reading._retrieve_bordering_dataset(self.datetime, gh_ts_list[0].TS_unique_id)
-            
-            prior_uv_data_point = Reading._return_recorder_data_point_prior_to_reading(self.datetime, bordering_dataset)
-            next_uv_data_point = prior_uv_data_point.next
+            bordering_dataset = Reading._retrieve_bordering_dataset(self.datetime, gh_ts_list[0].TS_unique_id, gh_ts_list[0].api_session)
             
-            self.discrepancy = Reading._return_discrepancy(self.datetime, self.value, prior_uv_data_point, next_uv_data_point)
+            self.discrepancy = Reading._return_discrepancy(self.value, bordering_dataset.interpolate_at(self.datetime))
         
         elif len(gh_ts_list) > 1:
             for gh_ts in gh_ts_list:
                 if self.sublocation == gh_ts.TS_sublocation:
                     # dataset containing data for the day prior and after the reading's occurence, used to acquire record uvs before and after the reading
-                    bordering_dataset = Reading._retrieve_bordering_dataset(self.datetime, gh_ts.TS_unique_id)
-                    
-                    prior_uv_data_point = Reading._return_recorder_data_point_prior_to_reading(self.datetime, bordering_dataset)
-                    next_uv_data_point = prior_uv_data_point.next
+                    bordering_dataset = Reading._retrieve_bordering_dataset(self.datetime, gh_ts.TS_unique_id, gh_ts.api_session)
                     
-                    self.discrepancy = Reading._return_discrepancy(self.datetime, self.value, prior_uv_data_point, next_uv_data_point)
\ No newline at end of file
+                    self.discrepancy = Reading._return_discrepancy(self.value, bordering_dataset.interpolate_at(self.datetime))
\ No newline at end of file
@@ -1,8 +1,20 @@
+from Anomaly_Scanner import Anomaly_Scanner
 from API_Session_V3 import SynchronousAquariusAPISession, SynchronousSIMsAPISession
 from datetime import datetime
+from Correction_Evaluator import Correction_Evaluator
+from Correction_Impact import Correction_Impact
+from Coverage import Coverage
+import Dataset
+from Interval_Set import Interval_Set
+from Peak_Detection import Peak_Verification
+from Runoff import Runoff, Runoff_Engine
+from Sensor_Alignment import Sensor_Alignment
+from Shift_Engine import Shift_Engine
+from Step_Detection import Step_Detection
 import SiteV3
 import html_table
 from User_Inputs import User_Inputs
+from Tracing import traced
 
 
 class Record():
@@ -15,6 +27,11 @@ class Record():
         record_start_date(datetime.date): Date of when the record begins
         record_end_date(datetime.date): Date of when the record ends
     '''
+    # Correction types whose touching or overlapping periods are shown as one row
+    MERGED_CORRECTION_TYPES = ("DeleteRegion", "CopyPaste")
+    # Columns quantifying what each correction changed, filled by _return_impact_cells
+    IMPACT_COLUMNS = ["Points Changed", "Max Change", "Mean Change", "Net Change"]
+    
     def __init__(self, record_start_date: datetime.date, record_end_date: datetime.date) -> None:
         self.start_date = record_start_date
         self.end_date = record_end_date
@@ -22,7 +39,11 @@ class Record():
         self.backup_tables = []
 
         self.field_visit_section = ""
+        self.gh_coverage_section = ""
+        self.q_coverage_section = ""
+        self.sensor_comparison_section = ""
     
+    @traced()
     def create_html_record(self, site_obj: SiteV3.Site, User_Inputs):
         '''
         Main method to construct the html version of the record and calls upon helper methods to
@@ -43,6 +64,7 @@ class Record():
                         + self.special_notes_section
                         + self.field_visit_section
                         + self.create_gh_section(User_Inputs.gh_tables_list)
+                        + self.gh_coverage_section
                         + self.datum_section
                         + self.checkbar_section
                         + self.backup_data_section
@@ -51,6 +73,7 @@ class Record():
                         + self.gh_corrections_section
                         + self.data_gaps_section
                         + self.other_gh_corrections_section
+                        + self.sensor_comparison_section
                         + self.peak_verifications_section
                         + self.peak_recorder_stage_section
                         + self.create_stage_discharge_header()
@@ -59,6 +82,7 @@ class Record():
                         + self.shift_section
                         + self.create_computed_discharge_header()
                         + self.create_discharge_record_section(User_Inputs.q_tables_list)
+                        + self.q_coverage_section
                         + self.hydro_comp_section
                         + self.peak_recorder_streamflow_section
                         + self.water_year_section
@@ -92,11 +116,11 @@ class Record():
         
         self.create_backup_data_section(site_obj.primary_gh_ts.record_dataset.general_corrections)
         self.create_ice_affected_section(site_obj.primary_gh_ts.record_dataset.qualifiers)
-        self.create_edits_section(site_obj.primary_gh_ts.record_dataset.general_corrections)
-        self.create_gh_correction_section(site_obj.primary_gh_ts.record_dataset.multipoint_corrections)
+        self.create_edits_section(site_obj.gage_height_timeseries_list, site_obj.field_visits)
+        self.create_gh_correction_section(site_obj.gage_height_timeseries_list, site_obj.field_visits)
         self.create_data_gaps_section(site_obj.primary_gh_ts.record_dataset.gaps)
         self.create_other_corrections_section(site_obj.primary_gh_ts.record_dataset.multipoint_corrections)
-        self.create_peak_verifications_section(site_obj.field_visits)
+        self.create_peak_verifications_section(site_obj.field_visits, site_obj.gage_height_timeseries_list, site_obj.discharge_timeseries_list[0] if len(site_obj.discharge_timeseries_list) > 0 else None)
         self.create_peak_recorder_stage_section(site_obj.primary_gh_ts.record_dataset)
     
     def _create_stage_discharge_html_section(self, site_obj: SiteV3.Site):
@@ -110,7 +134,7 @@ class Record():
         self.create_stage_discharge_header()
         self.create_rating_description(site_obj.ratings_description)
         self.create_qm_section(site_obj.field_visits)
-        self.create_shift_curves_section(site_obj.rating_model.ratings_list)
+        self.create_shift_curves_section(site_obj.rating_model.ratings_list, site_obj.gage_height_timeseries_list, site_obj.field_visits)
     
     def _create_computed_discharge_html_section(self, site_obj: SiteV3.Site):
         '''
@@ -123,7 +147,7 @@ class Record():
         self.create_computed_discharge_header()
         self.create_discharge_record_section(site_obj.primary_q_ts.record_dataset.gaps, site_obj.primary_q_ts.record_dataset.qualifiers)
         self.create_q_data_gaps_section(site_obj.primary_q_ts.record_dataset.gaps)
-        self.create_estimate_section(site_obj.primary_q_ts.record_dataset.general_corrections)
+        self.create_estimate_section(site_obj.primary_q_ts.record_dataset.general_corrections, site_obj.primary_q_ts.record_dataset)
         self.create_backwater_section(site_obj.primary_q_ts.record_dataset.qualifiers)
         self.create_hydro_comparison_section()
         self.create_peak_record_discharge_table(site_obj.primary_q_ts.record_dataset)
@@ -156,6 +180,7 @@ class Record():
             
         return self.header
     
+    @traced()
     def create_special_notes_section(self, special_notes: str):
         """
         Method to create the optional hteml for a special notes section as
@@ -231,6 +256,7 @@ class Record():
                     
         return visit_findings_str
     
+    @traced()
     def create_field_visits_table_section(self, field_visit_list):
         '''
         Method to construct the field visits table with their respect
@@ -263,6 +289,7 @@ class Record():
 
         return self.field_visit_section
     
+    @traced()
     def create_gh_section(self, gh_quality_tables: list):
         """
         Method to construct the gage height record description section. User must be prompted for
@@ -282,7 +309,71 @@ class Record():
             self.gh_description += table_title + gh_quality_table.return_html_table()
 
         return self.gh_description
+    
+    @traced()
+    def create_gh_coverage_section(self, gh_ts_list):
+        """
+        Method to construct the gage height record coverage section, tabulating how much
+        of the period had data, was gapped, estimated, ice affected or deleted.
+
+        Args:
+            gh_ts_list(list[Generic_Timeseries]): List of gage height timeseries for the site.
+        """
+        self.gh_coverage_section = Record._return_coverage_section("Gage Height Record Coverage", gh_ts_list, False)
+        self.record_html = self.record_html + self.gh_coverage_section
+    
+    @traced()
+    def create_q_coverage_section(self, q_ts_list):
+        """
+        Method to construct the discharge record coverage section, tabulating how much
+        of the period had data, was gapped, estimated, ice affected or deleted.
+        Copy & paste corrections count as estimates for discharge.
+
+        Args:
+            q_ts_list(list[Generic_Timeseries]): List of discharge timeseries for the site.
+        """
+        self.q_coverage_section = Record._return_coverage_section("Discharge Record Coverage", q_ts_list, True)
+        self.record_html = self.record_html + self.q_coverage_section
+    
+    @staticmethod
+    def _return_coverage_section(section_title: str, ts_list, copy_paste_is_estimate: bool) -> str:
+        """
+        Helper method to build the coverage summary and monthly coverage tables of each timeseries.
+
+        Args:
+            section_title(str): Title of the section
+            ts_list(list[Generic_Timeseries]): The timeseries to summarize
+            copy_paste_is_estimate(bool): Whether copy & paste corrections count as estimates
+        """
+        coverage_section = ""
+        for ts in ts_list:
+            if len(ts_list) > 1:
+                coverage_section += f"<p><strong>{section_title} ({ts.TS_sublocation})</strong></p>\n"
+            else:
+                coverage_section += f"<p><strong>{section_title}</strong></p>\n"
+            
+            if ts.record_dataset is None:
+                coverage_section += "<p>No data was retrieved for the analysis period.</p>\n"
+                continue
+            
+            coverage = Coverage.from_dataset(ts.record_dataset, copy_paste_is_estimate)
+            table_header_row = html_table.html_table_row(["Category", "Duration", "Percent of Period"])
+            body_rows_list = []
+            for category in Coverage.CATEGORIES:
+                body_rows_list.append(html_table.html_table_row([category, str(coverage.duration(category)), f"{coverage.percent(category):.1f}%"]))
+            coverage_section += html_table.html_table(table_header_row, body_rows_list, 500, [150, 200, 150]).return_html()
+            
+            month_starts, monthly_percentages = coverage.monthly_percentages()
+            table_header_row = html_table.html_table_row(["Month"] + list(Coverage.CATEGORIES))
+            body_rows_list = []
+            for month_index, month_start in enumerate(month_starts.astype(object)):
+                percentages = [f"{monthly_percentages[category][month_index]:.1f}%" for category in Coverage.CATEGORIES]
+                body_rows_list.append(html_table.html_table_row([month_start.strftime("%Y-%m")] + percentages))
+            coverage_section += html_table.html_table(table_header_row, body_rows_list, 700, [100, 120, 120, 120, 120, 120]).return_html()
+        
+        return coverage_section
   
+    @traced()
     def create_datum_section(self, datum_description: str):
         """
         Method to construct the datum/levels section using the SLAP description
@@ -296,6 +387,7 @@ class Record():
             "<p>" + datum_description + "</p>\n</div>\n"
         self.record_html = self.record_html + self.datum_section
         
+    @traced()
     def create_checkbar_section(self, field_visits_list, sensors_list):
         """
         Method to construct the description of the checkbar readings during
@@ -349,6 +441,7 @@ class Record():
         
         return checkbar_reading_cnt
 
+    @traced()
     def create_backup_data_section(self, gh_ts_list, edl_data_condition_combo_box_array):
         """
         Method to construct the backup data section pertaining to use
@@ -368,7 +461,7 @@ class Record():
             hasGaps = Record._ts_has_record_period_gaps(gh_ts_list[0])
 
             self.backup_data_section = "<p><strong>Backup Data</strong></p>\n"
-            self._process_ts(correctionsList, archivalCondition, False, hasGaps)
+            self._process_ts(correctionsList, archivalCondition, hasPastedData, hasGaps)
         
         elif len(gh_ts_list) > 1:
             for ts, comboBox in zip(gh_ts_list, edl_data_condition_combo_box_array):
@@ -378,7 +471,7 @@ class Record():
                 hasGaps = Record._ts_has_record_period_gaps(ts)
 
                 self.backup_data_section += f"<p><strong>Backup Data ({ts.TS_sublocation})</strong></p>\n"
-                self._process_ts(correctionsList, archivalCondition, False, hasGaps)
+                self._process_ts(correctionsList, archivalCondition, hasPastedData, hasGaps)
 
         self.record_html = self.record_html + self.backup_data_section
 
@@ -393,7 +486,7 @@ class Record():
     def _return_copy_paste_table(corrections_list):
         table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time"])
         body_rows_list = []
-        for correction in corrections_list:
+        for correction in Record._merge_corrections(corrections_list):
             if correction.correction_type == 'CopyPaste':
                 edl_body_row = html_table.html_table_row([str(correction.start_datetime), str(correction.end_datetime)])
                 body_rows_list.append(edl_body_row)
@@ -403,9 +496,65 @@ class Record():
 
     @staticmethod
     def _ts_has_record_period_gaps(gh_ts):
-        if len(gh_ts.record_dataset.gaps) != 0:
+        copy_paste_periods = Interval_Set.from_periods(correction for correction in gh_ts.record_dataset.general_corrections if correction.correction_type == 'CopyPaste')
+        unfilled_gaps = Interval_Set.from_periods(gh_ts.record_dataset.gaps).difference(copy_paste_periods)
+        if len(unfilled_gaps) != 0:
             return True
         return False
+    
+    @staticmethod
+    def _merge_corrections(corrections_list) -> list:
+        """
+        Helper method to merge touching and overlapping corrections, as AQ does not.
+        Deletions and copy & pastes of the same processing order are merged into a
+        single correction carrying their distinct comments; other corrections are
+        kept as is.
+
+        Args:
+            corrections_list(list[Correction]): List of corrections during the period.
+
+        Returns:
+            list[Correction]: The merged corrections, sorted by starting date/time
+        """
+        merged_corrections = []
+        corrections_by_kind = {}
+        for correction in corrections_list:
+            if correction.correction_type in Record.MERGED_CORRECTION_TYPES:
+                corrections_by_kind.setdefault((correction.correction_type, correction.processing_order), []).append(correction)
+            else:
+                merged_corrections.append(correction)
+        
+        for (correction_type, processing_order), corrections in corrections_by_kind.items():
+            periods = Interval_Set.from_periods(corrections)
+            merged_into = periods.locate([correction.start_datetime for correction in corrections])
+            for period_index, (start_datetime, end_datetime) in enumerate(periods.periods()):
+                descriptions = []
+                for correction, correction_period_index in zip(corrections, merged_into):
+                    if correction_period_index == period_index and correction.description and correction.description not in descriptions:
+                        descriptions.append(correction.description)
+                merged_corrections.append(Dataset.Correction(correction_type, start_datetime, end_datetime, processing_order, "; ".join(descriptions)))
+        
+        merged_corrections.sort(key=lambda correction: correction.start_datetime)
+        return merged_corrections
+    
+    @staticmethod
+    def _return_qualifier_periods_table(qualifiers_list, identifier: str, table_width: int):
+        """
+        Helper method to tabulate the periods of one qualifier type with their
+        durations, merging touching and overlapping periods as AQ does not.
+
+        Args:
+            qualifiers_list(list[Qualifier]): List of qualifiers during the record period.
+            identifier(str): The qualifier type to tabulate (ICE, BACKWATER, etc.)
+            table_width(int): Width of the table in pixels
+        """
+        periods = Interval_Set.from_periods(qualifier for qualifier in qualifiers_list if qualifier.identifier == identifier)
+        table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Duration", "Supplemental Comments"])
+        body_rows_list = []
+        for (start_datetime, end_datetime), duration in zip(periods.periods(), periods.durations()):
+            body_rows_list.append(html_table.html_table_row([str(start_datetime), str(end_datetime), str(duration), ""]))
+        
+        return html_table.html_table(table_header_row, body_rows_list, table_width, [175, 175, 125, table_width - 475])
 
     def _process_ts(self, corrections_list, archivalCondition: bool, hasPastedData: bool, hasGaps: bool):
         archivedProperly = archivalCondition == "Archived Properly"
@@ -449,6 +598,7 @@ class Record():
         elif notArchivedProperly and hasGaps:
             self.backup_data_section += "<p>Backup data was not available or not archived properly and gaps occurred during the period.</p>\n"
 
+    @traced()
     def create_ice_affected_section(self, gh_ts_list):
         """
         Method to construct the ice affected section pertaining to periods of 
@@ -472,14 +622,7 @@ class Record():
                 self.ice_section = self.ice_section + "<p>No periods of ice were evident during the analysis period.</p>\n"
             else:
                 self.ice_section = self.ice_section + "<p>Ice was evident upon further review of the hydrograph and meteorlogical data.</p>\n"
-                table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Supplemental Comments"])
-                body_rows_list = []
-                for qualifier in qualifiers_list:
-                    if qualifier.identifier == "ICE":
-                        ice_body_row = html_table.html_table_row([str(qualifier.start_datetime), str(qualifier.end_datetime), ""])
-                        body_rows_list.append(ice_body_row)
-                
-                ice_table = html_table.html_table(table_header_row, body_rows_list, 800, [175, 175, 450])
+                ice_table = Record._return_qualifier_periods_table(qualifiers_list, "ICE", 800)
                 self.ice_section = self.ice_section + ice_table.return_html()
                 
             self.record_html = self.record_html + self.ice_section
@@ -498,26 +641,22 @@ class Record():
                     self.ice_section = self.ice_section + "<p>No periods of ice were evident during the analysis period.</p>\n"
                 else:
                     self.ice_section = self.ice_section + "<p>Ice was evident upon further review of the hydrograph and meteorlogical data.</p>\n"
-                    table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Supplemental Comments"])
-                    body_rows_list = []
-                    for qualifier in qualifiers_list:
-                        if qualifier.identifier == "ICE":
-                            ice_body_row = html_table.html_table_row([str(qualifier.start_datetime), str(qualifier.end_datetime), ""])
-                            body_rows_list.append(ice_body_row)
-                    
-                    ice_table = html_table.html_table(table_header_row, body_rows_list, 800, [175, 175, 450])
+                    ice_table = Record._return_qualifier_periods_table(qualifiers_list, "ICE", 800)
                     self.ice_section = self.ice_section + ice_table.return_html()
                     
                 self.record_html = self.record_html + self.ice_section
     
-    def create_edits_section(self, gh_ts_list):
+    @traced()
+    def create_edits_section(self, gh_ts_list, field_visit_list = None):
         """
         Method to construct a tabulated edits section if any edits were warranted
-        during the period.
+        during the period, followed by the spikes and flat lines found in the
+        record. When the visits are provided, step changes in the record not
+        explained by a recorded reset are listed as well.
 
         Args:
-            general_corrections_list(list[General_Correction]): list of general corrections
-            from during the period.
+            gh_ts_list(list[Generic_Timeseries]): List of gage height timeseries for the site.
+            field_visit_list(list[Field_Visit]): List of field visits during record period, None to skip the step check
         """
         self.edits_section = ""
         if len(gh_ts_list) == 1:
@@ -532,9 +671,11 @@ class Record():
                 self.edits_section = self.edits_section + "<p>No edits to the gage height record were warranted during the analysis period.</p>\n"
             
             else:
-                table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Type of Edit", "Processing Order", "Comment"])
+                table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Duration", "Type of Edit", "Processing Order"] + Record.IMPACT_COLUMNS + ["Comment"])
                 body_rows_list = []
-                for gen_corr in general_corrections_list:
+                merged_corrections = Record._merge_corrections(general_corrections_list)
+                impacts = Correction_Impact.for_periods(gh_ts_list[0].record_dataset, merged_corrections)
+                for gen_corr, impact in zip(merged_corrections, impacts):
                     correction_type = gen_corr.correction_type
                     if correction_type == "CopyPaste":
                         correction_type = "Copy & Paste"
@@ -547,11 +688,15 @@ class Record():
                     elif processing_order == "PostProcessing":
                         processing_order = "Post-Processing"
                         
-                    gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), correction_type, processing_order, gen_corr.description])
+                    gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), str(gen_corr.end_datetime - gen_corr.start_datetime), correction_type, processing_order] + Record._return_impact_cells(impact) + [gen_corr.description])
                     body_rows_list.append(gen_corr_body_row)
                 
-                edits_table = html_table.html_table(table_header_row, body_rows_list, 900, [175, 175, 150, 150, 250])
+                edits_table = html_table.html_table(table_header_row, body_rows_list, 1200, [150, 150, 100, 100, 100, 75, 75, 75, 75, 300])
                 self.edits_section = self.edits_section + edits_table.return_html()
+            
+            self.edits_section = self.edits_section + Record._return_anomalies_table(gh_ts_list[0])
+            if field_visit_list is not None:
+                self.edits_section = self.edits_section + Record._return_unexplained_steps_table(gh_ts_list[0], field_visit_list)
                 
             self.record_html = self.record_html + self.edits_section
         
@@ -568,9 +713,11 @@ class Record():
                     self.edits_section = self.edits_section + "<p>No edits to the gage height record were warranted during the analysis period.</p>\n"
                 
                 else:
-                    table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Type of Edit", "Processing Order", "Comment"])
+                    table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Duration", "Type of Edit", "Processing Order"] + Record.IMPACT_COLUMNS + ["Comment"])
                     body_rows_list = []
-                    for gen_corr in general_corrections_list:
+                    merged_corrections = Record._merge_corrections(general_corrections_list)
+                    impacts = Correction_Impact.for_periods(ts.record_dataset, merged_corrections)
+                    for gen_corr, impact in zip(merged_corrections, impacts):
                         correction_type = gen_corr.correction_type
                         if correction_type == "CopyPaste":
                             correction_type = "Copy & Paste"
@@ -583,14 +730,127 @@ class Record():
                         elif processing_order == "PostProcessing":
                             processing_order = "Post-Processing"
                             
-                        gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), correction_type, processing_order, gen_corr.description])
+                        gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), str(gen_corr.end_datetime - gen_corr.start_datetime), correction_type, processing_order] + Record._return_impact_cells(impact) + [gen_corr.description])
                         body_rows_list.append(gen_corr_body_row)
                     
-                    edits_table = html_table.html_table(table_header_row, body_rows_list, 900, [175, 175, 150, 150, 250])
+                    edits_table = html_table.html_table(table_header_row, body_rows_list, 1200, [150, 150, 100, 100, 100, 75, 75, 75, 75, 300])
                     self.edits_section = self.edits_section + edits_table.return_html()
+                
+                self.edits_section = self.edits_section + Record._return_anomalies_table(ts)
+                if field_visit_list is not None:
+                    self.edits_section = self.edits_section + Record._return_unexplained_steps_table(ts, field_visit_list)
                     
                 self.record_html = self.record_html + self.edits_section
     
+    @staticmethod
+    def _return_impact_cells(impact: Correction_Impact) -> list:
+        """
+        Helper method to format a correction's impact into the IMPACT_COLUMNS cells.
+
+        Args:
+            impact(Correction_Impact): How much the correction changed the record
+        """
+        if impact.max_change is None:
+            return [str(impact.points_affected), "N/A", "N/A", "N/A"]
+        return [str(impact.points_affected), "{:+.2f}\'".format(impact.max_change), "{:.3f}\'".format(impact.mean_change), "{:+.3f}\'".format(impact.net_change)]
+    
+    @staticmethod
+    def _return_anomalies_table(gh_ts) -> str:
+        """
+        Helper method to list the spikes and flat lines found in a gage height
+        record, with the deletions and qualifiers already covering them.
+
+        Args:
+            gh_ts(Generic_Timeseries): The gage height timeseries
+        """
+        anomalies = Anomaly_Scanner(gh_ts.record_dataset).anomalies
+        if len(anomalies) == 0:
+            return "<p>No spikes or flat lines were detected in the gage height record.</p>\n"
+        
+        table_header_row = html_table.html_table_row(["Type", "Beginning Date/Time", "Ending Date/Time", "Points", "Magnitude", "Severity", "Addressed By"])
+        body_rows_list = []
+        for anomaly in anomalies:
+            magnitude = "{:.2f}\'".format(anomaly.magnitude) if anomaly.kind == Anomaly_Scanner.SPIKE else "{:.1f} hours".format(anomaly.magnitude)
+            addressed_by = (["Deletion"] if anomaly.deleted else []) + anomaly.qualifiers
+            body_rows_list.append(html_table.html_table_row([anomaly.kind, str(anomaly.start_datetime), str(anomaly.end_datetime), str(anomaly.points), magnitude, anomaly.severity, ", ".join(addressed_by) or "None"]))
+        anomalies_table = html_table.html_table(table_header_row, body_rows_list, 900, [90, 150, 150, 70, 100, 80, 260])
+        return "<p>Spikes and flat lines detected in the gage height record:</p>\n" + anomalies_table.return_html()
+    
+    @staticmethod
+    def _return_unexplained_steps_table(gh_ts, field_visit_list) -> str:
+        """
+        Helper method to list the step changes in a gage height record that no
+        reset recorded during a visit accounts for. These are candidates for edits.
+
+        Args:
+            gh_ts(Generic_Timeseries): The gage height timeseries
+            field_visit_list(list[Field_Visit]): List of field visits during record period
+        """
+        step_detection = Step_Detection(gh_ts.record_dataset)
+        step_detection.match_resets(field_visit_list)
+        unexplained_steps = step_detection.unexplained_steps()
+        if len(unexplained_steps) == 0:
+            return "<p>No unexplained step changes were detected in the gage height record.</p>\n"
+        
+        table_header_row = html_table.html_table_row(["Before Step Date/Time", "After Step Date/Time", "Step", "During Visit"])
+        body_rows_list = []
+        for step in unexplained_steps:
+            during_visit = "No" if step.field_visit is None else str(step.field_visit.date)[0:10]
+            body_rows_list.append(html_table.html_table_row([str(step.before_datetime), str(step.datetime), "{:+.2f}\'".format(step.magnitude), during_visit]))
+        steps_table = html_table.html_table(table_header_row, body_rows_list, 600, [175, 175, 100, 150])
+        return "<p>Unexplained step changes in the gage height record:</p>\n" + steps_table.return_html()
+    
+    @staticmethod
+    def _return_reset_check_table(gh_ts, field_visit_list) -> str:
+        """
+        Helper method to compare the resets recorded during visits with the steps
+        found in the gage height record on the visit days.
+
+        Args:
+            gh_ts(Generic_Timeseries): The gage height timeseries
+            field_visit_list(list[Field_Visit]): List of field visits during record period
+        """
+        step_detection = Step_Detection(gh_ts.record_dataset)
+        unmatched_resets = step_detection.match_resets(field_visit_list)
+        rows = [(str(step.field_visit.date)[0:10], "{:+.2f}\'".format(step.reset_amount), "{:+.2f}\' at {}".format(step.magnitude, step.datetime), "Matched")
+                for step in step_detection.steps if step.explained]
+        rows += [(str(field_visit.date)[0:10], "{:+.2f}\'".format(reset_amount), "None", "No matching step in the record")
+                 for field_visit, reset_amount in unmatched_resets]
+        rows += [(str(step.field_visit.date)[0:10], "None", "{:+.2f}\' at {}".format(step.magnitude, step.datetime), "Step without a recorded reset")
+                 for step in step_detection.unexplained_steps() if step.field_visit is not None]
+        if len(rows) == 0:
+            return ""
+        
+        rows.sort(key=lambda row: row[0])
+        table_header_row = html_table.html_table_row(["Visit Date", "Recorded Reset", "Recorder Step", "Result"])
+        body_rows_list = [html_table.html_table_row(list(row)) for row in rows]
+        reset_table = html_table.html_table(table_header_row, body_rows_list, 700, [125, 125, 250, 200])
+        return "<p>Recorder resets compared to the gage height record:</p>\n" + reset_table.return_html()
+    
+    @staticmethod
+    def _return_correction_check_table(gh_ts) -> str:
+        """
+        Helper method to tabulate the multi-point corrections of a gage height
+        record re-applied to its raw unit values and compared with the corrected
+        record. The raw unit values are only pulled when there are corrections.
+
+        Args:
+            gh_ts(Generic_Timeseries): The gage height timeseries
+        """
+        if len(gh_ts.record_dataset.multipoint_corrections) == 0:
+            return ""
+        
+        table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Applied Range", "Mean Applied", "Compared Points", "Mismatches", "Max Mismatch"])
+        body_rows_list = []
+        for check in Correction_Evaluator(gh_ts.record_dataset).checks:
+            applied_range = "N/A" if check.points == 0 else "{:.2f}\' to {:.2f}\'".format(check.min_applied, check.max_applied)
+            mean_applied = "N/A" if check.points == 0 else "{:.3f}\'".format(check.mean_applied)
+            max_mismatch = "N/A" if check.max_mismatch is None else "{:.3f}\'".format(check.max_mismatch)
+            body_rows_list.append(html_table.html_table_row([str(check.correction.processing_order), str(check.correction.start_datetime), str(check.correction.end_datetime),
+                                                             applied_range, mean_applied, str(check.compared_points), str(check.mismatch_points), max_mismatch]))
+        check_table = html_table.html_table(table_header_row, body_rows_list, 1000, [80, 150, 150, 150, 110, 110, 110, 140])
+        return "<p>Multi-point corrections re-applied to the raw record and compared with the corrected record:</p>\n" + check_table.return_html()
+    
     @staticmethod
     def _gh_correction_input_pt_list_to_string(input_list):
         """
@@ -613,14 +873,17 @@ class Record():
         return tuple_list
         
     
-    def create_gh_correction_section(self, gh_ts):
+    @traced()
+    def create_gh_correction_section(self, gh_ts, field_visit_list = None):
         """
         Method to generate a tabulated section for the set 2 gage height corrections
-        from during the period.
+        from during the period. The multi-point corrections are re-applied to the
+        raw record and checked against the corrected record. When the visits are
+        provided, their recorded resets are compared to the steps in the record.
 
         Args:
-            gh_corrections_list(list[Multi_Point_Correction]): List of gage height corrections
-            from during the period.
+            gh_ts(list[Generic_Timeseries]): List of gage height timeseries for the site.
+            field_visit_list(list[Field_Visit]): List of field visits during record period, None to skip the reset check
         """
 
         self.gh_corrections_section = ""
@@ -636,18 +899,23 @@ class Record():
             if gh_corr_cnt == 0:
                 self.gh_corrections_section = self.gh_corrections_section + "<p>No gage height corrections were warranted during the analysis period. All visit primary readings were considered to be in agreement with their respective recorder readings.</p>\n"
             else:
-                table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)", "Comment"])
+                table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)"] + Record.IMPACT_COLUMNS + ["Comment"])
                 body_rows_list = []
-                for corr in gh_corrections_list:
+                impacts = Correction_Impact.for_periods(gh_ts[0].record_dataset, gh_corrections_list)
+                for corr, impact in zip(gh_corrections_list, impacts):
                     if corr.processing_order == "Set 2":
                         string_starting_shifts = Record._gh_correction_input_pt_list_to_string(corr.start_shifts)
                         string_ending_shifts = Record._gh_correction_input_pt_list_to_string(corr.end_shifts)
-                        gen_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts, corr.description])
+                        gen_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts] + Record._return_impact_cells(impact) + [corr.description])
                         body_rows_list.append(gen_corr_body_row)
                 
-                gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 900, [100, 150, 150, 150, 150, 200])
+                gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1200, [75, 125, 125, 150, 150, 75, 75, 75, 75, 275])
                 self.gh_corrections_section = self.gh_corrections_section + gh_corr_table.return_html()
             
+            if field_visit_list is not None:
+                self.gh_corrections_section = self.gh_corrections_section + Record._return_reset_check_table(gh_ts[0], field_visit_list)
+            self.gh_corrections_section = self.gh_corrections_section + Record._return_correction_check_table(gh_ts[0])
+            
             self.record_html = self.record_html + self.gh_corrections_section
         
         if len(gh_ts) > 1:
@@ -663,20 +931,26 @@ class Record():
                 if gh_corr_cnt == 0:
                     self.gh_corrections_section = self.gh_corrections_section + "<p>No gage height corrections were warranted during the analysis period. All visit primary readings were considered to be in agreement with their respective recorder readings.</p>\n"
                 else:
-                    table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)", "Comment"])
+                    table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)"] + Record.IMPACT_COLUMNS + ["Comment"])
                     body_rows_list = []
-                    for corr in gh_corrections_list:
+                    impacts = Correction_Impact.for_periods(ts.record_dataset, gh_corrections_list)
+                    for corr, impact in zip(gh_corrections_list, impacts):
                         if corr.processing_order == "Set 2":
                             string_starting_shifts = Record._gh_correction_input_pt_list_to_string(corr.start_shifts)
                             string_ending_shifts = Record._gh_correction_input_pt_list_to_string(corr.end_shifts)
-                            gen_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts, corr.description])
+                            gen_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts] + Record._return_impact_cells(impact) + [corr.description])
                             body_rows_list.append(gen_corr_body_row)
                     
-                    gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 900, [100, 150, 150, 150, 150, 200])
+                    gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1200, [75, 125, 125, 150, 150, 75, 75, 75, 75, 275])
                     self.gh_corrections_section = self.gh_corrections_section + gh_corr_table.return_html()
                 
+                if field_visit_list is not None:
+                    self.gh_corrections_section = self.gh_corrections_section + Record._return_reset_check_table(ts, field_visit_list)
+                self.gh_corrections_section = self.gh_corrections_section + Record._return_correction_check_table(ts)
+                
                 self.record_html = self.record_html + self.gh_corrections_section
             
+    @traced()
     def create_data_gaps_section(self, gh_ts_list):
         """
         Method to crate the data gaps section for the records period.
@@ -725,6 +999,7 @@ class Record():
                     
                 self.record_html = self.record_html + self.data_gaps_section
          
+    @traced()
     def create_other_corrections_section(self, gh_ts_list):
         """
         Method to construct the other corrections section which will pertain to
@@ -749,16 +1024,17 @@ class Record():
             if other_corr_cnt == 0:
                 self.other_gh_corrections_section = self.other_gh_corrections_section + "<p>No other gage height corrections were warranted during the analysis period.</p>\n"
             else:
-                table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)", "Comment"])
+                table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)"] + Record.IMPACT_COLUMNS + ["Comment"])
                 body_rows_list = []
-                for corr in multi_point_list:
+                impacts = Correction_Impact.for_periods(gh_ts_list[0].record_dataset, multi_point_list)
+                for corr, impact in zip(multi_point_list, impacts):
                     if corr.processing_order != "Set 2":
                         string_starting_shifts = Record._gh_correction_input_pt_list_to_string(corr.start_shifts)
                         string_ending_shifts = Record._gh_correction_input_pt_list_to_string(corr.end_shifts)
-                        other_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts, corr.description])
+                        other_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts] + Record._return_impact_cells(impact) + [corr.description])
                         body_rows_list.append(other_corr_body_row)
                 
-                other_gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1050, [100, 150, 150, 200, 200, 250])
+                other_gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1350, [75, 125, 125, 200, 200, 75, 75, 75, 75, 325])
                 self.other_gh_corrections_section = self.other_gh_corrections_section + other_gh_corr_table.return_html()
             
             self.record_html = self.record_html + self.other_gh_corrections_section
@@ -777,26 +1053,84 @@ class Record():
                 if other_corr_cnt == 0:
                     self.other_gh_corrections_section = self.other_gh_corrections_section + "<p>No other gage height corrections were warranted during the analysis period.</p>\n"
                 else:
-                    table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)", "Comment"])
+                    table_header_row = html_table.html_table_row(["Set Type", "Starting Date/Time", "Ending Date/Time", "Starting Corr. Points (GH, Magnitude)", "Ending Corr. Points (GH, Magnitude)"] + Record.IMPACT_COLUMNS + ["Comment"])
                     body_rows_list = []
-                    for corr in multi_point_list:
+                    impacts = Correction_Impact.for_periods(ts.record_dataset, multi_point_list)
+                    for corr, impact in zip(multi_point_list, impacts):
                         if corr.processing_order != "Set 2":
                             string_starting_shifts = Record._gh_correction_input_pt_list_to_string(corr.start_shifts)
                             string_ending_shifts = Record._gh_correction_input_pt_list_to_string(corr.end_shifts)
-                            other_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts, corr.description])
+                            other_corr_body_row = html_table.html_table_row([str(corr.processing_order), str(corr.start_datetime), str(corr.end_datetime), string_starting_shifts, string_ending_shifts] + Record._return_impact_cells(impact) + [corr.description])
                             body_rows_list.append(other_corr_body_row)
                     
-                    other_gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1050, [100, 150, 150, 200, 200, 250])
+                    other_gh_corr_table = html_table.html_table(table_header_row, body_rows_list, 1350, [75, 125, 125, 200, 200, 75, 75, 75, 75, 325])
                     self.other_gh_corrections_section = self.other_gh_corrections_section + other_gh_corr_table.return_html()
                 
                 self.record_html = self.record_html + self.other_gh_corrections_section
     
-    def create_peak_verifications_section(self, field_visit_list):
+    @traced()
+    def create_sensor_comparison_section(self, gh_ts_list):
+        """
+        Method to construct the primary-vs-backup comparison section for sites with
+        more than one gage height timeseries. The first timeseries is the reference
+        the others are compared against on a common time grid; timeseries without
+        a record dataset are left out of the comparison.
+
+        Args:
+            gh_ts_list(list[Generic_Timeseries]): List of gage height timeseries for the site.
+        """
+        self.sensor_comparison_section = "<p><strong>Sensor Comparison</strong></p>\n"
+        
+        compared_ts_list = [ts for ts in gh_ts_list if ts.record_dataset is not None]
+        for ts in gh_ts_list:
+            if ts.record_dataset is None and len(gh_ts_list) > 1:
+                self.sensor_comparison_section += f"<p>No data was retrieved for the analysis period for {ts.TS_sublocation or ts.TS_identifier}.</p>\n"
+        
+        if len(gh_ts_list) < 2:
+            self.sensor_comparison_section += "<p>Only one gage height timeseries is available at the site, no sensor comparison was made.</p>\n"
+        
+        elif len(compared_ts_list) < 2:
+            self.sensor_comparison_section += "<p>Fewer than two gage height timeseries have data for the analysis period, no sensor comparison was made.</p>\n"
+        
+        else:
+            alignment = Sensor_Alignment([ts.record_dataset for ts in compared_ts_list], [ts.TS_sublocation or ts.TS_identifier for ts in compared_ts_list])
+            threshold = Sensor_Alignment.DIVERGENCE_THRESHOLD
+            for index in range(1, len(compared_ts_list)):
+                summary = alignment.summary(index)
+                self.sensor_comparison_section += f"<p>{alignment.labels[index]} compared to {alignment.labels[0]}</p>\n"
+                if summary["compared_points"] == 0:
+                    self.sensor_comparison_section += "<p>The timeseries did not record at the same time during the analysis period.</p>\n"
+                    continue
+                
+                drift = "N/A" if summary["drift_per_day"] is None else "{:.4f}\' per day".format(summary["drift_per_day"])
+                table_header_row = html_table.html_table_row(["Statistic", "Value"])
+                body_rows_list = [html_table.html_table_row(["Compared Unit Values", str(summary["compared_points"])]),
+                                  html_table.html_table_row(["Mean Offset", "{:.3f}\'".format(summary["mean_offset"])]),
+                                  html_table.html_table_row(["Drift", drift]),
+                                  html_table.html_table_row(["Max Divergence", "{:.2f}\' at {}".format(summary["max_divergence"], summary["max_divergence_datetime"])]),
+                                  html_table.html_table_row([f"Time Diverging Over {threshold:.2f}\'", str(summary["divergence_periods"].total_duration())])]
+                self.sensor_comparison_section += html_table.html_table(table_header_row, body_rows_list, 500, [200, 300]).return_html()
+                
+                if len(summary["divergence_periods"]) > 0:
+                    table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Duration"])
+                    body_rows_list = []
+                    for (start_datetime, end_datetime), duration in zip(summary["divergence_periods"].periods(), summary["divergence_periods"].durations()):
+                        body_rows_list.append(html_table.html_table_row([str(start_datetime), str(end_datetime), str(duration)]))
+                    self.sensor_comparison_section += html_table.html_table(table_header_row, body_rows_list, 500, [175, 175, 150]).return_html()
+        
+        self.record_html = self.record_html + self.sensor_comparison_section
+    
+    @traced()
+    def create_peak_verifications_section(self, field_visit_list, gh_ts_list = None, q_ts = None):
         """
-        Method to create the peak verifications section in tabulated form.
+        Method to create the peak verifications section in tabulated form. Each
+        mark is matched to the governing recorder peak between the previous visit
+        and the visit it was read on, and checked against the verification criteria.
 
         Args:
             field_visit_list(list[Field_Visit]): List of field visits during record period
+            gh_ts_list(list[Generic_Timeseries]): List of gage height timeseries for the site, None to skip matching marks to recorder peaks
+            q_ts(Generic_Timeseries): The primary discharge timeseries, None to only compare stage
         """
         self.peak_verifications_section = "<p><strong>Peak Verification Marks</strong></p>\n"
         
@@ -810,22 +1144,37 @@ class Record():
             self.peak_verifications_section = self.peak_verifications_section + "<p>No peak verification marks were recorded during the analysis period.</p>\n"
     
         else:
-            table_header_row = html_table.html_table_row(["Sensor Type", "Date Read", "Date/Time Occurred", "Value", "Discrepancy", "Comment"])
+            if gh_ts_list:
+                verifications = Peak_Verification.match_marks(field_visit_list, gh_ts_list, q_ts)
+            else:
+                verifications = [Peak_Verification(field_visit, hwm, None) for field_visit in field_visit_list for hwm in field_visit.high_water_marks]
+            
+            table_header_row = html_table.html_table_row(["Sensor Type", "Date Read", "Date/Time Occurred", "Value", "Discrepancy", "Recorder Peak", "Peak - Mark", "Peak Q Difference", "Verified", "Comment"])
             body_rows_list = []
-            for field_visit in field_visit_list:
-                for hwm in field_visit.high_water_marks:
-                    hwm_type = hwm.monitoring_method
-                    if hwm_type == "Gage height, crest stage gage":
-                        hwm_type = "CSG"
-                    peaks_body_row = html_table.html_table_row([hwm_type, str(field_visit.date)[0:10], str(hwm.datetime), str(hwm.value)+"\'", str(hwm.discrepancy)+"\'", hwm.comment])
-                    body_rows_list.append(peaks_body_row)
+            for verification in verifications:
+                hwm = verification.mark
+                hwm_type = hwm.monitoring_method
+                if hwm_type == "Gage height, crest stage gage":
+                    hwm_type = "CSG"
+                occurred = "Unknown" if hwm.datetime is None else str(hwm.datetime)
+                discrepancy = "N/A" if hwm.discrepancy is None else str(hwm.discrepancy)+"\'"
+                recorder_peak = "N/A"
+                stage_difference = "N/A"
+                if verification.recorder_peak is not None:
+                    recorder_peak = "{:.2f}\' at {}".format(verification.recorder_peak.value, verification.recorder_peak.datetime)
+                    stage_difference = "{:+.2f}\'".format(verification.stage_difference)
+                discharge_difference = "N/A" if verification.discharge_percent_difference is None else "{:+.1f}%".format(verification.discharge_percent_difference)
+                verified = {True: "Yes", False: "No", None: "N/A"}[verification.verified]
+                peaks_body_row = html_table.html_table_row([hwm_type, str(verification.field_visit.date)[0:10], occurred, str(hwm.value)+"\'", discrepancy, recorder_peak, stage_difference, discharge_difference, verified, hwm.comment])
+                body_rows_list.append(peaks_body_row)
             
-            peaks_table = html_table.html_table(table_header_row, body_rows_list, 800, [100, 100, 150, 100, 100, 250])
-            subsection = "<em style=\"box-sizing: border-box; color: #333333; font-family: Ubuntu; font-size: 15px; background-color: #ffffff;\">Special Note: Independent peak verifications within ±0.05' of the recorder peak and within 8% of the peak computed discharge are considered to have verified the recorder peak. Independent peak verifications exceeding either of the aforementioned criteria warrant input into the gage height time series according to SW Memo 2014.05. Peaks verifications that fall in line with a pattern of instability may not be added to the gage height time series. Verifications that fall in line with a pattern of consistent offset from the recorder peak may also be considered to have verified the recorder peak.&nbsp;</em>\n"
+            peaks_table = html_table.html_table(table_header_row, body_rows_list, 1000, [60, 80, 120, 60, 80, 170, 70, 80, 60, 220])
+            subsection = "<em style=\"box-sizing: border-box; color: #333333; font-family: Ubuntu; font-size: 15px; background-color: #ffffff;\">Special Note: Independent peak verifications within ±0.05' of the recorder peak and within 8% of the peak computed discharge are considered to have verified the recorder peak. Independent peak verifications exceeding either of the aforementioned criteria warrant input into the gage height time series according to SW Memo 2014.05. Peaks verifications that fall in line with a pattern of instability may not be added to the gage height time series. Verifications that fall in line with a pattern of consistent offset from the recorder peak may also be considered to have verified the recorder peak. The recorder peak is the peak closest to the mark's time, or the highest peak since the previous visit for marks without a time. The peak discharge difference is estimated from the recorded gage height-discharge pairs near the peak.&nbsp;</em>\n"
             self.peak_verifications_section = self.peak_verifications_section + peaks_table.return_html() + subsection
         
         self.record_html = self.record_html + self.peak_verifications_section
     
+    @traced()
     def create_peak_recorder_stage_section(self, gh_ts_list, combobox_array):
         """
         Method to tabulate the peak stage reading from during the record period.
@@ -903,6 +1252,7 @@ class Record():
         return "<br />\n" + "<p><strong><span style=\"text-decoration: underline;\">Stage-Discharge Relation</span></strong></p>\n" \
         "<div style=\"padding-left:30px;\">\n"
         
+    @traced()
     def create_rating_description(self, ratings_description):
         """
         Method to create the rating description section using the description provided from
@@ -915,6 +1265,7 @@ class Record():
         
         self.record_html = self.record_html + self.rating_section
     
+    @traced()
     def create_qm_section(self, field_visit_list):
         """
         Method to construct the Qm section with summary of the measurement and its findings.
@@ -926,7 +1277,7 @@ class Record():
         """
         self.qm_section = "<p><strong>Discharge Measurements and Control Conditions</strong></p>\n"
         
-        table_header_row = html_table.html_table_row(["Qm #", "Date/Time", "MGH", "GH Change", "Discharge", "Quality", "Rating", "Rating Error", "Control Conditions", "Comments"])
+        table_header_row = html_table.html_table_row(["Qm #", "Date/Time", "MGH", "GH Change", "Discharge", "Quality", "Rating", "Rating Error", "Applied Shift", "Shifted Rating Error", "Control Conditions", "Comments"])
         body_rows_list = []
         
         field_visit_list.sort(key=lambda x: x.date, reverse=False)
@@ -935,16 +1286,29 @@ class Record():
             for qm in visit.dischage_measurements:
                 if qm.diff_during_visit == None:
                     User_Inputs.warning_message("No gage height difference recorded for Qm " + str(qm.qm_num) + "!\n")
-                    qm_row = html_table.html_table_row([str(qm.qm_num), str(qm.qm_time), str(qm.mgh) + "\'", "", str(round(qm.discharge, 2)), qm.quality, qm.rating_num_compared, "", visit.control_condition, qm.comment])
+                    qm_row = html_table.html_table_row([str(qm.qm_num), str(qm.qm_time), str(qm.mgh) + "\'", "", str(round(qm.discharge, 2)), qm.quality, qm.rating_num_compared, ""] + Record._return_shifted_rating_cells(qm) + [visit.control_condition, qm.comment])
                 else:
-                    qm_row = html_table.html_table_row([str(qm.qm_num), str(qm.qm_time), str(qm.mgh) + "\'", "{:.2f}".format(qm.diff_during_visit) + "\'", str(round(qm.discharge, 2)), qm.quality, qm.rating_num_compared, str(round(qm.difference_from_base_rating,1))+"%", visit.control_condition, qm.comment])
+                    qm_row = html_table.html_table_row([str(qm.qm_num), str(qm.qm_time), str(qm.mgh) + "\'", "{:.2f}".format(qm.diff_during_visit) + "\'", str(round(qm.discharge, 2)), qm.quality, qm.rating_num_compared, str(round(qm.difference_from_base_rating,1))+"%"] + Record._return_shifted_rating_cells(qm) + [visit.control_condition, qm.comment])
                 body_rows_list.append(qm_row)
         
-        qm_table = html_table.html_table(table_header_row, body_rows_list, 1300, [50, 175, 50, 50, 75, 75, 75, 75, 200, 475])
+        qm_table = html_table.html_table(table_header_row, body_rows_list, 1450, [50, 175, 50, 50, 75, 75, 75, 75, 75, 75, 200, 475])
         
         self.qm_section = self.qm_section + qm_table.return_html()
         self.record_html = self.record_html + self.qm_section
     
+    @staticmethod
+    def _return_shifted_rating_cells(qm):
+        """
+        Helper function to format a discharge measurement's applied shift and its
+        difference from the shifted rating, blank where they were not computed.
+
+        Args:
+            qm(Field_Visit.Discharge_Measurement): The discharge measurement
+        """
+        applied_shift = "" if qm.applied_shift is None else f"{qm.applied_shift:.2f}\'"
+        shifted_rating_error = "" if qm.difference_from_shifted_rating is None else str(round(qm.difference_from_shifted_rating, 1)) + "%"
+        return [applied_shift, shifted_rating_error]
+    
     @staticmethod
     def _shift_point_gh_values_to_string(shift_input_list):
         """
@@ -965,12 +1329,16 @@ class Record():
 
         return tuple_list
     
-    def create_shift_curves_section(self, ratings_list):
+    @traced()
+    def create_shift_curves_section(self, ratings_list, gh_ts_list = None, field_visit_list = None):
         """
-        Method to create the shift curves section of the record in tabular form.
+        Method to create the shift curves section of the record in tabular form, followed
+        by a plot of the shift applied over the record when the gage height record is given.
 
         Args:
             ratings_list(list[Rating]): List of ratings for the record's period.
+            gh_ts_list(list[Timeseries.Generic_Timeseries]): List of gage height timeseries, the shift is plotted over the first one's record
+            field_visit_list(list[Field_Visit.Field_Visit]): List of field visits during record period, their measured shifts are plotted
         """
         self.shift_section = "<p><strong>Shift Curves</strong></p>\n" \
             "<p>The shift curves used throughout the analysis period are predominately low-water shifts that resemble a half-house shape or null-shifts that perform no further adjustments to the base rating's computed discharge values. The gage height values for the shift input points were meant to represent the transition from full section control to section/channel to full channel control conditions.</p>\n"
@@ -1005,8 +1373,29 @@ class Record():
         else:
             shift_table = html_table.html_table(table_header_row, body_rows_list, 900, [150, 100, 150, 100, 400])
         subcaption = "<em style=\"box-sizing: border-box; color: #333333; font-family: Ubuntu; font-size: 15px; background-color: #ffffff;\">* Single magnitude values pertain to the shift magnitude of a half-house shifts whereby no changes to the gage height of input points occurred compared to the previous shift.</em></div>\n"
-        self.shift_section = self.shift_section + shift_table.return_html()
-        self.record_html = self.record_html + self.shift_section + subcaption + "</div>\n"
+        self.shift_section = self.shift_section + shift_table.return_html() + subcaption + "</div>\n"
+        self.shift_section = self.shift_section + self._return_shift_plot(ratings_list, gh_ts_list, field_visit_list)
+        self.record_html = self.record_html + self.shift_section
+    
+    def _return_shift_plot(self, ratings_list, gh_ts_list = None, field_visit_list = None):
+        """
+        Helper method to plot the shift applied at the recorded gage height over the
+        record period, with the measured shift of each discharge measurement.
+
+        Args:
+            ratings_list(list[Rating]): List of ratings for the record's period.
+            gh_ts_list(list[Timeseries.Generic_Timeseries]): List of gage height timeseries, the first one's record is used
+            field_visit_list(list[Field_Visit.Field_Visit]): List of field visits during record period
+        """
+        if not gh_ts_list or gh_ts_list[0].record_dataset is None or not gh_ts_list[0].record_dataset.has_data():
+            return ""
+        shift_engine = Shift_Engine(ratings_list)
+        gh_dataset = gh_ts_list[0].record_dataset
+        shifts, _ = shift_engine.evaluate_series(gh_dataset)
+        shift_plot = shift_engine.shift_plot_svg(gh_dataset.timestamps, shifts, field_visit_list)
+        if shift_plot == "":
+            return ""
+        return "<p><strong>Shift Over Time</strong></p>\n<div>\n" + shift_plot + "</div>\n"
         
     def create_computed_discharge_header(self):
         """
@@ -1015,6 +1404,7 @@ class Record():
         return "</div>\n<br />\n" + "<p><strong><span style=\"text-decoration: underline;\">Computed Discharge Record</span></strong></p>\n" \
         "<div style=\"padding-left:30px;\">\n"
     
+    @traced()
     def create_discharge_record_section(self, q_quality_tables):
         """
         Method to create the descriptor section of the computed discharge record.
@@ -1036,6 +1426,7 @@ class Record():
         return self.discharge_description
 
     
+    @traced()
     def create_q_data_gaps_section(self, gaps_list):
         """
         Method to construct a supplemental section pertaining to gaps in the
@@ -1062,18 +1453,35 @@ class Record():
             
         self.record_html = self.record_html + self.q_data_gaps_section
     
-    def create_estimate_section(self, general_corrections_list):
+    @staticmethod
+    def _volume_to_string(cfs_days: float) -> str:
+        """
+        Helper function to format a volume in cfs-days along with its acre-feet.
+
+        Args:
+            cfs_days(float): The volume in cfs-days
+        """
+        return "{:,.2f} cfs-days ({:,.1f} acre-ft)".format(cfs_days, cfs_days * Runoff.ACRE_FEET_PER_CFS_DAY)
+    
+    @traced()
+    def create_estimate_section(self, general_corrections_list, q_dataset = None):
         """
         Method to construct the estimates section for the discharge timeseries
         in tabular form. I moved this to the discharge section because our
-        office's policy is to not estimate GH (Ohio does though).
+        office's policy is to not estimate GH (Ohio does though). When the
+        discharge dataset is given, the volume of each estimate and the record
+        period's runoff attributable to estimates and ice are included.
 
         Args:
             general_corrections_list(list[General_Correction]): List of corrections
             to the discharge timeseries during the record period.
+            q_dataset(Dataset.Dataset): The discharge timeseries' record period dataset
         """
         self.estimates_section = "<p><strong>Estimates</strong></p>\n"
         edit_cnt = 0
+        runoff_engine = None
+        if q_dataset is not None and q_dataset.has_data():
+            runoff_engine = Runoff_Engine(q_dataset)
         
         for gen_corr in general_corrections_list:
             if gen_corr.correction_type == "CopyPaste":
@@ -1083,18 +1491,29 @@ class Record():
             self.estimates_section = self.estimates_section + "<p>No estimates were warranted during the analysis period.</p>\n"
         
         else:
-            table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Processing Order", "Comment"])
+            estimates = [gen_corr for gen_corr in Record._merge_corrections(general_corrections_list) if gen_corr.correction_type == "CopyPaste"]
+            volumes = [""] * len(estimates)
+            if runoff_engine is not None:
+                volumes = [Record._volume_to_string(runoff.cfs_days) for runoff in runoff_engine.between([gen_corr.start_datetime for gen_corr in estimates], [gen_corr.end_datetime for gen_corr in estimates])]
+            
+            table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Duration", "Processing Order", "Volume", "Comment"])
             body_rows_list = []
-            for gen_corr in general_corrections_list:
-                if gen_corr.correction_type == "CopyPaste":
-                    gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), gen_corr.processing_order, gen_corr.description])
-                    body_rows_list.append(gen_corr_body_row)
+            for gen_corr, volume in zip(estimates, volumes):
+                gen_corr_body_row = html_table.html_table_row([str(gen_corr.start_datetime), str(gen_corr.end_datetime), str(gen_corr.end_datetime - gen_corr.start_datetime), gen_corr.processing_order, volume, gen_corr.description])
+                body_rows_list.append(gen_corr_body_row)
             
-            edits_table = html_table.html_table(table_header_row, body_rows_list, 750, [175, 175, 150, 250])
+            edits_table = html_table.html_table(table_header_row, body_rows_list, 950, [150, 150, 100, 125, 200, 225])
             self.estimates_section = self.estimates_section + edits_table.return_html()
+        
+        if runoff_engine is not None:
+            runoff = runoff_engine.total()
+            self.estimates_section = self.estimates_section + "<p>Total runoff for the analysis period was " + Record._volume_to_string(runoff.cfs_days) \
+                + f", of which {Record._volume_to_string(runoff.estimated_cfs_days)} was estimated ({runoff.estimated_percent or 0:.1f}% of the total)" \
+                + f" and {Record._volume_to_string(runoff.ice_cfs_days)} was ice affected.</p>\n"
             
         self.record_html = self.record_html + self.estimates_section
         
+    @traced()
     def create_backwater_section(self, q_qualifiers_list):
         """
         Method to create the backwater section in tabular for if backwater
@@ -1117,19 +1536,13 @@ class Record():
             self.backwater_section = self.backwater_section + "<p>No periods of backwater were evident during the analysis period.</p>\n"
         
         else:
-            table_header_row = html_table.html_table_row(["Beginning Date/Time", "Ending Date/Time", "Supplemental Comments"])
-            body_rows_list = []
-            for qualifier in q_qualifiers_list:
-                if qualifier.identifier == "BACKWATER":
-                    bw_body_row = html_table.html_table_row([str(qualifier.start_datetime), str(qualifier.end_datetime), ""])
-                    body_rows_list.append(bw_body_row)
-            
-            backwater_table = html_table.html_table(table_header_row, body_rows_list, 900, [175, 175, 550])
-            self.estimates_section = self.estimates_section + backwater_table.return_html()
+            backwater_table = Record._return_qualifier_periods_table(q_qualifiers_list, "BACKWATER", 900)
+            self.backwater_section = self.backwater_section + backwater_table.return_html()
             
         self.record_html = self.record_html + self.backwater_section
     
     
+    @traced()
     def create_hydro_comparison_section(self, hydro_comp_text):
         """
         Method to construct the hydrographic comparison section using a user's provided
@@ -1140,6 +1553,7 @@ class Record():
         self.hydro_comp_section = self.hydro_comp_section + "<p>" + hydro_comp_text + "</p>\n"
         return self.hydro_comp_section
     
+    @traced()
     def create_peak_record_discharge_table(self, primary_record_q_dataset):
         """
         Method to construct the table peak discharges during the record period.
@@ -1177,6 +1591,48 @@ class Record():
         self.record_html = self.record_html + self.peak_recorder_streamflow_section + "</div>" +  "<br />\n"    
 
 
+    @staticmethod
+    def _return_daily_mean_rows(water_year_q_dataset, label_suffix: str) -> list:
+        """
+        Helper method to return the water-year extremes table rows for the highest
+        and lowest daily mean discharge of a water year.
+
+        Args:
+            water_year_q_dataset(Dataset): The water year's discharge dataset
+            label_suffix(str): Appended to the row labels, e.g. the sublocation
+        """
+        daily_values = water_year_q_dataset.daily_values
+        if daily_values is None:
+            return []
+        
+        max_day, max_mean = daily_values.max_mean_day()
+        min_day, min_mean = daily_values.min_mean_day()
+        if max_day is None:
+            return []
+        return [html_table.html_table_row([f"Max Daily Mean Discharge{label_suffix}", str(max_day), "{:.2f}".format(max_mean) + " cfs"]),
+                html_table.html_table_row([f"Min Daily Mean Discharge{label_suffix}", str(min_day), "{:.2f}".format(min_mean) + " cfs"])]
+    
+    @staticmethod
+    def _return_runoff_rows(water_year_q_dataset, label_suffix: str) -> list:
+        """
+        Helper method to return the water-year extremes table rows for the total
+        runoff, mean discharge and estimated runoff of a water year.
+
+        Args:
+            water_year_q_dataset(Dataset): The water year's discharge dataset
+            label_suffix(str): Appended to the row labels, e.g. the sublocation
+        """
+        if not water_year_q_dataset.has_data():
+            return []
+        
+        runoff = Runoff_Engine(water_year_q_dataset).total()
+        if runoff.mean_flow is None:
+            return []
+        return [html_table.html_table_row([f"Total Runoff{label_suffix}", "", Record._volume_to_string(runoff.cfs_days)]),
+                html_table.html_table_row([f"Mean Discharge{label_suffix}", "", "{:.2f}".format(runoff.mean_flow) + " cfs"]),
+                html_table.html_table_row([f"Estimated Runoff{label_suffix}", "", Record._volume_to_string(runoff.estimated_cfs_days)])]
+    
+    @traced()
     def _create_wy_extremes_table_section(self, site_obj: SiteV3.Site):
         """
         Method to construct the water-year extremes tables for the record period. If
@@ -1241,6 +1697,8 @@ class Record():
 
                 body_rows_list.append(html_table.html_table_row(["Max Discharge", max_q_point_datetime_str, "{:.2f}".format(water_year_q_dataset.max_point.value) + "\'"]))
                 body_rows_list.append(html_table.html_table_row(["Min Discharge", min_q_point_datetime_str, "{:.2f}".format(water_year_q_dataset.min_point.value) + "\'"]))
+                body_rows_list += Record._return_daily_mean_rows(water_year_q_dataset, "")
+                body_rows_list += Record._return_runoff_rows(water_year_q_dataset, "")
                 
             elif len(site_obj.discharge_timeseries_list) > 1:
                 for q_ts in site_obj.discharge_timeseries_list:
@@ -1256,6 +1714,8 @@ class Record():
 
                     body_rows_list.append(html_table.html_table_row([f"Max Gage Height ({q_ts.TS_sublocation})", max_q_point_datetime_str, "{:.2f}".format(water_year_q_dataset.max_point.value) + "\'"]))
                     body_rows_list.append(html_table.html_table_row([f"Min Gage Height ({q_ts.TS_sublocation})", min_q_point_datetime_str, "{:.2f}".format(water_year_q_dataset.min_point.value) + "\'"]))
+                    body_rows_list += Record._return_daily_mean_rows(water_year_q_dataset, f" ({q_ts.TS_sublocation})")
+                    body_rows_list += Record._return_runoff_rows(water_year_q_dataset, f" ({q_ts.TS_sublocation})")
 
             extremes_table = html_table.html_table(table_header_row, body_rows_list, 580)
             subcaption = "<em style=\"box-sizing: border-box; color: #333333; font-family: Ubuntu; font-size: 15px; background-color: #ffffff;\">* Multiple occurrences of the same extreme in selected dataset. First occurrence listed. E = Estimated</em></div>\n"
@@ -0,0 +1,173 @@
+from datetime import datetime
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Runoff():
+    """
+    Volume of discharge over a period.
+
+    Args:
+        cfs_days(float): Total volume in cfs-days
+        estimated_cfs_days(float): Part of the volume within estimated periods
+        ice_cfs_days(float): Part of the volume within ice affected periods
+        covered_days(float): Days of the period covered by unit values, gaps left out
+    """
+    ACRE_FEET_PER_CFS_DAY = 1.98347
+
+    def __init__(self, cfs_days: float, estimated_cfs_days: float, ice_cfs_days: float, covered_days: float) -> None:
+        self.cfs_days = cfs_days
+        self.estimated_cfs_days = estimated_cfs_days
+        self.ice_cfs_days = ice_cfs_days
+        self.covered_days = covered_days
+
+    @property
+    def acre_feet(self) -> float:
+        return self.cfs_days * Runoff.ACRE_FEET_PER_CFS_DAY
+
+    @property
+    def estimated_acre_feet(self) -> float:
+        return self.estimated_cfs_days * Runoff.ACRE_FEET_PER_CFS_DAY
+
+    @property
+    def ice_acre_feet(self) -> float:
+        return self.ice_cfs_days * Runoff.ACRE_FEET_PER_CFS_DAY
+
+    @property
+    def mean_flow(self) -> float:
+        """
+        Mean discharge in cfs over the covered part of the period, None if nothing is covered.
+        """
+        if self.covered_days <= 0:
+            return None
+        return self.cfs_days / self.covered_days
+
+    @property
+    def estimated_percent(self) -> float:
+        """
+        Share of the volume within estimated periods, None without any volume.
+        """
+        if self.cfs_days <= 0:
+            return None
+        return 100.0 * self.estimated_cfs_days / self.cfs_days
+
+
+class Runoff_Engine():
+    """
+    Integrates a discharge dataset's unit values over time with the trapezoidal
+    rule. Only intervals between two consecutive present unit values outside
+    the dataset's gaps count, so gaps add no volume and are left out of the
+    mean flow.
+
+    Each interval is flagged estimated (ESTIMATED qualifier or copy & paste
+    correction) or ice affected (ICE qualifier) by its midpoint, and running
+    sums of the volumes are kept once, so the volume of any period, including
+    partial intervals at its ends, comes from two lookups.
+
+    Args:
+        dataset(Dataset.Dataset): The gathered discharge dataset, with its gaps assessed
+    """
+    SECONDS_PER_DAY = 86400.0
+    ESTIMATED_QUALIFIERS = ("ESTIMATED",)
+    ESTIMATED_CORRECTIONS = ("CopyPaste",)
+    ICE_QUALIFIERS = ("ICE",)
+
+    def __init__(self, dataset) -> None:
+        self.dataset = dataset
+        self.times = np.array([], dtype=np.int64)
+        self.values = np.array([])
+        self.valid = np.array([], dtype=bool)
+        # Rows: volume, estimated volume, ice volume and covered days, per interval and summed up to the start of each interval
+        self.interval_sums = np.zeros((4, 0))
+        self.cumulative = np.zeros((4, 1))
+        if dataset.has_data() and len(dataset.timestamps) > 1:
+            self._integrate()
+
+    @staticmethod
+    def _periods(periods: list, identifiers: tuple, attribute: str) -> Interval_Set:
+        """
+        Helper method to merge the qualifiers or corrections of the given types into one set.
+        """
+        return Interval_Set.from_periods(period for period in periods if getattr(period, attribute) in identifiers)
+
+    def _integrate(self) -> None:
+        """
+        Helper method to compute the interval volumes, masks and their running sums.
+        """
+        self.times = self.dataset.timestamps.astype(np.int64)
+        self.values = self.dataset.values
+        durations = np.diff(self.times).astype(np.float64)
+        midpoints = (self.times[:-1] + self.times[1:]) // 2
+        midpoint_times = midpoints.astype("datetime64[s]")
+        # Unit values are gathered without gap markers, an interval spanning a gap has its midpoint in it
+        self.valid = ~np.isnan(self.values[:-1]) & ~np.isnan(self.values[1:]) & (Interval_Set.from_periods(self.dataset.gaps).locate(midpoint_times) < 0)
+        volumes = np.where(self.valid, (self.values[:-1] + self.values[1:]) / 2.0 * durations / Runoff_Engine.SECONDS_PER_DAY, 0.0)
+
+        qualifiers = self.dataset.qualifiers
+        estimated = (Runoff_Engine._periods(qualifiers, Runoff_Engine.ESTIMATED_QUALIFIERS, "identifier").locate(midpoint_times) >= 0) \
+            | (Runoff_Engine._periods(self.dataset.general_corrections, Runoff_Engine.ESTIMATED_CORRECTIONS, "correction_type").locate(midpoint_times) >= 0)
+        ice = Runoff_Engine._periods(qualifiers, Runoff_Engine.ICE_QUALIFIERS, "identifier").locate(midpoint_times) >= 0
+
+        self.interval_sums = np.vstack((volumes, volumes * estimated, volumes * ice, np.where(self.valid, durations / Runoff_Engine.SECONDS_PER_DAY, 0.0)))
+        self.cumulative = np.concatenate((np.zeros((4, 1)), np.cumsum(self.interval_sums, axis=1)), axis=1)
+
+    def _cumulative_at(self, times: np.ndarray) -> np.ndarray:
+        """
+        Helper method to compute the running sums from the first unit value up to each
+        time, the interval it falls in integrated up to the time.
+        """
+        if len(self.times) < 2:
+            return np.zeros((4, len(times)))
+        times = np.clip(times, self.times[0], self.times[-1])
+        interval = np.clip(np.searchsorted(self.times, times, side="right") - 1, 0, len(self.times) - 2)
+        elapsed = (times - self.times[interval]).astype(np.float64)
+        duration = (self.times[interval + 1] - self.times[interval]).astype(np.float64)
+        fraction = elapsed / duration
+
+        valid = self.valid[interval]
+        start_values = np.where(valid, self.values[interval], 0.0)
+        end_values = np.where(valid, self.values[interval + 1], 0.0)
+        # Area of the trapezoid from the interval's start to the time, as a share of the whole interval's volume
+        partial_area = (start_values + (start_values + fraction * (end_values - start_values))) / 2.0 * elapsed
+        whole_area = (start_values + end_values) / 2.0 * duration
+        area_share = np.divide(partial_area, whole_area, out=fraction.copy(), where=whole_area != 0)
+        shares = np.vstack((area_share, area_share, area_share, fraction))
+        return self.cumulative[:, interval] + shares * self.interval_sums[:, interval]
+
+    def between(self, window_starts, window_ends) -> list:
+        """
+        The runoff within each window.
+
+        Args:
+            window_starts(np.ndarray): Start of each window, datetime64 or datetime
+            window_ends(np.ndarray): End of each window, datetime64 or datetime
+
+        Returns:
+            list[Runoff]: The runoff of each window
+        """
+        starts = np.asarray(window_starts, dtype="datetime64[s]").astype(np.int64)
+        ends = np.asarray(window_ends, dtype="datetime64[s]").astype(np.int64)
+        sums = self._cumulative_at(ends) - self._cumulative_at(starts)
+        return [Runoff(*window_sums) for window_sums in sums.T.tolist()]
+
+    def total(self) -> Runoff:
+        """
+        The runoff over the whole dataset.
+        """
+        return Runoff(*self.cumulative[:, -1].tolist())
+
+    def by_water_year(self) -> dict:
+        """
+        The runoff within each water year (October through September) the dataset covers.
+
+        Returns:
+            dict[str: Runoff]: The runoff keyed by water year, as Timeseries.water_year_datasets
+        """
+        if len(self.times) < 2:
+            return {}
+        first_year = self.dataset.timestamps[0].astype(object).year
+        last_year = self.dataset.timestamps[-1].astype(object).year + 1
+        water_years = list(range(first_year, last_year + 1))
+        starts = [datetime(water_year - 1, 10, 1) for water_year in water_years]
+        ends = [datetime(water_year, 10, 1) for water_year in water_years]
+        return {str(water_year): runoff for water_year, runoff in zip(water_years, self.between(starts, ends)) if runoff.covered_days > 0}
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Sensor_Alignment():
+    """
+    Puts the record datasets of two or more gage height timeseries on a common
+    time grid to compare a reference (primary) sensor against the others.
+
+    The grid is the k-way merge of every dataset's unit value times. Each
+    dataset is linearly interpolated onto it, NaN outside its first and last
+    unit value and within its gaps, so differences are only taken where both
+    sensors recorded.
+
+    Args:
+        datasets(list[Dataset.Dataset]): The datasets, the first one being the reference
+        labels(list[str]): Name of each dataset in the comparison, e.g. the sublocation
+    """
+    # Differences beyond this, in feet, are reported as periods of divergence
+    DIVERGENCE_THRESHOLD = 0.05
+    # Divergences this close together are reported as one period instead of flickering around the threshold
+    DIVERGENCE_MERGE_TOLERANCE = timedelta(hours=1)
+
+    def __init__(self, datasets: list, labels: list) -> None:
+        self.labels = list(labels)
+        self.grid = Sensor_Alignment._merge_times([dataset.timestamps for dataset in datasets if dataset.has_data()])
+        self.aligned_values = [Sensor_Alignment._align(dataset, self.grid) for dataset in datasets]
+
+    @staticmethod
+    def _merge_times(timestamp_arrays: list) -> np.ndarray:
+        """
+        Helper method to k-way merge sorted timestamp arrays into one sorted grid
+        without duplicates.
+        """
+        if len(timestamp_arrays) == 0:
+            return np.array([], dtype="datetime64[s]")
+        # The stable sort is a timsort, which finds the already sorted arrays as runs and merges them
+        merged = np.sort(np.concatenate([timestamps.astype(np.int64) for timestamps in timestamp_arrays]), kind="stable")
+        keep = np.concatenate(([True], merged[1:] != merged[:-1])) if len(merged) else np.array([], dtype=bool)
+        return merged[keep].astype("datetime64[s]")
+
+    @staticmethod
+    def _align(dataset, grid: np.ndarray) -> np.ndarray:
+        """
+        Helper method to interpolate a dataset's unit values onto the grid.
+        """
+        aligned = np.full(len(grid), np.nan)
+        if not dataset.has_data() or len(grid) == 0:
+            return aligned
+
+        values = dataset.values
+        present = ~np.isnan(values)
+        times = dataset.timestamps[present].astype(np.int64)
+        grid_times = grid.astype(np.int64)
+        if len(times) == 0:
+            return aligned
+
+        aligned = np.interp(grid_times, times, values[present])
+        outside = (grid_times < times[0]) | (grid_times > times[-1])
+        in_gap = Interval_Set.from_periods(dataset.gaps).locate(grid) >= 0
+        # A gap's own bounding unit values are real readings, only the points strictly within are missing
+        on_unit_value = np.isin(grid_times, times)
+        aligned[outside | (in_gap & ~on_unit_value)] = np.nan
+        return aligned
+
+    def differences(self, index: int) -> np.ndarray:
+        """
+        The difference series of a dataset minus the reference dataset on the grid, NaN where either is missing.
+
+        Args:
+            index(int): Index of the compared dataset (1 or more)
+        """
+        return self.aligned_values[index] - self.aligned_values[0]
+
+    def summary(self, index: int, threshold: float = None) -> dict:
+        """
+        Summary statistics of a dataset against the reference.
+
+        Args:
+            index(int): Index of the compared dataset (1 or more)
+            threshold(float): Divergence threshold in feet, defaults to DIVERGENCE_THRESHOLD
+
+        Returns:
+            dict: compared_points, mean_offset, drift_per_day, max_divergence,
+            max_divergence_datetime and divergence_periods (Interval_Set), None values when nothing overlaps
+        """
+        threshold = Sensor_Alignment.DIVERGENCE_THRESHOLD if threshold is None else threshold
+        differences = self.differences(index)
+        compared = ~np.isnan(differences)
+        summary = {"compared_points": int(np.count_nonzero(compared)),
+                   "mean_offset": None,
+                   "drift_per_day": None,
+                   "max_divergence": None,
+                   "max_divergence_datetime": None,
+                   "divergence_periods": Interval_Set()}
+        if summary["compared_points"] == 0:
+            return summary
+
+        compared_differences = differences[compared]
+        compared_days = (self.grid[compared] - self.grid[compared][0]).astype(np.int64) / 86400.0
+        summary["mean_offset"] = float(np.mean(compared_differences))
+        if summary["compared_points"] > 1 and compared_days[-1] > 0:
+            summary["drift_per_day"] = float(np.polyfit(compared_days, compared_differences, 1)[0])
+        max_index = int(np.argmax(np.abs(compared_differences)))
+        summary["max_divergence"] = float(compared_differences[max_index])
+        summary["max_divergence_datetime"] = self.grid[compared][max_index].astype(datetime)
+        summary["divergence_periods"] = self._periods_over(np.abs(differences) > threshold + 1e-9)
+        return summary
+
+    def _periods_over(self, over: np.ndarray) -> Interval_Set:
+        """
+        Helper method to turn runs of grid points flagged over the threshold into
+        periods, merging runs separated by less than DIVERGENCE_MERGE_TOLERANCE.
+        """
+        flags = np.concatenate(([False], over, [False]))
+        run_starts = np.flatnonzero(~flags[:-1] & flags[1:])
+        run_ends = np.flatnonzero(flags[:-1] & ~flags[1:]) - 1
+        return Interval_Set(self.grid[run_starts], self.grid[run_ends], Sensor_Alignment.DIVERGENCE_MERGE_TOLERANCE)
@@ -0,0 +1,327 @@
+import numpy as np
+
+
+class Shift_Engine():
+    """
+    Applies a rating model's shift curves and base ratings to arrays of times
+    and stages, for the discharge measurements and for a whole gage height
+    record alike.
+
+    The shift at a time and stage is interpolated by stage between the shift
+    input points of the shift curves around it (held constant past the first
+    and last input point). A shift curve applies unchanged from its start to
+    its end, or to the next shift's start if that comes first, and from its
+    end the shift is prorated linearly in time into the next shift. Before a
+    rating's first shift curve no shift applies, after its last one the last
+    shift is held to the end of the rating.
+
+    The shifted rating is the base rating at the stage plus the shift. It is
+    rated from the rating's base rating table: in log space against the stage
+    above the offset (gage height of zero flow) for logarithmic tables,
+    linearly otherwise. Stages outside the table rate to NaN.
+
+    Args:
+        ratings_list(list[Rating.Rating]): The rating model's ratings, a later rating taking over where periods overlap
+    """
+    LOGARITHMIC_TABLE = "LogarithmicTable"
+    # Stage resolution at which a rating is inverted to find a measurement's shift
+    INVERSION_STEP = 0.005
+    PLOT_WIDTH = 900
+    PLOT_HEIGHT = 250
+    PLOT_MARGIN = 50
+
+    def __init__(self, ratings_list: list) -> None:
+        self.ratings_list = ratings_list
+
+    @staticmethod
+    def _as_times(times) -> np.ndarray:
+        """
+        Helper method to accept datetimes as well as datetime64 times.
+        """
+        return np.asarray(times, dtype="datetime64[s]")
+
+    def _rating_indices(self, times: np.ndarray) -> np.ndarray:
+        """
+        Helper method to find the index of the rating in effect at each time, -1 where there is none.
+        """
+        indices = np.full(len(times), -1, dtype=np.int64)
+        for index, rating in enumerate(self.ratings_list):
+            in_rating = (times >= np.datetime64(rating.start_datetime, "s")) & (times <= np.datetime64(rating.end_datetime, "s"))
+            indices[in_rating] = index
+        return indices
+
+    @staticmethod
+    def _shifts_by_stage(shift_point_list: list, stages: np.ndarray) -> np.ndarray:
+        """
+        Helper method to interpolate a shift curve's input points at each stage.
+        """
+        if len(shift_point_list) == 0:
+            return np.zeros(len(stages))
+        shift_points = np.array(sorted(shift_point_list), dtype=np.float64)
+        return np.interp(stages, shift_points[:, 0], shift_points[:, 1])
+
+    @staticmethod
+    def _rating_shifts(rating, times: np.ndarray, stages: np.ndarray) -> np.ndarray:
+        """
+        Helper method to compute one rating's shifts at times within it. Each
+        shift curve is evaluated once over the stages of the times it covers.
+        """
+        shift_curves = sorted(rating.shift_curve_list, key=lambda shift_curve: shift_curve.start_datetime)
+        shifts = np.zeros(len(times))
+        if len(shift_curves) == 0:
+            return shifts
+
+        starts = np.array([shift_curve.start_datetime for shift_curve in shift_curves], dtype="datetime64[s]")
+        next_starts = np.append(starts[1:], np.datetime64(rating.end_datetime, "s"))
+        ends = np.minimum(np.array([shift_curve.end_datetime for shift_curve in shift_curves], dtype="datetime64[s]"), next_starts)
+        curve_indices = np.searchsorted(starts, times, side="right") - 1
+
+        for index, shift_curve in enumerate(shift_curves):
+            in_curve = curve_indices == index
+            if not in_curve.any():
+                continue
+            curve_shifts = Shift_Engine._shifts_by_stage(shift_curve.shift_point_list, stages[in_curve])
+            if index + 1 < len(shift_curves):
+                span = max((next_starts[index] - ends[index]).astype(np.int64), 1)
+                fraction = np.clip((times[in_curve] - ends[index]).astype(np.int64) / span, 0.0, 1.0)
+                next_shifts = Shift_Engine._shifts_by_stage(shift_curves[index + 1].shift_point_list, stages[in_curve])
+                curve_shifts = curve_shifts + fraction * (next_shifts - curve_shifts)
+            shifts[in_curve] = curve_shifts
+        return shifts
+
+    def shifts_at(self, times, stages) -> np.ndarray:
+        """
+        The shift in effect at each time and stage.
+
+        Args:
+            times(np.ndarray): Times, datetime64 or datetime
+            stages(np.ndarray): Gage height at each time
+
+        Returns:
+            np.ndarray: The shifts, NaN where no rating is in effect or the stage is missing
+        """
+        times = Shift_Engine._as_times(times)
+        stages = np.asarray(stages, dtype=np.float64)
+        shifts = np.full(len(times), np.nan)
+        rating_indices = self._rating_indices(times)
+        for index, rating in enumerate(self.ratings_list):
+            in_rating = rating_indices == index
+            if in_rating.any():
+                shifts[in_rating] = Shift_Engine._rating_shifts(rating, times[in_rating], stages[in_rating])
+        shifts[np.isnan(stages)] = np.nan
+        return shifts
+
+    @staticmethod
+    def _offsets_at(rating, stages: np.ndarray) -> np.ndarray:
+        """
+        Helper method to look up the offset applying to each stage, that of the
+        last offset point at or below it, the first offset below all of them.
+        """
+        if len(rating.offset_points) == 0:
+            return np.zeros(len(stages))
+        offset_points = np.array(sorted(rating.offset_points), dtype=np.float64)
+        index = np.clip(np.searchsorted(offset_points[:, 0], stages, side="right") - 1, 0, len(offset_points) - 1)
+        return offset_points[index, 1]
+
+    @staticmethod
+    def rate(rating, stages) -> np.ndarray:
+        """
+        Rate stages with a rating's base rating table.
+
+        Args:
+            rating(Rating.Rating): The rating
+            stages(np.ndarray): Stages, shifted where the shifted rating is wanted
+
+        Returns:
+            np.ndarray: The discharge at each stage, NaN outside the table or without a table
+        """
+        stages = np.asarray(stages, dtype=np.float64)
+        discharges = np.full(len(stages), np.nan)
+        if len(rating.base_rating_points) < 2:
+            return discharges
+        table = np.array(sorted(rating.base_rating_points), dtype=np.float64)
+        in_table = ~np.isnan(stages) & (stages >= table[0, 0]) & (stages <= table[-1, 0])
+        stages = stages[in_table]
+
+        segment = np.clip(np.searchsorted(table[:, 0], stages, side="right") - 1, 0, len(table) - 2)
+        low_stages, high_stages = table[segment, 0], table[segment + 1, 0]
+        low_discharges, high_discharges = table[segment, 1], table[segment + 1, 1]
+        rated = low_discharges + (stages - low_stages) / (high_stages - low_stages) * (high_discharges - low_discharges)
+
+        if rating.rating_type == Shift_Engine.LOGARITHMIC_TABLE:
+            offsets = Shift_Engine._offsets_at(rating, stages)
+            # Log interpolation only where every term is positive, linear below the offset and at zero flow
+            loggable = (low_stages > offsets) & (stages > offsets) & (low_discharges > 0) & (high_discharges > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fraction = (np.log(stages - offsets) - np.log(low_stages - offsets)) / (np.log(high_stages - offsets) - np.log(low_stages - offsets))
+                logged = low_discharges * np.exp(fraction * np.log(high_discharges / low_discharges))
+            rated = np.where(loggable, logged, rated)
+
+        discharges[in_table] = rated
+        return discharges
+
+    def shifted_discharges(self, times, stages) -> tuple:
+        """
+        The shift and the discharge of the shifted rating at each time and stage.
+
+        Args:
+            times(np.ndarray): Times, datetime64 or datetime
+            stages(np.ndarray): Gage height at each time
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): The shifts and the discharges, NaN where they cannot be computed
+        """
+        times = Shift_Engine._as_times(times)
+        stages = np.asarray(stages, dtype=np.float64)
+        shifts = self.shifts_at(times, stages)
+        discharges = np.full(len(times), np.nan)
+        rating_indices = self._rating_indices(times)
+        for index, rating in enumerate(self.ratings_list):
+            in_rating = rating_indices == index
+            if in_rating.any():
+                discharges[in_rating] = Shift_Engine.rate(rating, stages[in_rating] + shifts[in_rating])
+        return shifts, discharges
+
+    def evaluate_series(self, dataset) -> tuple:
+        """
+        The shifts and shifted rating discharges over a gage height dataset.
+
+        Args:
+            dataset(Dataset.Dataset): The gathered gage height dataset
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): The shifts and the discharges at each of the dataset's times
+        """
+        if not dataset.has_data():
+            return np.array([]), np.array([])
+        return self.shifted_discharges(dataset.timestamps, dataset.values)
+
+    @staticmethod
+    def measured_shift(rating, stage: float, discharge: float) -> float:
+        """
+        The shift that would put a measurement on the base rating: the stage the
+        base rating gives its discharge at, less its stage.
+
+        Args:
+            rating(Rating.Rating): The rating in effect at the measurement
+            stage(float): The measurement's mean gage height
+            discharge(float): The measured discharge
+
+        Returns:
+            float: The shift, None without a table or outside it
+        """
+        if len(rating.base_rating_points) < 2:
+            return None
+        table = np.array(sorted(rating.base_rating_points), dtype=np.float64)
+        stages = np.arange(table[0, 0], table[-1, 0] + Shift_Engine.INVERSION_STEP, Shift_Engine.INVERSION_STEP)
+        discharges = Shift_Engine.rate(rating, stages)
+        valid = ~np.isnan(discharges)
+        # A rating rises with stage, only its first stage of each discharge is kept for the inversion
+        discharges, first = np.unique(discharges[valid], return_index=True)
+        if len(discharges) < 2 or not discharges[0] <= discharge <= discharges[-1]:
+            return None
+        return float(np.interp(discharge, discharges, stages[valid][first])) - stage
+
+    def backcheck_measurements(self, field_visit_list: list) -> None:
+        """
+        Shift every discharge measurement's mean gage height and compare its
+        discharge with the shifted rating's. Without a base rating table the
+        shifted stage is rated through AQ instead.
+
+        Sets applied_shift, measured_shift and difference_from_shifted_rating, in
+        percent of the shifted rating's discharge, on each measurement.
+
+        Args:
+            field_visit_list(list[Field_Visit.Field_Visit]): List of field visits during record period
+        """
+        measurements = [qm for visit in field_visit_list for qm in visit.dischage_measurements if qm.mgh is not None]
+        if len(measurements) == 0:
+            return
+        times = Shift_Engine._as_times([qm.qm_time for qm in measurements])
+        stages = np.array([qm.mgh for qm in measurements], dtype=np.float64)
+        shifts, discharges = self.shifted_discharges(times, stages)
+        rating_indices = self._rating_indices(times)
+
+        for qm, shift, shifted_discharge, rating_index in zip(measurements, shifts.tolist(), discharges.tolist(), rating_indices.tolist()):
+            if rating_index < 0:
+                continue
+            rating = self.ratings_list[rating_index]
+            qm.applied_shift = round(shift, 3)
+            if np.isnan(shifted_discharge) and len(rating.base_rating_points) < 2:
+                shifted_discharge = float(rating.api_session.get_discharge_rating_base_output_by_gh(rating.rating_model_id, qm.mgh + shift, qm.qm_time)["OutputValues"][0])
+            if not np.isnan(shifted_discharge) and shifted_discharge != 0:
+                qm.difference_from_shifted_rating = ((float(qm.discharge) - shifted_discharge) / shifted_discharge) * 100
+            measured_shift = Shift_Engine.measured_shift(rating, qm.mgh, float(qm.discharge))
+            qm.measured_shift = None if measured_shift is None else round(measured_shift, 3)
+
+    @staticmethod
+    def _envelope(times: np.ndarray, values: np.ndarray, columns: int) -> tuple:
+        """
+        Helper method to reduce a series to the minimum and maximum of each plot
+        column, which keeps every step and spike visible at a fraction of the points.
+        """
+        present = ~np.isnan(values)
+        times = times[present].astype(np.int64)
+        values = values[present]
+        if len(values) <= 2 * columns:
+            return times, values
+        bins = ((times - times[0]) * columns // max(times[-1] - times[0], 1)).clip(0, columns - 1)
+        bin_starts = np.flatnonzero(np.concatenate(([True], np.diff(bins) > 0)))
+        bin_times = times[bin_starts]
+        lows = np.minimum.reduceat(values, bin_starts)
+        highs = np.maximum.reduceat(values, bin_starts)
+        return np.repeat(bin_times, 2), np.column_stack((lows, highs)).ravel()
+
+    def shift_plot_svg(self, times, shifts, field_visit_list: list = None) -> str:
+        """
+        An inline SVG plot of the shift over time, with the discharge measurements'
+        measured shifts as points.
+
+        Args:
+            times(np.ndarray): The gage height record's times, datetime64
+            shifts(np.ndarray): The shift at each time, e.g. from evaluate_series
+            field_visit_list(list[Field_Visit.Field_Visit]): Visits whose measurements are plotted, after backcheck_measurements
+
+        Returns:
+            str: The SVG element, an empty string if there is no shift to plot
+        """
+        times = Shift_Engine._as_times(times)
+        shifts = np.asarray(shifts, dtype=np.float64)
+        line_times, line_shifts = Shift_Engine._envelope(times, shifts, Shift_Engine.PLOT_WIDTH - 2 * Shift_Engine.PLOT_MARGIN)
+        if len(line_shifts) == 0:
+            return ""
+
+        points = [(np.datetime64(qm.qm_time, "s").astype(np.int64), qm.measured_shift)
+                  for visit in (field_visit_list or []) for qm in visit.dischage_measurements
+                  if getattr(qm, "measured_shift", None) is not None and times[0] <= np.datetime64(qm.qm_time, "s") <= times[-1]]
+        first_time, last_time = int(line_times[0]), max(int(line_times[-1]), int(line_times[0]) + 1)
+        all_shifts = np.concatenate((line_shifts, [shift for _, shift in points], [0.0]))
+        low, high = float(all_shifts.min()), float(all_shifts.max())
+        if high - low < 0.1:
+            low, high = low - 0.05, high + 0.05
+
+        margin = Shift_Engine.PLOT_MARGIN
+        plot_width = Shift_Engine.PLOT_WIDTH - 2 * margin
+        plot_height = Shift_Engine.PLOT_HEIGHT - 2 * margin
+
+        def x(time):
+            return margin + (time - first_time) * plot_width / (last_time - first_time)
+
+        def y(shift):
+            return margin + (high - shift) * plot_height / (high - low)
+
+        polyline = " ".join(f"{x(time):.1f},{y(shift):.1f}" for time, shift in zip(line_times.tolist(), line_shifts.tolist()))
+        svg = f"<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"{Shift_Engine.PLOT_WIDTH}\" height=\"{Shift_Engine.PLOT_HEIGHT}\" style=\"font-family: Ubuntu; font-size: 12px;\">\n"
+        svg += f"<rect x=\"{margin}\" y=\"{margin}\" width=\"{plot_width}\" height=\"{plot_height}\" fill=\"none\" stroke=\"#999999\"/>\n"
+        svg += f"<line x1=\"{margin}\" y1=\"{y(0.0):.1f}\" x2=\"{margin + plot_width}\" y2=\"{y(0.0):.1f}\" stroke=\"#cccccc\" stroke-dasharray=\"4\"/>\n"
+        svg += f"<polyline points=\"{polyline}\" fill=\"none\" stroke=\"#1f77b4\" stroke-width=\"1.5\"/>\n"
+        for time, shift in points:
+            svg += f"<circle cx=\"{x(time):.1f}\" cy=\"{y(shift):.1f}\" r=\"4\" fill=\"#d62728\"/>\n"
+        for shift in (high, 0.0, low):
+            svg += f"<text x=\"{margin - 5}\" y=\"{y(shift) + 4:.1f}\" text-anchor=\"end\">{shift:.2f}'</text>\n"
+        for time in (first_time, last_time):
+            label = np.datetime64(time, "s").astype(object).strftime("%Y-%m-%d")
+            svg += f"<text x=\"{x(time):.1f}\" y=\"{margin + plot_height + 15}\" text-anchor=\"middle\">{label}</text>\n"
+        svg += f"<text x=\"{margin}\" y=\"{margin - 10}\">Applied shift at the recorded gage height (line) and measured shifts (points)</text>\n"
+        svg += "</svg>\n"
+        return svg
@@ -1,8 +1,12 @@
 import SiteV3, Record
+import logging
 from datetime import datetime, date, timedelta
-from API_Session_V3 import SynchronousAquariusAPISession
-from PyQt5.QtWidgets import QScrollArea, QLineEdit, QDateEdit, QPushButton, QFormLayout
+from API_Session_V3 import SynchronousSIMsAPISession, API_Call_Ledger, API_Request_Error
+from PyQt5.QtWidgets import QScrollArea, QLineEdit, QDateEdit, QPushButton, QFormLayout, QCompleter, QFileDialog
+from PyQt5.QtCore import QStringListModel
 from PyQt5 import QtCore
+from Metadata_Index import Metadata_Index
+from Snapshot import Snapshot
 from Text_Line import Text_Line
 from User_Inputs import User_Inputs
 from PyQt5.QtCore import QDate
@@ -32,6 +36,7 @@ class SiteSelectionTab(QScrollArea):
         station_font = self.station.font()
         station_font.setPointSize(10)
         self.station.setFont(station_font)
+        self._setup_station_completer()
         
         self.author = QLineEdit()
         self.author.setText("Michael H. Grentzer")
@@ -67,8 +72,130 @@ class SiteSelectionTab(QScrollArea):
 
         self.submit_button = SubmitButton()
         layout.addRow(self.submit_button)
+        self._add_snapshot_buttons(layout)
         self.setLayout(layout)
 
+    def _add_snapshot_buttons(self, layout):
+        """
+        Add the buttons to save the review to a snapshot, reopen one, and refresh
+        a reopened review's stale data from AQ.
+        """
+        self.save_snapshot_button = QPushButton("Save Snapshot")
+        self.open_snapshot_button = QPushButton("Open Snapshot")
+        self.refresh_snapshot_button = QPushButton("Refresh Stale Data")
+        for button in (self.save_snapshot_button, self.open_snapshot_button, self.refresh_snapshot_button):
+            button.setFixedWidth(200)
+            layout.addRow(button)
+
+        self.save_snapshot_button.clicked.connect(self.save_snapshot)
+        self.open_snapshot_button.clicked.connect(self.open_snapshot)
+        self.refresh_snapshot_button.clicked.connect(self.refresh_stale_data)
+
+    def save_snapshot(self):
+        """
+        Save the current review, including quality tables and notes, to a snapshot file.
+        """
+        if User_Inputs.site is None:
+            User_Inputs.critical_error_message("Error: Nothing to save, submit a site first.")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Snapshot", f"{User_Inputs.site_no}{Snapshot.FILE_EXTENSION}", Snapshot.FILE_FILTER)
+        if file_path == "":
+            return
+        if not file_path.endswith(Snapshot.FILE_EXTENSION):
+            file_path += Snapshot.FILE_EXTENSION
+
+        try:
+            Snapshot.save(file_path,
+                          [table.return_row_values() for table in User_Inputs.gh_tables_list],
+                          [table.return_row_values() for table in User_Inputs.q_tables_list])
+        except Exception as e:
+            print(str(e))
+            User_Inputs.critical_error_message(f"Error: Cannot save snapshot\n\n{e}")
+
+    def open_snapshot(self):
+        """
+        Restore a review from a snapshot file and set up the tabs from it without
+        any request to AQ.
+        """
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Snapshot", "", Snapshot.FILE_FILTER)
+        if file_path == "":
+            return
+
+        try:
+            manifest = Snapshot.load(file_path, User_Inputs.api_session, User_Inputs.sims_session)
+        except Exception as e:
+            print(str(e))
+            User_Inputs.critical_error_message(f"Error: Cannot open snapshot\n\n{e}")
+            return
+
+        self.station.setText(User_Inputs.site_no)
+        self.author.setText(User_Inputs.author)
+        self.start_date.setDate(User_Inputs.start_date.date())
+        self.end_date.setDate(User_Inputs.end_date.date())
+
+        # The snapshot's quality tables replace the current ones
+        User_Inputs.gh_tables_list.clear()
+        User_Inputs.q_tables_list.clear()
+        User_Inputs.successfulSubmissionCnt += 1
+        self.submit_button.successfulSubmissionSignal.emit()
+
+        for tables, tables_rows in ((User_Inputs.gh_tables_list, manifest["gh_quality_rows"]), (User_Inputs.q_tables_list, manifest["q_quality_rows"])):
+            for table, rows in zip(tables, tables_rows):
+                # Rows suggested from coverage give way to the snapshot's own rows
+                table.clear_entries()
+                for period_start, period_end, quality, comment in rows:
+                    table.add_entry_with_values(date.fromisoformat(period_start), date.fromisoformat(period_end), quality, comment)
+
+    def refresh_stale_data(self):
+        """
+        Pull what changed in AQ since the review's data was fetched (e.g. since
+        the snapshot was taken) and rebuild the tabs, keeping tables and notes.
+        """
+        if User_Inputs.site is None:
+            User_Inputs.critical_error_message("Error: Nothing to refresh, submit a site or open a snapshot first.")
+            return
+
+        if not User_Inputs.valid_connection():
+            return
+
+        try:
+            with API_Call_Ledger.scope("Refresh stale data") as ledger:
+                Snapshot.refresh_stale_timeseries()
+            logging.info(ledger.summary())
+        except API_Request_Error as e:
+            print(str(e))
+            User_Inputs.critical_error_message(f"Error: Request to AQ failed\n\n{e}\n\nCheck your connection and VPN.")
+            return
+
+        User_Inputs.successfulSubmissionCnt += 1
+        self.submit_button.successfulSubmissionSignal.emit()
+
+    def _setup_station_completer(self):
+        """
+        Attach the site autocomplete to the station field. Suggestions come from
+        the local metadata index, which is refreshed in the background if stale.
+        """
+        self.station_suggestions = QStringListModel()
+        self.station_completer = QCompleter(self.station_suggestions, self)
+        self.station_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.station_completer.activated[str].connect(self._select_suggested_station)
+        self.station.setCompleter(self.station_completer)
+        self.station.textEdited.connect(self._update_station_suggestions)
+        
+        try:
+            Metadata_Index.shared().refresh_stale_sources_in_background(User_Inputs.aq_session(), User_Inputs.sims_session or SynchronousSIMsAPISession)
+        except Exception as e:
+            logging.warning(f"Metadata index refresh not started: {e}")
+
+    def _update_station_suggestions(self, text):
+        matches = Metadata_Index.shared().search(text)
+        self.station_suggestions.setStringList([f"{site_no} - {name}" for site_no, name in matches])
+
+    def _select_suggested_station(self, suggestion):
+        # Keep only the site number of the chosen "site_no - name" suggestion
+        QtCore.QTimer.singleShot(0, lambda: self.station.setText(suggestion.split(" - ")[0]))
+
     def warn_about_changes(self):
         if User_Inputs.successfulSubmissionCnt == 1 and User_Inputs.changesWarningCnt == 0:
             User_Inputs.changesWarningCnt += 1
@@ -130,16 +257,29 @@ class SubmitButton(QPushButton):
         Helper method to attempt to retrieve the site data based on the user's input. Will throw
         an error message if the give a bad site number or if there's a connection issue. Will
         return True if site retrieval was successful and false if unsuccessful. Does not
-        count as successful submission for data yet (not until we know there's data).
+        count as successful submission for data yet (not until we know there's data). A
+        resubmission for the same site with new dates reuses the gathered site.
         """
         try:
-            SynchronousAquariusAPISession.login()
-            self.preliminary_users_record = Record.Record(User_Inputs.start_date, User_Inputs.end_date)
-            self.preliminary_users_site = SiteV3.Site(User_Inputs.site_no)
-            self.preliminary_users_site.gather_records_info_from_dates(User_Inputs.start_date, User_Inputs.end_date)
-            SynchronousAquariusAPISession.logout()
+            with API_Call_Ledger.scope("Submit") as ledger:
+                User_Inputs.aq_session().ensure_session()
+                self.preliminary_users_record = Record.Record(User_Inputs.start_date, User_Inputs.end_date)
+                if User_Inputs.site is not None and User_Inputs.site.site_no == User_Inputs.site_no:
+                    # Only the dates changed, move a working copy sharing the gathered water year datasets,
+                    # the live site is only replaced once _check_site accepts the new period
+                    self.preliminary_users_site = User_Inputs.site.working_copy()
+                    self.preliminary_users_site.refresh_records_info_for_dates(User_Inputs.start_date, User_Inputs.end_date)
+                else:
+                    self.preliminary_users_site = SiteV3.Site(User_Inputs.site_no, User_Inputs.api_session, User_Inputs.sims_session)
+                    self.preliminary_users_site.gather_records_info_from_dates(User_Inputs.start_date, User_Inputs.end_date)
+            logging.info(ledger.summary())
             return True
         
+        except API_Request_Error as e:
+            print(str(e), e.__traceback__)
+            User_Inputs.critical_error_message(f"Error: Request to AQ failed\n\n{e}\n\nCheck your connection and VPN.")
+            return False
+
         except Exception as e:
             print(str(e), e.__traceback__)
             if User_Inputs.valid_connection():
@@ -157,7 +297,7 @@ class SubmitButton(QPushButton):
         else:
             data_available = False
             for ts in self.preliminary_users_site.gage_height_timeseries_list:
-                if(len(ts.record_dataset.data) > 0):
+                if(ts.record_dataset.has_data()):
                     data_available = True
 
             if data_available == False:
@@ -1,9 +1,16 @@
 from API_Session_V3 import SynchronousAquariusAPISession, SynchronousSIMsAPISession
 from datetime import datetime, timedelta
+import copy
+import threading
+import time
 import Field_Visit
 import Timeseries
 import Rating
 from Sensor import Sensor
+from Shift_Engine import Shift_Engine
+from Metadata_Index import Metadata_Index
+from Task_Graph import Task_Graph
+from Tracing import traced
         
 class Site():
     
@@ -14,13 +21,22 @@ class Site():
     and a unique alphanumeric ID associated with it within Aquarius.
     """
     
-    def __init__(self, site_no: str, api_session: SynchronousAquariusAPISession = None) -> None:
+    # Stage parameters probed for a site's stage timeseries, the first with any timeseries wins
+    STAGE_PARAMETER_PRIORITY = ["Gage height", "Elevation, lake/res, NGVD29", "Elevation, lake/res, NAVD88"]
+    
+    # Stage timeseries discovered per site number with the time they were found, kept for STAGE_TIMESERIES_CACHE_TTL
+    STAGE_TIMESERIES_CACHE_TTL = 10 * 60 # seconds
+    _stage_timeseries_cache: dict[str: tuple] = {}
+    _stage_timeseries_cache_lock = threading.Lock()
+    
+    def __init__(self, site_no: str, api_session: SynchronousAquariusAPISession = None, sims_session: SynchronousSIMsAPISession = None) -> None:
         """
         Initialize the Site object.
 
         Args:
             site_no (str): The ID number of the site.
             api_session(SynchronousAquariusAPISession): The api_session, if provided, that connects to the NWIS family of web services
+            sims_session(SynchronousSIMsAPISession): The sims_session, if provided, that connects to SIMs
         """
         self.site_no = site_no
         self.site_name = ""
@@ -31,62 +47,145 @@ class Site():
         self.levels_description = ""
         self.ratings_description = ""
         self.api_session = api_session or SynchronousAquariusAPISession() # optional dependency injection
+        self.sims_session = sims_session or SynchronousSIMsAPISession()
+        # Injected sessions (e.g. a data bundle) get a private index so their metadata stays separate from AQ's
+        self.metadata_index = Metadata_Index.shared() if api_session is None else Metadata_Index(":memory:")
         self.field_visits = []
         self._gather_site_info()
         self.rating_info = ""
         self.sensors = []
     
-    def gather_records_info_from_dates(self, record_start_date, record_end_date):
+    @traced()
+    def gather_records_info_from_dates(self, record_start_date, record_end_date, progress_callback = None):
         """
         Method to gather information relevent to a record based on provided
-        dates.
+        dates. The steps run as a Task_Graph so that steps not depending on
+        each other (SIMs text, sensors, timeseries pulls) run concurrently.
         
         Args:
             record_start_date(datetime.date): Date of when the record begins
             record_end_date(datetime.date): Date of when the record ends
+            progress_callback(callable): Optional callback(task_name, state) reporting each step's progress
+        """
+        has_discharge = lambda: len(self.discharge_timeseries_list) > 0
+        
+        task_graph = Task_Graph(progress_callback=progress_callback)
+        task_graph.add_task("GH timeseries", lambda: self._gather_GH_TS_list(record_start_date, record_end_date))
+        task_graph.add_task("Sensors", lambda: self._gather_sensors_list(self.site_no))
+        task_graph.add_task("SIMs levels", self._gather_levels_description)
+        task_graph.add_task("Field visits", lambda: self._gather_field_visits(record_start_date, record_end_date), ["GH timeseries"])
+        task_graph.add_task("Q timeseries", lambda: self._gather_Q_TS_list(record_start_date, record_end_date))
+        task_graph.add_task("SIMs ratings", self._gather_ratings_description, ["Q timeseries"], when=has_discharge)
+        task_graph.add_task("Rating models", lambda: self._populate_rating_models(record_start_date, record_end_date), ["Q timeseries"], when=has_discharge)
+        task_graph.add_task("Qm backcheck", self._backcheck_qm_difference, ["Rating models", "Field visits"])
+        task_graph.run()
+
+    @traced()
+    def refresh_records_info_for_dates(self, record_start_date, record_end_date, progress_callback = None):
+        """
+        Method to move an already gathered site to new record dates without starting
+        over. The timeseries keep the water years already gathered and their extremes,
+        only the record dataset and newly covered water years are pulled. Field visits
+        and rating models depend on the dates and are gathered again; site info,
+        sensors and SIMs text are kept.
+
+        Args:
+            record_start_date(datetime.date): Date of when the record begins
+            record_end_date(datetime.date): Date of when the record ends
+            progress_callback(callable): Optional callback(task_name, state) reporting each step's progress
+        """
+        has_discharge = lambda: len(self.discharge_timeseries_list) > 0
+
+        task_graph = Task_Graph(progress_callback=progress_callback)
+        task_graph.add_task("GH timeseries", lambda: Site._refresh_timeseries_list(self.gage_height_timeseries_list, record_start_date, record_end_date))
+        task_graph.add_task("Field visits", lambda: self._gather_field_visits(record_start_date, record_end_date), ["GH timeseries"])
+        task_graph.add_task("Q timeseries", lambda: Site._refresh_timeseries_list(self.discharge_timeseries_list, record_start_date, record_end_date))
+        task_graph.add_task("Rating models", lambda: self._populate_rating_models(record_start_date, record_end_date), ["Q timeseries"], when=has_discharge)
+        task_graph.add_task("Qm backcheck", self._backcheck_qm_difference, ["Rating models", "Field visits"])
+        task_graph.run()
+
+    def working_copy(self):
+        """
+        Method to return a copy of the site that can be moved to new record dates
+        with refresh_records_info_for_dates without touching this one. The copy
+        has its own timeseries objects and visit list; the datasets, sensors and
+        SIMs text are shared until the copy replaces them.
+
+        Returns:
+            Site: The copy
         """
-        self._gather_GH_TS_list(record_start_date, record_end_date)
-        self._gather_sensors_list(self.site_no)
-        self._gather_levels_description()
-        self._gather_field_visits(record_start_date, record_end_date)
-        self._gather_Q_TS_list(record_start_date, record_end_date)
-        if len(self.discharge_timeseries_list) > 0:
-            self._gather_ratings_description()
-            self._populate_rating_models(record_start_date, record_end_date)
-            self._backcheck_qm_difference()
+        site = copy.copy(self)
+        site.gage_height_timeseries_list = [copy.copy(ts) for ts in self.gage_height_timeseries_list]
+        site.discharge_timeseries_list = [copy.copy(ts) for ts in self.discharge_timeseries_list]
+        site.field_visits = list(self.field_visits)
+        return site
+
+    @staticmethod
+    def _refresh_timeseries_list(timeseries_list: list, record_start_date, record_end_date) -> None:
+        """
+        Helper method to bring each timeseries' datasets to the record dates, keeping what was already gathered.
+        """
+        for ts in timeseries_list:
+            ts.refresh_datasets_for_records(record_start_date, record_end_date)
         
+    @traced()
     def _gather_site_info(self):
         """
         Gather the site's English name and unique ID
         """
-        site_info_tuple = SynchronousAquariusAPISession.get_site_info(self.site_no)
+        site_info_tuple = self.metadata_index.get_site_info(self.site_no, lambda: self.api_session.get_site_info(self.site_no))
         self.site_name = site_info_tuple[0]
         self.unique_id = site_info_tuple[1]
         
-    @staticmethod
-    def _populate_Aquarius_stage_timeseries_reponse(site_no: str):
+    @traced()
+    def _populate_Aquarius_stage_timeseries_reponse(self, site_no: str):
         """
         Helper method for retrieval of the AQ response list handling various
-        different paramter representations of stage (relative datum, NGVD88, etc.)
+        different paramter representations of stage (relative datum, NGVD88, etc.).
+        The parameters in STAGE_PARAMETER_PRIORITY are requested in order until one
+        has timeseries. A non-empty result is cached per site for
+        STAGE_TIMESERIES_CACHE_TTL when talking to AQ.
         
         Args:
             site_no (str): The ID number of the site.
         """
+        use_stage_cache = self.metadata_index is Metadata_Index.shared()
+        with Site._stage_timeseries_cache_lock:
+            cached = Site._stage_timeseries_cache.get(site_no) if use_stage_cache else None
+            if cached is not None and time.monotonic() - cached[0] < Site.STAGE_TIMESERIES_CACHE_TTL:
+                return cached[1]
         
-        GAGE_HEIGHT = "Gage height"
-        LAKE_NGVD29 = "Elevation, lake/res, NGVD29"
-        LAKE_NAVD88 = "Elevation, lake/res, NAVD88"
-        
-        list_of_AQ_TS_info = SynchronousAquariusAPISession.get_timeseries_list(site_no, GAGE_HEIGHT)
-        
-        if list_of_AQ_TS_info == []:
-            list_of_AQ_TS_info = SynchronousAquariusAPISession.get_timeseries_list(site_no, LAKE_NGVD29)
-            
-        elif list_of_AQ_TS_info == []:
-            list_of_AQ_TS_info = SynchronousAquariusAPISession.get_timeseries_list(site_no, LAKE_NAVD88)
+        # Probed on the calling task's thread, so they count against the graph's concurrency limit
+        list_of_AQ_TS_info = []
+        for parameter in Site.STAGE_PARAMETER_PRIORITY:
+            list_of_AQ_TS_info = self._cached_timeseries_list(site_no, parameter)
+            if list_of_AQ_TS_info != []:
+                break
         
+        # No stage timeseries may mean a bad site number or one not set up yet, asked again next time
+        if use_stage_cache and list_of_AQ_TS_info != []:
+            with Site._stage_timeseries_cache_lock:
+                Site._stage_timeseries_cache[site_no] = (time.monotonic(), list_of_AQ_TS_info)
         return list_of_AQ_TS_info    
+    
+    def _cached_timeseries_list(self, site_no: str, parameter: str):
+        """
+        Helper method to serve a site's timeseries list for a parameter from the
+        local metadata index, refreshed in the background once stale.
+        """
+        return self.metadata_index.cached_call("get_timeseries_list", f"{site_no}|{parameter}",
+                                               lambda: self.api_session.get_timeseries_list(site_no, parameter))
+    
+    @staticmethod
+    def clear_stage_timeseries_cache() -> None:
+        """
+        Forget the cached stage timeseries of every site, e.g. after timeseries
+        were added or removed in AQ.
+        """
+        with Site._stage_timeseries_cache_lock:
+            Site._stage_timeseries_cache = {}
 
+    @traced()
     def _gather_GH_TS_list(self, record_start_date, record_end_date):
             """
             Gather the site's gage height timeseries unique IDs, create their object representations, append to
@@ -97,18 +196,19 @@ class Site():
                 record_end_date(datetime.date): Date of when the record ends
             """
             
-            list_of_AQ_TS_info = Site._populate_Aquarius_stage_timeseries_reponse(self.site_no)
+            list_of_AQ_TS_info = self._populate_Aquarius_stage_timeseries_reponse(self.site_no)
             
             for timeseries in list_of_AQ_TS_info:
                 identifier = timeseries['Identifier']
                 unique_id = timeseries['UniqueId']
                 sublocation = timeseries['SubLocationIdentifier']
-                gs_ts_list_element = Timeseries.Generic_Timeseries(identifier, unique_id, sublocation)
+                gs_ts_list_element = Timeseries.Generic_Timeseries(identifier, unique_id, sublocation, self.api_session)
                 gs_ts_list_element.populate_datasets_for_records(record_start_date, record_end_date)
                 
                 self.gage_height_timeseries_list.append(gs_ts_list_element)
     
     
+    @traced()
     def _gather_Q_TS_list(self, record_start_date, record_end_date):
             """
             Gather the site's discharge timeseries unique IDs, create their object representations, append to
@@ -120,32 +220,34 @@ class Site():
             """
             
             DISCHARGE = "Discharge"
-            list_of_AQ_TS_info = SynchronousAquariusAPISession.get_timeseries_list(self.site_no, DISCHARGE)
+            list_of_AQ_TS_info = self._cached_timeseries_list(self.site_no, DISCHARGE)
             
             for timeseries in list_of_AQ_TS_info:
                 identifier = timeseries['Identifier']
                 unique_id = timeseries['UniqueId']
                 sublocation = timeseries['SubLocationIdentifier']
-                q_ts_list_element = Timeseries.Generic_Timeseries(identifier, unique_id, sublocation)
+                q_ts_list_element = Timeseries.Generic_Timeseries(identifier, unique_id, sublocation, self.api_session)
                 q_ts_list_element.populate_datasets_for_records(record_start_date, record_end_date)
                 
                 self.discharge_timeseries_list.append(q_ts_list_element)
                 
+    @traced()
     def _gather_levels_description(self) -> None:
         """
         Retrieve the levels description from the station description page on SIMs.
         Information can and should be edited on SIMs to match with what the analyzer
         wants.
         """
-        self.levels_description = SynchronousSIMsAPISession.get_sims_levels_info(self.site_no)
+        self.levels_description = self.sims_session.get_sims_levels_info(self.site_no)
 
+    @traced()
     def _gather_sensors_list(self, site_no: str)-> None:
          """
          Retrieve a list of published sensors on site. Sensors that are no longer available or in use
          must be removed from the sensors list in AQ.
          """
 
-         sensors_response = SynchronousAquariusAPISession.get_sensors(site_no)
+         sensors_response = self.metadata_index.cached_call("get_sensors", site_no, lambda: self.api_session.get_sensors(site_no))
          self.sensors = []
          for sensor in sensors_response["MonitoringMethods"]:
             if Site._has_sublocation(sensor):
@@ -171,6 +273,7 @@ class Site():
                 return True
         return False
 
+    @traced()
     def _gather_field_visits(self, record_start_date: datetime.date, record_end_date: datetime.date) -> None:
         """
         Method to gather a list of field visit objects. Information pertinent
@@ -186,12 +289,13 @@ class Site():
         self.field_visits = [] # clear the previous results
         for visit in field_visit_list['FieldVisitDescriptions']:
             visit_date = datetime.strptime(visit['StartTime'][0:10], "%Y-%m-%d")
-            visit_obj = Field_Visit.Field_Visit(visit['Identifier'], visit_date, visit['Party'])
+            visit_obj = Field_Visit.Field_Visit(visit['Identifier'], visit_date, visit['Party'], self.api_session)
             visit_obj.retrieve_records_related_data(self.gage_height_timeseries_list)
             if visit["CompletedWork"]["LevelsPerformed"] == True:
                 visit_obj.levels_performed = True
             self.field_visits.append(visit_obj)
           
+    @traced()
     def _populate_rating_models(self, record_start_date, record_end_date) -> None:
         """
         Method to retrieve the rating models based on a given date range. Each
@@ -208,11 +312,12 @@ class Site():
         rating_model_obj.retrieve_info_for_record(record_start_date, record_end_date)
         self.rating_model = rating_model_obj
 
+    @traced()
     def _backcheck_qm_difference(self) -> None:
         """
         Method to be used after a ratings have been populated to check the percent
         difference between discharge measurements and their respective base rating
-        at time of collection
+        at time of collection, then their shifted rating through Shift_Engine
         """
         for visit_obj in self.field_visits:
                 for qm in visit_obj.dischage_measurements:
@@ -223,11 +328,13 @@ class Site():
                         percent_difference_from_base_rating = 100
                     qm.rating_num_compared = self.rating_model.return_rating_curve_id_for_datetime(qm.qm_time)
                     qm.difference_from_base_rating = percent_difference_from_base_rating
+        Shift_Engine(self.rating_model.ratings_list).backcheck_measurements(self.field_visits)
     
+    @traced()
     def _gather_ratings_description(self) -> None:
         """
         Retrieve the levels description from the station description page on SIMs.
         Information can and should be edited on SIMs to match with what the analyzer
         wants.
         """
-        self.ratings_description = SynchronousSIMsAPISession.get_sims_rating_info(self.site_no)
\ No newline at end of file
+        self.ratings_description = self.sims_session.get_sims_rating_info(self.site_no)
\ No newline at end of file
@@ -0,0 +1,301 @@
+from API_Session_V3 import AquariusAPISession, SIMsAPISession, SynchronousAquariusAPISession, SynchronousSIMsAPISession
+from datetime import date, datetime, timedelta
+import io
+import json
+import zipfile
+import numpy as np
+from Compressed_Values import Compressed_Values
+import Dataset
+import Field_Visit
+from Metadata_Index import Metadata_Index
+import Rating
+import Reading
+import Record
+import Sensor
+import SiteV3
+import Timeseries
+from User_Inputs import User_Inputs
+
+
+class Snapshot():
+    """
+    Containerizing class to save the state of a review to disk and restore it
+    later without touching AQ. A snapshot is a zip holding:
+
+        manifest.json: format version, user inputs, notes, quality table rows
+            and the change token of each timeseries
+        site.json: the fetched Site, its timeseries, field visits, sensors and
+            rating model as plain JSON, see _Snapshot_Encoder
+        arrays.npz: every numpy array of the Site, e.g. the datasets' timestamps
+            and compressed unit values, referenced by name from site.json
+
+    Nothing is unpickled when loading: only the model classes listed in
+    _Snapshot_Encoder.CLASSES are rebuilt, from their attributes, and the
+    arrays are read with allow_pickle off.
+
+    API sessions and the metadata index are not stored; they are re-attached
+    when loading, so a restored Site talks to the live (or injected) sessions
+    on refresh.
+    """
+    # Version 1 snapshots were pickles and are no longer read
+    FORMAT_VERSION = 2
+    FILE_EXTENSION = ".arss"
+    FILE_FILTER = "ARS snapshot (*.arss)"
+    MANIFEST_NAME = "manifest.json"
+    SITE_NAME = "site.json"
+    ARRAYS_NAME = "arrays.npz"
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def save(file_path: str, gh_quality_rows: list, q_quality_rows: list) -> None:
+        """
+        Write the current review (User_Inputs and its Site) to a snapshot file.
+
+        Args:
+            file_path(str): Where the snapshot is written
+            gh_quality_rows(list[list]): The rows of each gage height quality table
+            q_quality_rows(list[list]): The rows of each discharge quality table
+        """
+        site = User_Inputs.site
+        manifest = {"format_version": Snapshot.FORMAT_VERSION,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "site_no": User_Inputs.site_no,
+                    "author": User_Inputs.author,
+                    "start_date": User_Inputs.start_date.isoformat(),
+                    "end_date": User_Inputs.end_date.isoformat(),
+                    "special_notes": User_Inputs.special_notes,
+                    "hydro_comp": User_Inputs.hydro_comp,
+                    "gh_quality_rows": gh_quality_rows,
+                    "q_quality_rows": q_quality_rows,
+                    "change_tokens": {ts.TS_unique_id: ts.change_token for ts in site.gage_height_timeseries_list + site.discharge_timeseries_list}}
+
+        encoder = _Snapshot_Encoder()
+        site_json = encoder.encode(site)
+        arrays_file = io.BytesIO()
+        np.savez_compressed(arrays_file, **encoder.arrays)
+
+        with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED) as snapshot_zip:
+            snapshot_zip.writestr(Snapshot.MANIFEST_NAME, json.dumps(manifest, indent=1))
+            snapshot_zip.writestr(Snapshot.SITE_NAME, json.dumps(site_json))
+            # Already compressed by numpy
+            snapshot_zip.writestr(Snapshot.ARRAYS_NAME, arrays_file.getvalue(), compress_type=zipfile.ZIP_STORED)
+
+    @staticmethod
+    def load(file_path: str, api_session: AquariusAPISession = None, sims_session: SIMsAPISession = None) -> dict:
+        """
+        Read a snapshot and restore User_Inputs from it. The Record is rebuilt
+        from the restored dates; no request is made to AQ or SIMs.
+
+        Args:
+            file_path(str): The snapshot to read
+            api_session(AquariusAPISession): The AQ session re-attached to the restored objects
+            sims_session(SIMsAPISession): The SIMs session re-attached to the restored objects
+
+        Returns:
+            dict: The snapshot's manifest, holding the quality table rows to restore into the UI
+        """
+        with zipfile.ZipFile(file_path, "r") as snapshot_zip:
+            manifest = json.loads(snapshot_zip.read(Snapshot.MANIFEST_NAME))
+            if manifest.get("format_version") != Snapshot.FORMAT_VERSION:
+                raise ValueError(f"Unsupported snapshot format version {manifest.get('format_version')}, expected {Snapshot.FORMAT_VERSION}")
+
+            site_json = json.loads(snapshot_zip.read(Snapshot.SITE_NAME))
+            with np.load(io.BytesIO(snapshot_zip.read(Snapshot.ARRAYS_NAME)), allow_pickle=False) as arrays:
+                decoder = _Snapshot_Decoder({name: arrays[name] for name in arrays.files},
+                                            api_session or SynchronousAquariusAPISession(),
+                                            sims_session or SynchronousSIMsAPISession(),
+                                            Metadata_Index.shared() if api_session is None else Metadata_Index(":memory:"))
+                site = decoder.decode(site_json)
+
+        User_Inputs.site_no = manifest["site_no"]
+        User_Inputs.author = manifest["author"]
+        User_Inputs.start_date = datetime.fromisoformat(manifest["start_date"])
+        User_Inputs.end_date = datetime.fromisoformat(manifest["end_date"])
+        User_Inputs.special_notes = manifest["special_notes"]
+        User_Inputs.hydro_comp = manifest["hydro_comp"]
+        User_Inputs.site = site
+        User_Inputs.record = Record.Record(User_Inputs.start_date, User_Inputs.end_date)
+
+        for ts in site.gage_height_timeseries_list + site.discharge_timeseries_list:
+            ts.change_token = manifest["change_tokens"].get(ts.TS_unique_id, ts.change_token)
+
+        return manifest
+
+    @staticmethod
+    def refresh_stale_timeseries() -> None:
+        """
+        Bring the restored timeseries up to date using AQ's change tracking, so
+        only the points changed since the snapshot was taken are pulled.
+        """
+        site = User_Inputs.site
+        for ts in site.gage_height_timeseries_list + site.discharge_timeseries_list:
+            ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
+
+
+class _Snapshot_Encoder():
+    """
+    Converts a Site's object graph to JSON-compatible values, collecting its
+    numpy arrays separately. Model objects are written as their class' stored
+    name and their attributes (__getstate__ when defined, so caches are left
+    out); an object reached again, e.g. a neighbouring Shift_Curve, is written
+    as a reference to its first occurrence. Anything else raises TypeError
+    rather than being stored in a form that could not be read back.
+    """
+    # Stored name of every class a snapshot may hold. Renaming a class only takes updating its entry here.
+    CLASSES = {"Site": SiteV3.Site,
+               "Generic_Timeseries": Timeseries.Generic_Timeseries,
+               "Dataset": Dataset.Dataset,
+               "Correction": Dataset.Correction,
+               "Multi_Point_Correction": Dataset.Multi_Point_Correction,
+               "Qualifier": Dataset.Qualifier,
+               "Gap_Tolerance": Dataset.Gap_Tolerance,
+               "Gap": Dataset.Gap,
+               "Data_Point": Dataset.Data_Point,
+               "Compressed_Values": Compressed_Values,
+               "Field_Visit": Field_Visit.Field_Visit,
+               "Discharge_Measurement": Field_Visit.Discharge_Measurement,
+               "Reading": Reading.Reading,
+               "Rating_Model": Rating.Rating_Model,
+               "Rating": Rating.Rating,
+               "Shift_Curve": Rating.Shift_Curve,
+               "Sensor": Sensor.Sensor}
+
+    def __init__(self) -> None:
+        self.arrays: dict[str: np.ndarray] = {}
+        self._class_names = {cls: name for name, cls in _Snapshot_Encoder.CLASSES.items()}
+        self._object_ids: dict[int: int] = {}
+        # Keeps the encoded objects alive so their ids are not reused during the walk
+        self._objects = []
+
+    def encode(self, value):
+        """
+        Convert a value and everything it refers to.
+
+        Args:
+            value: The Site, or any value within it
+
+        Returns:
+            The JSON-compatible value
+        """
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return self.encode(value.item())
+        if isinstance(value, datetime):
+            return {"__datetime__": value.isoformat()}
+        if isinstance(value, date):
+            return {"__date__": value.isoformat()}
+        if isinstance(value, timedelta):
+            return {"__timedelta__": value.total_seconds()}
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise TypeError("Arrays of Python objects cannot be stored in a snapshot")
+            name = f"array_{len(self.arrays)}"
+            self.arrays[name] = value
+            return {"__array__": name}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, tuple):
+            return {"__tuple__": [self.encode(item) for item in value]}
+        if isinstance(value, dict):
+            if all(isinstance(key, str) for key in value):
+                return {"__dict__": {key: self.encode(item) for key, item in value.items()}}
+            return {"__items__": [[self.encode(key), self.encode(item)] for key, item in value.items()]}
+        if isinstance(value, Metadata_Index):
+            return {"__session__": "metadata_index"}
+        # Sessions are used as classes (File_Aquarius_API_Session in --bundle mode) as well as instances
+        if isinstance(value, AquariusAPISession) or (isinstance(value, type) and issubclass(value, AquariusAPISession)):
+            return {"__session__": "aq_session"}
+        if isinstance(value, SIMsAPISession) or (isinstance(value, type) and issubclass(value, SIMsAPISession)):
+            return {"__session__": "sims_session"}
+        return self._encode_object(value)
+
+    def _encode_object(self, obj) -> dict:
+        """
+        Helper method to write a model object once and reference it afterwards.
+        """
+        if id(obj) in self._object_ids:
+            return {"__ref__": self._object_ids[id(obj)]}
+        class_name = self._class_names.get(type(obj))
+        if class_name is None:
+            raise TypeError(f"{type(obj).__name__} objects cannot be stored in a snapshot")
+
+        object_id = len(self._object_ids)
+        self._object_ids[id(obj)] = object_id
+        self._objects.append(obj)
+        state = obj.__getstate__() if getattr(type(obj), "__getstate__", None) is not getattr(object, "__getstate__", None) else obj.__dict__
+        return {"__object__": object_id, "class": class_name, "state": {key: self.encode(item) for key, item in state.items()}}
+
+
+class _Snapshot_Decoder():
+    """
+    Rebuilds a Site's object graph from _Snapshot_Encoder's output, re-attaching
+    the provided API sessions and index in place of the ones left out. Objects
+    are created without running their __init__ and given their stored
+    attributes, through __setstate__ when defined so older layouts migrate.
+
+    Args:
+        arrays(dict[str: np.ndarray]): The snapshot's arrays by name
+        api_session(AquariusAPISession): The AQ session to re-attach
+        sims_session(SIMsAPISession): The SIMs session to re-attach
+        metadata_index(Metadata_Index): The index to re-attach
+    """
+    def __init__(self, arrays: dict, api_session, sims_session, metadata_index) -> None:
+        self.arrays = arrays
+        self.sessions = {"aq_session": api_session, "sims_session": sims_session, "metadata_index": metadata_index}
+        self._objects: dict[int: object] = {}
+
+    def decode(self, value):
+        """
+        Convert a JSON-compatible value back.
+
+        Args:
+            value: The encoded value
+
+        Returns:
+            The restored value
+        """
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+        if "__timedelta__" in value:
+            return timedelta(seconds=value["__timedelta__"])
+        if "__array__" in value:
+            return self.arrays[value["__array__"]]
+        if "__tuple__" in value:
+            return tuple(self.decode(item) for item in value["__tuple__"])
+        if "__dict__" in value:
+            return {key: self.decode(item) for key, item in value["__dict__"].items()}
+        if "__items__" in value:
+            return {self.decode(key): self.decode(item) for key, item in value["__items__"]}
+        if "__session__" in value:
+            return self.sessions[value["__session__"]]
+        if "__ref__" in value:
+            return self._objects[value["__ref__"]]
+        if "__object__" in value:
+            return self._decode_object(value)
+        raise ValueError(f"Unrecognized snapshot value with keys {sorted(value)}")
+
+    def _decode_object(self, value: dict):
+        """
+        Helper method to rebuild a model object. It is registered before its
+        attributes are decoded so references back to it resolve.
+        """
+        cls = _Snapshot_Encoder.CLASSES.get(value["class"])
+        if cls is None:
+            raise ValueError(f"Unknown class {value['class']} in snapshot")
+        obj = cls.__new__(cls)
+        self._objects[value["__object__"]] = obj
+        state = {key: self.decode(item) for key, item in value["state"].items()}
+        if getattr(cls, "__setstate__", None) is not None:
+            obj.__setstate__(state)
+        else:
+            obj.__dict__.update(state)
+        return obj
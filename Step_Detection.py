@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+import numpy as np
+from Interval_Set import Interval_Set
+
+
+class Step():
+    """
+    A step change between two consecutive unit values.
+
+    Args:
+        before_datetime(datetime): Datetime of the unit value before the step
+        datetime(datetime): Datetime of the unit value after the step
+        magnitude(float): Value after minus value before
+        scale(float): Robust scale of the first differences around the step
+    """
+    def __init__(self, before_datetime: datetime, datetime: datetime, magnitude: float, scale: float) -> None:
+        self.before_datetime = before_datetime
+        self.datetime = datetime
+        self.magnitude = magnitude
+        self.scale = scale
+        self.field_visit = None
+        self.reset_amount = None
+
+    @property
+    def explained(self) -> bool:
+        """
+        Whether the step matches a reset recorded during the visit it occurred on.
+        """
+        return self.reset_amount is not None
+
+
+class Step_Detection():
+    """
+    Step changes in a gage height dataset's unit values, such as recorder resets.
+    A step is a first difference between consecutive unit values (missing
+    values and the dataset's gaps skipped) of at least MIN_STEP that departs
+    from the median of the differences around it by at least STEP_SCALES times
+    their rolling robust scale, 1.4826 times
+    their median absolute deviation within SCALE_WINDOW on either side. Steady
+    rises and falls move the median and noisy stretches raise the scale, so
+    only jumps out of line with the surrounding record stand out. The scale is
+    kept at least MIN_SCALE, unit values being recorded in hundredths.
+
+    Args:
+        dataset(Dataset.Dataset): The gathered dataset, with its gaps assessed
+    """
+    SCALE_WINDOW = timedelta(hours=12)
+    STEP_SCALES = 6.0
+    MIN_STEP = 0.03
+    MIN_SCALE = 0.005
+    # A step and a recorded reset this close in magnitude are considered the same
+    RESET_MATCH_TOLERANCE = 0.02
+    MAD_TO_STANDARD_DEVIATION = 1.4826
+
+    def __init__(self, dataset) -> None:
+        self.dataset = dataset
+        self.steps: list[Step] = []
+        if dataset.has_data():
+            self.steps = self._detect()
+
+    def _detect(self) -> list:
+        """
+        Helper method to find the steps. Only differences of at least MIN_STEP are
+        candidates, the rolling scale is computed for those in one gathered window matrix.
+        """
+        values = self.dataset.values
+        present = ~np.isnan(values)
+        times = self.dataset.timestamps[present]
+        values = values[present]
+        if len(values) < 3:
+            return []
+
+        differences = np.diff(values)
+        # Unit values are gathered without gap markers, the change across a gap is not a step
+        if len(self.dataset.gaps) > 0:
+            midpoints = times[:-1] + (times[1:] - times[:-1]) // 2
+            differences[Interval_Set.from_periods(self.dataset.gaps).locate(midpoints) >= 0] = np.nan
+        candidates = np.flatnonzero(np.abs(differences) >= Step_Detection.MIN_STEP - 1e-9)
+        if len(candidates) == 0:
+            return []
+
+        spacing = float(np.median(np.diff(times).astype(np.int64)))
+        half = max(1, int(round(Step_Detection.SCALE_WINDOW.total_seconds() / max(spacing, 1.0))))
+        # Window of differences around each candidate, padded with NaN past the ends and without the candidate itself
+        offsets = np.concatenate((np.arange(-half, 0), np.arange(1, half + 1)))
+        padded = np.concatenate((np.full(half, np.nan), differences, np.full(half, np.nan)))
+        windows = padded[candidates[:, None] + half + offsets]
+        medians = np.nanmedian(windows, axis=1)
+        scales = np.maximum(Step_Detection.MAD_TO_STANDARD_DEVIATION * np.nanmedian(np.abs(windows - medians[:, None]), axis=1), Step_Detection.MIN_SCALE)
+
+        stands_out = np.abs(differences[candidates] - medians) >= Step_Detection.STEP_SCALES * scales - 1e-9
+        steps = []
+        for index, scale in zip(candidates[stands_out].tolist(), scales[stands_out].tolist()):
+            steps.append(Step(times[index].astype(object), times[index + 1].astype(object), round(float(differences[index]), 3), scale))
+        return steps
+
+    def match_resets(self, field_visit_list: list) -> list:
+        """
+        Assign the steps occurring on a visit's day to the visit and match them
+        with the visit's recorded reset amounts, each reset matching at most one step.
+
+        Args:
+            field_visit_list(list[Field_Visit.Field_Visit]): List of field visits during record period
+
+        Returns:
+            list[tuple(Field_Visit, float)]: The recorded resets no step matched
+        """
+        unmatched_resets = []
+        for field_visit in field_visit_list:
+            visit_start = field_visit.date
+            visit_end = field_visit.date + timedelta(days=1)
+            visit_steps = [step for step in self.steps if visit_start <= step.datetime and step.before_datetime <= visit_end]
+            for step in visit_steps:
+                step.field_visit = field_visit
+
+            for reset_amount in (field_visit.reset_amount or []):
+                open_steps = [step for step in visit_steps if step.reset_amount is None and abs(step.magnitude - reset_amount) <= Step_Detection.RESET_MATCH_TOLERANCE + 1e-9]
+                if len(open_steps) == 0:
+                    unmatched_resets.append((field_visit, reset_amount))
+                    continue
+                closest = min(open_steps, key=lambda step: abs(step.magnitude - reset_amount))
+                closest.reset_amount = reset_amount
+        return unmatched_resets
+
+    def unexplained_steps(self) -> list:
+        """
+        The steps not matched to a recorded reset, after match_resets.
+        """
+        return [step for step in self.steps if not step.explained]
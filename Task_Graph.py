@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from os import environ
+import logging
+import threading
+
+
+class Task():
+    """
+    Class representing one step of a Task_Graph.
+
+    Args:
+        name(str): Unique name of the task, used for inputs and progress reports
+        func(callable): Zero-argument callable doing the work, its return value is the task's result
+        inputs(list[str]): Names of the tasks that must finish before this one starts
+        when(callable): Optional zero-argument check made once the inputs are done, the task is skipped if it returns False
+    """
+    def __init__(self, name: str, func, inputs: list = (), when = None) -> None:
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.when = when
+
+
+class Task_Graph():
+    """
+    Small dependency graph executor. Tasks declare the tasks they depend on and
+    every task whose inputs are done is started right away, so independent AQ
+    and SIMs pulls overlap while dependent steps still wait for their data.
+
+    A task is skipped when its `when` check is False or one of its inputs was
+    skipped. If a task fails no new tasks are started, the running ones are
+    allowed to finish, and the first error is re-raised from run().
+
+    At most MAX_CONCURRENCY tasks run at once across every graph in the process,
+    so graphs run side by side share the limit. A task must not run a graph of
+    its own, it would wait on slots held by its parent.
+
+    Args:
+        max_concurrency(int): Worker threads of this graph, defaults to MAX_CONCURRENCY
+        progress_callback(callable): Optional callback(task_name, state) called on every state change.
+        Called from worker threads, so GUI callers must forward it through a signal.
+    """
+    # Global limit on concurrently running tasks, kept low to stay polite to AQ and SIMs
+    MAX_CONCURRENCY = int(environ.get("ARS_MAX_CONCURRENCY", "4"))
+    _running_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+    def __init__(self, max_concurrency: int = None, progress_callback = None) -> None:
+        self.max_concurrency = max_concurrency or Task_Graph.MAX_CONCURRENCY
+        self.progress_callback = progress_callback
+        self._tasks: dict[str: Task] = {}
+        self.states: dict[str: str] = {}
+        self.results: dict = {}
+
+    def add_task(self, name: str, func, inputs: list = (), when = None) -> Task:
+        """
+        Add a task to the graph. Inputs must already be in the graph, which
+        keeps the graph acyclic and the insertion order topological.
+
+        Args:
+            name(str): Unique name of the task
+            func(callable): Zero-argument callable doing the work
+            inputs(list[str]): Names of the tasks this one depends on
+            when(callable): Optional zero-argument check deciding whether the task runs at all
+
+        Returns:
+            Task: The added task
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task '{name}' is already in the graph")
+        for input_name in inputs:
+            if input_name not in self._tasks:
+                raise ValueError(f"Task '{name}' depends on unknown task '{input_name}'")
+
+        task = Task(name, func, inputs, when)
+        self._tasks[name] = task
+        self.states[name] = Task_Graph.PENDING
+        return task
+
+    def run(self) -> dict:
+        """
+        Run every task of the graph, each as soon as its inputs are done.
+
+        Returns:
+            dict: The result of each task that ran, by task name
+        """
+        first_error = None
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="ars-task") as pool:
+            while True:
+                if first_error is None:
+                    for task in self._ready_tasks():
+                        self._set_state(task.name, Task_Graph.RUNNING)
+                        running[pool.submit(Task_Graph._run_task, task)] = task
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        self.results[task.name] = future.result()
+                        self._set_state(task.name, Task_Graph.DONE)
+                    except Exception as e:
+                        self._set_state(task.name, Task_Graph.FAILED)
+                        first_error = first_error or e
+
+        if first_error is not None:
+            raise first_error
+        return self.results
+
+    @staticmethod
+    def _run_task(task: Task):
+        """
+        Helper method to run a task's func while holding one of the process wide running slots.
+        """
+        with Task_Graph._running_slots:
+            return task.func()
+
+    def _ready_tasks(self) -> list:
+        """
+        Helper method to find the pending tasks whose inputs are all done,
+        marking tasks skipped along the way. Tasks are visited in insertion
+        (topological) order so skips propagate in a single pass.
+        """
+        ready = []
+        for task in self._tasks.values():
+            if self.states[task.name] != Task_Graph.PENDING:
+                continue
+
+            input_states = [self.states[input_name] for input_name in task.inputs]
+            if Task_Graph.SKIPPED in input_states:
+                self._set_state(task.name, Task_Graph.SKIPPED)
+            elif all(state == Task_Graph.DONE for state in input_states):
+                if task.when is not None and not task.when():
+                    self._set_state(task.name, Task_Graph.SKIPPED)
+                else:
+                    ready.append(task)
+        return ready
+
+    def _set_state(self, name: str, state: str) -> None:
+        self.states[name] = state
+        logging.info(f"Task {name}: {state}")
+        if self.progress_callback is not None:
+            self.progress_callback(name, state)
@@ -26,6 +26,16 @@ class Generic_Timeseries():
         self.record_dataset: Dataset.Dataset = None
         self.water_year_datasets: dict[str: Dataset.Dataset] = {}
         self.api_session = api_session or SynchronousAquariusAPISession()
+        # ChangesSinceToken for the next refresh, taken from the last pull
+        self.change_token = None
+    
+    @property
+    def location_identifier(self) -> str:
+        """
+        The AQ location identifier (site number) the timeseries belongs to, taken
+        from the identifier's "Parameter.Label@Location" form.
+        """
+        return self.TS_identifier.split("@")[-1]
     
     def populate_datasets_for_records(self, record_start_date, record_end_date) -> None:
         """
@@ -37,7 +47,65 @@ class Generic_Timeseries():
             record_end_date(datetime.date): The starting date of the record being made
         """
         self._gather_record_period_dataset(record_start_date, record_end_date)
+        self.water_year_datasets = {}
         self._gather_water_year_dataset_list(record_start_date, record_end_date)
+        self.change_token = self.record_dataset.change_token
+    
+    def refresh_datasets_for_records(self, record_start_date, record_end_date) -> None:
+        """
+        Bring the record and water year datasets up to date, asking AQ what changed
+        since the last pull and only re-pulling the changed span of points. When the
+        record dates changed only the record dataset and newly covered water years
+        are pulled, water years already gathered are kept. Falls back to a full
+        populate when no change token is known or AQ reports the token as expired.
+        
+        Args:
+            record_start_date(datetime.date): The starting date of the record being made
+            record_end_date(datetime.date): The starting date of the record being made
+        """
+        same_record_period = (self.record_dataset is not None
+                              and self.record_dataset.dataset_start_date == record_start_date
+                              and self.record_dataset.dataset_end_date == record_end_date)
+        if self.record_dataset is None or self.change_token is None:
+            self.populate_datasets_for_records(record_start_date, record_end_date)
+            return
+        
+        changes = self.api_session.get_timeseries_changes_since(self.location_identifier, self.change_token)
+        if changes.get("TokenExpired", False):
+            self.populate_datasets_for_records(record_start_date, record_end_date)
+            return
+        
+        for changed_ts in changes.get("TimeSeriesUniqueIds", []):
+            if changed_ts.get("UniqueId") == self.TS_unique_id and changed_ts.get("FirstPointChanged"):
+                first_point_changed = datetime.strptime(changed_ts["FirstPointChanged"][0:19], "%Y-%m-%dT%H:%M:%S")
+                if same_record_period:
+                    self.record_dataset.refresh(first_point_changed)
+                for WY_dataset in self.water_year_datasets.values():
+                    WY_dataset.refresh(first_point_changed)
+        
+        if not same_record_period:
+            self._gather_record_period_dataset(record_start_date, record_end_date)
+            self._gather_water_year_dataset_list(record_start_date, record_end_date)
+        
+        self.change_token = changes.get("NextToken") or self.change_token
+    
+    def extremes_between(self, window_start: datetime, window_end: datetime) -> tuple:
+        """
+        Find the maximum and minimum unit values within a window from the datasets
+        already gathered, preferring a water year dataset covering the window over
+        the record dataset. Nothing is pulled from AQ.
+        
+        Args:
+            window_start(datetime): Start of the window, inclusive
+            window_end(datetime): End of the window, inclusive
+        
+        Returns:
+            tuple(Dataset.Data_Point, Dataset.Data_Point): The max and min points, (None, None) if no gathered dataset covers the window
+        """
+        for dataset in list(self.water_year_datasets.values()) + [self.record_dataset]:
+            if dataset is not None and dataset.dataset_start_date <= window_start and window_end <= dataset.dataset_end_date:
+                return dataset.extremes_between(window_start, window_end)
+        return None, None
         
     def _gather_record_period_dataset(self, record_start_date: datetime.date, record_end_date: datetime.date) -> None:
         """
@@ -92,6 +160,7 @@ class Generic_Timeseries():
         """
         Gather the datasets for all water years that the provided Record object encompasses.
         A list of datasets encompassing the bounds of each water year will be assigned to the Gage_Height_Timeseries object.
+        Water years already gathered are kept as is and water years outside the record are dropped.
 
         Args:
             record_start_date(datetime.date): The record's start date
@@ -103,8 +172,10 @@ class Generic_Timeseries():
         record_starting_water_year = Generic_Timeseries._determine_water_year_by_date(record_start_date)
         record_ending_water_year = Generic_Timeseries._determine_water_year_by_date(record_end_date)
         
-        # For each water year the record encompass, gather data, append to list of WY datasets
+        # For each water year the record encompass, gather data if not already gathered, append to list of WY datasets
+        water_year_datasets = {}
         for water_year in range(record_starting_water_year, record_ending_water_year + 1):
-            WY_dataset = self._populate_wy_dataset_by_year(water_year)
-            self.water_year_datasets[str(water_year)] = WY_dataset
+            WY_dataset = self.water_year_datasets.get(str(water_year)) or self._populate_wy_dataset_by_year(water_year)
+            water_year_datasets[str(water_year)] = WY_dataset
+        self.water_year_datasets = water_year_datasets
  
\ No newline at end of file
@@ -0,0 +1,210 @@
+import json
+import math
+from array import array
+import numpy as np
+
+
+class Decoded_Timeseries():
+    """
+    Class object holding a timeseries response decoded into typed arrays rather
+    than a tree of dictionaries.
+
+    Args:
+        timestamps(numpy.ndarray): datetime64[s] time of each point, AQ's UTC offset dropped
+        values(numpy.ndarray): float64 value of each point, NaN for gap markers and EMPTY values
+        qualifiers(list[dict]): The response's qualifier entries
+        num_points(int): The response's NumPoints
+        raw_response(str): The raw payload, only kept when requested
+        response_time(str): AQ's ResponseTime, usable as a ChangesSinceToken
+    """
+    def __init__(self, timestamps, values, qualifiers, num_points: int, raw_response: str = None, response_time: str = None) -> None:
+        self.timestamps = timestamps
+        self.values = values
+        self.qualifiers = qualifiers
+        self.num_points = num_points
+        self.raw_response = raw_response
+        self.response_time = response_time
+
+
+class Timeseries_Stream_Decoder():
+    """
+    Incremental decoder for AQ's GetTimeSeriesCorrectedData responses. The
+    top-level object is walked key by key; each entry of the Points array is
+    decoded on its own and appended straight into typed arrays, so the whole
+    response is never held as nested dictionaries. Other keys (Qualifiers,
+    NumPoints, ...) are small and decoded normally.
+
+    Args:
+        keep_raw(bool): Whether to keep the raw payload, for debugging
+    """
+    POINTS = "Points"
+    EMPTY = "EMPTY"
+    BATCH_SIZE = 20000 # timestamps are parsed by numpy a batch at a time
+    COMPACT_SIZE = 1 << 20 # drop consumed text once this many characters are behind the cursor
+
+    def __init__(self, keep_raw: bool = False) -> None:
+        self.keep_raw = keep_raw
+        self._json_decoder = json.JSONDecoder()
+
+    def decode(self, source) -> Decoded_Timeseries:
+        """
+        Decode a timeseries response.
+
+        Args:
+            source: The response as a str/bytes, an iterable of str/bytes chunks
+            (e.g. a streamed HTTP body or a file), or an already parsed dict
+
+        Returns:
+            Decoded_Timeseries: The points as typed arrays plus the small metadata
+        """
+        if isinstance(source, dict):
+            return self._decode_parsed_response(source)
+        if isinstance(source, (str, bytes)):
+            source = [source]
+
+        self._chunks = iter(source)
+        self._buffer = ""
+        self._pos = 0
+        self._exhausted = False
+        self._raw_chunks = [] if self.keep_raw else None
+        self._time_batches = []
+        self._time_batch = []
+        self._values = array("d")
+        fields = {}
+
+        self._skip_whitespace()
+        self._expect("{")
+        while True:
+            self._skip_whitespace()
+            if self._peek() == "}":
+                self._pos += 1
+                break
+            key = self._decode_value()
+            self._skip_whitespace()
+            self._expect(":")
+            self._skip_whitespace()
+            if key == Timeseries_Stream_Decoder.POINTS:
+                self._decode_points()
+            else:
+                fields[key] = self._decode_value()
+            self._skip_whitespace()
+            if self._peek() == ",":
+                self._pos += 1
+
+        raw_response = "".join(self._raw_chunks) if self.keep_raw else None
+        timestamps = self._finish_timestamps()
+        values = np.frombuffer(self._values, dtype=np.float64).copy()
+        self._buffer = ""
+        return Decoded_Timeseries(timestamps, values, fields.get("Qualifiers", []), fields.get("NumPoints", len(values)), raw_response, fields.get("ResponseTime"))
+
+    def _decode_parsed_response(self, response: dict) -> Decoded_Timeseries:
+        """
+        Helper method to convert a response that was already parsed into a dict.
+        """
+        self._time_batches = []
+        self._time_batch = []
+        self._values = array("d")
+        for point in response.get(Timeseries_Stream_Decoder.POINTS, []):
+            self._append_point(point)
+        timestamps = self._finish_timestamps()
+        values = np.frombuffer(self._values, dtype=np.float64).copy()
+        raw_response = json.dumps(response) if self.keep_raw else None
+        return Decoded_Timeseries(timestamps, values, response.get("Qualifiers", []), response.get("NumPoints", len(values)), raw_response, response.get("ResponseTime"))
+
+    def _decode_points(self) -> None:
+        """
+        Helper method to decode the Points array one entry at a time.
+        """
+        self._expect("[")
+        while True:
+            self._skip_whitespace()
+            if self._peek() == "]":
+                self._pos += 1
+                return
+            self._append_point(self._decode_value())
+            self._skip_whitespace()
+            if self._peek() == ",":
+                self._pos += 1
+            self._compact()
+
+    def _append_point(self, point: dict) -> None:
+        value = point["Value"]
+        numeric = value.get("Numeric", Timeseries_Stream_Decoder.EMPTY) if len(value) > 0 else Timeseries_Stream_Decoder.EMPTY
+        self._values.append(math.nan if numeric == Timeseries_Stream_Decoder.EMPTY else float(numeric))
+        self._time_batch.append(point["Timestamp"][0:19])
+        if len(self._time_batch) >= Timeseries_Stream_Decoder.BATCH_SIZE:
+            self._flush_time_batch()
+
+    def _flush_time_batch(self) -> None:
+        if self._time_batch:
+            self._time_batches.append(np.array(self._time_batch, dtype="datetime64[s]"))
+            self._time_batch = []
+
+    def _finish_timestamps(self):
+        self._flush_time_batch()
+        if not self._time_batches:
+            return np.array([], dtype="datetime64[s]")
+        timestamps = np.concatenate(self._time_batches)
+        self._time_batches = []
+        return timestamps
+
+    def _fill(self) -> bool:
+        """
+        Helper method to append the next chunk to the buffer.
+
+        Returns:
+            bool: False once the source is exhausted
+        """
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            return False
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8")
+        if self.keep_raw:
+            self._raw_chunks.append(chunk)
+        self._buffer += chunk
+        return True
+
+    def _compact(self) -> None:
+        if self._pos > Timeseries_Stream_Decoder.COMPACT_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def _peek(self) -> str:
+        while self._pos >= len(self._buffer):
+            if not self._fill():
+                raise ValueError("Unexpected end of timeseries response")
+        return self._buffer[self._pos]
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _expect(self, character: str) -> None:
+        if self._peek() != character:
+            raise ValueError(f"Expected '{character}' at offset {self._pos} of timeseries response")
+        self._pos += 1
+
+    def _decode_value(self):
+        """
+        Helper method to decode one JSON value at the cursor, pulling more
+        chunks while the value is incomplete. A value ending exactly at the
+        end of the buffer (e.g. a number) is re-read once more text arrives.
+        """
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
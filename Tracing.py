@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+
+class Tracer():
+    """
+    Containerizing class holding the timing spans recorded while ARS fetches
+    data from AQ/SIMs and renders the record. Spans are kept in memory and can
+    be exported as a Chrome trace (chrome://tracing or https://ui.perfetto.dev)
+    or summarized as text.
+
+    Tracing is off unless the ARS_TRACE environment variable is set to 1 or
+    Tracer.enable() is called at runtime. While off, a span costs a single
+    attribute lookup.
+    """
+
+    enabled = os.environ.get("ARS_TRACE") == "1"
+    API_CATEGORY = "api"
+    STAGE_CATEGORY = "stage"
+
+    _events = []
+    _lock = threading.Lock()
+    _epoch = time.perf_counter()
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def enable(cls) -> None:
+        """
+        Turn span recording on. Previously recorded spans are kept.
+        """
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls) -> None:
+        """
+        Turn span recording off. Previously recorded spans are kept.
+        """
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Discard all recorded spans.
+        """
+        with cls._lock:
+            cls._events = []
+            cls._epoch = time.perf_counter()
+
+    @classmethod
+    def span(cls, name: str, category: str = STAGE_CATEGORY, **span_args):
+        """
+        Return a context manager timing the enclosed block as a single span.
+
+        Args:
+            name(str): The name of the stage shown in the trace viewer
+            category(str): The span category, e.g. "stage" or "api"
+            span_args: Any extra key/values to attach to the span
+
+        Returns:
+            _Span: A context manager; a shared no-op one when tracing is off
+        """
+        if not cls.enabled:
+            return _NULL_SPAN
+        return _Span(name, category, span_args)
+
+    @classmethod
+    def _record(cls, event: dict) -> None:
+        with cls._lock:
+            cls._events.append(event)
+
+    @classmethod
+    def events(cls) -> list:
+        """
+        Return a copy of the recorded Chrome trace events.
+        """
+        with cls._lock:
+            return list(cls._events)
+
+    @classmethod
+    def export_chrome_trace(cls, file_path: str) -> None:
+        """
+        Write the recorded spans to a Chrome trace event JSON file.
+
+        Args:
+            file_path(str): Where the trace file is written
+        """
+        trace = {"traceEvents": cls.events(), "displayTimeUnit": "ms"}
+        with open(file_path, "w") as trace_file:
+            json.dump(trace, trace_file)
+
+    @classmethod
+    def summary(cls, top: int = 20) -> str:
+        """
+        Build a plain text summary of the recorded spans: the stages with the
+        most total wall time followed by the API call counts and bytes
+        transferred per endpoint.
+
+        Args:
+            top(int): The number of stages to list
+
+        Returns:
+            str: The formatted summary
+        """
+        stage_totals = {}
+        api_totals = {}
+
+        for event in cls.events():
+            duration_ms = event["dur"] / 1000
+            count, total_ms, max_ms = stage_totals.get(event["name"], (0, 0.0, 0.0))
+            stage_totals[event["name"]] = (count + 1, total_ms + duration_ms, max(max_ms, duration_ms))
+
+            if event["cat"] == cls.API_CATEGORY:
+                endpoint = event["args"].get("api_type", event["name"])
+                calls, total_bytes, api_ms = api_totals.get(endpoint, (0, 0, 0.0))
+                api_totals[endpoint] = (calls + 1, total_bytes + event["args"].get("bytes", 0), api_ms + duration_ms)
+
+        lines = [f"Top {top} stages by wall time", f"{'Stage':<60}{'Calls':>8}{'Total ms':>12}{'Max ms':>12}"]
+        ranked_stages = sorted(stage_totals.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (count, total_ms, max_ms) in ranked_stages[:top]:
+            lines.append(f"{name:<60}{count:>8}{total_ms:>12.1f}{max_ms:>12.1f}")
+
+        lines.append("")
+        lines.append("API calls by endpoint")
+        lines.append(f"{'Endpoint':<60}{'Calls':>8}{'Bytes':>14}{'Total ms':>12}")
+        ranked_endpoints = sorted(api_totals.items(), key=lambda item: item[1][0], reverse=True)
+        for endpoint, (calls, total_bytes, api_ms) in ranked_endpoints:
+            lines.append(f"{endpoint:<60}{calls:>8}{total_bytes:>14}{api_ms:>12.1f}")
+
+        return "\n".join(lines)
+
+
+class _Span():
+    """
+    Context manager recording one complete ("X") Chrome trace event.
+    """
+    def __init__(self, name: str, category: str, span_args: dict):
+        self.name = name
+        self.category = category
+        self.args = span_args
+        self.start = None
+
+    def set(self, **span_args) -> None:
+        """
+        Attach extra key/values to the span, e.g. the number of bytes received.
+        """
+        self.args.update(span_args)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        Tracer._record({"name": self.name,
+                        "cat": self.category,
+                        "ph": "X",
+                        "ts": (self.start - Tracer._epoch) * 1e6,
+                        "dur": (end - self.start) * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                        "args": self.args})
+        return False
+
+
+class _Null_Span():
+    """
+    Shared do-nothing span handed out while tracing is off.
+    """
+    def set(self, **span_args) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _Null_Span()
+
+
+def traced(name: str = None, category: str = Tracer.STAGE_CATEGORY):
+    """
+    Decorator wrapping a function or method call in a span. When tracing is
+    off the wrapped function is called straight through.
+
+    Args:
+        name(str): The span name, defaults to the function's qualified name
+        category(str): The span category
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Tracer.enabled:
+                return func(*args, **kwargs)
+            with Tracer.span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -22,6 +22,9 @@ class User_Inputs():
     changesWarningCnt = 0
     backup_tables = []
     size_policy = None
+    # Session classes used instead of the live AQ/SIMs ones, e.g. the file-backed sessions of a data bundle
+    api_session = None
+    sims_session = None
     
     def __init__(self):
         pass
@@ -54,6 +57,13 @@ class User_Inputs():
         warning_box.setText(msg)
         warning_box.exec_()
     
+    @classmethod
+    def aq_session(cls):
+        """
+        Return the AQ session in use, the live one unless a data bundle was opened.
+        """
+        return cls.api_session or SynchronousAquariusAPISession
+
     @classmethod
     def valid_connection(cls):
         """
@@ -63,16 +73,11 @@ class User_Inputs():
             bool: true for good connection
         """
         try:
-            response = SynchronousAquariusAPISession.login()  # Capture the response
+            # Authenticates once for the application's lifetime, later checks reuse the live token
+            response = cls.aq_session().ensure_session()  # Capture the response
             if int(response) >= 400:  # Check for error status codes
                 cls.critical_error_message(response.text)  # Display error message
                 return False
-
-            else:
-                response = SynchronousAquariusAPISession.logout()  # Capture the response
-                if int(response) >= 400:  # Check for error status codes
-                    cls.critical_error_message(response.text)  # Display error message
-                    return False
         
         except Exception as e:
             print(str(e))
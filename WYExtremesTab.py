@@ -28,10 +28,10 @@ class WYTab(Generic_Tab):
     @staticmethod
     def _update_water_year_datasets():
         for gh_ts in User_Inputs.site.gage_height_timeseries_list:
-            gh_ts._gather_water_year_dataset_list(User_Inputs.start_date, User_Inputs.end_date)
+            gh_ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
         
         for q_ts in User_Inputs.site.discharge_timeseries_list:
-            q_ts._gather_water_year_dataset_list(User_Inputs.start_date, User_Inputs.end_date)
+            q_ts.refresh_datasets_for_records(User_Inputs.start_date, User_Inputs.end_date)
 
     def setup_record_ui(self):
         """
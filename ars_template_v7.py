@@ -6,6 +6,16 @@ from GHTab import GHTab
 from QTab import QTab
 from WYExtremesTab import WYTab
 from QRatingTab import QRatingTab
+from Tracing import Tracer
+from API_Session_V3 import SynchronousAquariusAPISession
+from Metadata_Index import Metadata_Index
+from File_API_Session import File_Aquarius_API_Session, File_SIMs_API_Session
+from User_Inputs import User_Inputs
+
+TRACE_FLAG = "--trace"
+TRACE_FILE = "ars_trace.json"
+TRACE_SUMMARY_FILE = "ars_trace_summary.txt"
+BUNDLE_FLAG = "--bundle"
 
 class ARSApplication(QMainWindow):
     def __init__(self):
@@ -77,8 +87,35 @@ class ARSApplication(QMainWindow):
         self.setCentralWidget(central_widget)
         central_widget.setLayout(layout)
 
+def export_trace():
+    """
+    Write the recorded timing spans to a Chrome trace file and a text summary
+    if tracing was switched on during the session.
+    """
+    if Tracer.events():
+        Tracer.export_chrome_trace(TRACE_FILE)
+        with open(TRACE_SUMMARY_FILE, "w") as summary_file:
+            summary_file.write(Tracer.summary())
+
 def main():
+    if TRACE_FLAG in sys.argv:
+        sys.argv.remove(TRACE_FLAG)
+        Tracer.enable()
+    
+    if BUNDLE_FLAG in sys.argv:
+        # Serve AQ and SIMs from an exported data bundle, e.g. on an air-gapped machine
+        bundle_flag_index = sys.argv.index(BUNDLE_FLAG)
+        bundle_dir = sys.argv[bundle_flag_index + 1]
+        del sys.argv[bundle_flag_index:bundle_flag_index + 2]
+        File_Aquarius_API_Session.use_bundle(bundle_dir)
+        File_SIMs_API_Session.use_bundle(bundle_dir)
+        User_Inputs.api_session = File_Aquarius_API_Session
+        User_Inputs.sims_session = File_SIMs_API_Session
+    
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(export_trace)
+    app.aboutToQuit.connect(SynchronousAquariusAPISession.close)
+    app.aboutToQuit.connect(lambda: Metadata_Index.shared().close())
     window = ARSApplication()
     window.show()
     sys.exit(app.exec_())
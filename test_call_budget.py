@@ -0,0 +1,224 @@
+"""
+Call budget of a Submit, checked against a fake AQ/SIMs pair serving one
+site-year of hourly stage and discharge with 20 field visits, each with a
+discharge measurement. Every fake getter makes one request through
+_make_aq_request/_make_sims_request, as the live sessions do, so the
+API_Call_Ledger counts exactly what a Submit would send.
+
+Run with: python -m pytest -q test_call_budget.py
+"""
+
+import json
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("PyQt5")  # Field_Visit reaches the Qt message boxes through User_Inputs
+
+from API_Session_V3 import AquariusAPISession, SIMsAPISession, API_Call_Ledger
+import SiteV3
+
+
+SITE_NO = "01234567"
+RECORD_START = datetime(2022, 10, 1)
+RECORD_END = datetime(2023, 9, 30, 23, 59, 59)
+VISIT_COUNT = 20
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.0000000-05:00"
+
+# One site-year with 20 visits: site info (1), the gage height and discharge
+# timeseries listed (2), per timeseries the record and water year datasets with their
+# corrected data, full coverage and corrections (2 x 2 x 3), field visits (1),
+# visit data (20), sensors (1), ratings list and model (2), base rating
+# outputs (20) and the 2 SIMs pages.
+SUBMIT_CALL_BUDGET = 61
+
+
+def _points_response(query_from: datetime, query_to: datetime) -> str:
+    """
+    Helper method to build an hourly GetTimeSeriesCorrectedData response between two datetimes.
+    """
+    points = []
+    point_time = query_from.replace(minute=0, second=0)
+    while point_time <= query_to:
+        points.append({"Timestamp": point_time.strftime(TIMESTAMP_FORMAT), "Value": {"Numeric": 2.0 + (point_time.hour % 12) / 10.0}})
+        point_time += timedelta(hours=1)
+    return json.dumps({"NumPoints": len(points), "Points": points, "Qualifiers": [], "ResponseTime": "2023-10-01T00:00:00.0000000Z"})
+
+
+def _visit_time(visit_number: int) -> datetime:
+    return RECORD_START + timedelta(days=18 * visit_number, hours=10)
+
+
+class Fake_Aquarius_Session(AquariusAPISession):
+    """
+    AquariusAPISession answering every request with a canned response for the test site.
+    """
+    TIMESERIES = {"Gage height": [{"Identifier": f"Gage height.ft@{SITE_NO}", "UniqueId": "gh-1", "SubLocationIdentifier": ""}],
+                  "Discharge": [{"Identifier": f"Discharge.ft^3/s@{SITE_NO}", "UniqueId": "q-1", "SubLocationIdentifier": ""}]}
+
+    @classmethod
+    def configure_logging(cls):
+        pass
+
+    @classmethod
+    def login(cls) -> int:
+        return 200
+
+    @classmethod
+    def logout(cls) -> int:
+        return 200
+
+    @classmethod
+    def _make_aq_request(cls, rest_type: str, api_type: str, params):
+        if api_type == "GetLocationData":
+            return {"LocationName": "Test Creek near Testville", "UniqueId": "location-1"}
+        if api_type == "GetTimeSeriesDescriptionList":
+            return {"TimeSeriesDescriptions": Fake_Aquarius_Session.TIMESERIES.get(params["Parameter"], [])}
+        if api_type in ("GetTimeSeriesCorrectedData", "GetTimeSeriesRawData"):
+            return _points_response(datetime.fromisoformat(params["QueryFrom"]), datetime.fromisoformat(params["QueryTo"]))
+        if api_type == "GetTimeSeriesUniqueIdList":
+            return {"TimeSeriesUniqueIds": [], "NextToken": "2023-10-01T00:00:00.0000000Z", "TokenExpired": False}
+        if api_type == "GetCorrectionList":
+            return {"Corrections": []}
+        if api_type == "GetFieldVisitDescriptionList":
+            return {"FieldVisitDescriptions": [{"Identifier": f"visit-{visit_number}", "StartTime": _visit_time(visit_number).strftime(TIMESTAMP_FORMAT),
+                                                "Party": "MHG", "CompletedWork": {"LevelsPerformed": False}} for visit_number in range(VISIT_COUNT)]}
+        if api_type == "GetFieldVisitData":
+            visit_time = _visit_time(int(params["FieldVisitIdentifier"].split("-")[1])).strftime(TIMESTAMP_FORMAT)
+            return {"InspectionActivity": {"Inspections": [],
+                                           "Readings": [{"Parameter": "Gage height", "MonitoringMethod": "Reference Point", "ReadingType": "Routine",
+                                                         "Time": visit_time, "Value": {"Numeric": 2.5}}]},
+                    "DischargeActivities": [{"DischargeSummary": {"MeasurementId": "1", "MeasurementTime": visit_time, "DischargeMethod": "Midsection",
+                                                                  "MeanGageHeight": {"Numeric": 2.5}, "DifferenceDuringVisit": {},
+                                                                  "Discharge": {"Numeric": 25.0}, "MeasurementGrade": "Good", "Comments": ""}}],
+                    "ControlConditionActivity": {"ControlCode": "Clear", "ControlCondition": "Clear", "DistanceToGage": {}}}
+        if api_type == "GetSensorsAndGages":
+            return {"MonitoringMethods": []}
+        if api_type == "GetRatingModelDescriptionList":
+            return {"RatingModelDescriptions": [{"Identifier": f"Gage height-Discharge.STGQ@{SITE_NO}"}]}
+        if api_type == "GetRatingCurveList":
+            return {"RatingCurves": [{"Id": "1.0", "Remarks": "", "Type": "LogarithmicTable", "Shifts": [],
+                                      "PeriodsOfApplicability": [{"StartTime": "2020-10-01T00:00:00", "EndTime": "9999-12-31T00:00:00"}],
+                                      "BaseRatingTable": [{"InputValue": 1.0, "OutputValue": 1.0}, {"InputValue": 5.0, "OutputValue": 100.0}]}]}
+        if api_type == "GetRatingModelOutputValues":
+            return {"OutputValues": [25.0]}
+        raise KeyError(f"No canned response for {api_type}")
+
+    @classmethod
+    def get_site_info(cls, site_no: str):
+        response = cls._make_aq_request(cls.GET, "GetLocationData", {"LocationIdentifier": site_no})
+        return response["LocationName"], response["UniqueId"]
+
+    @classmethod
+    def get_gage_height_timeseries_list(cls, site_no: str):
+        return cls.get_timeseries_list(site_no, "Gage height")
+
+    @classmethod
+    def get_timeseries_list(cls, site_no: str, parameter: str):
+        return cls._make_aq_request(cls.GET, "GetTimeSeriesDescriptionList", {"LocationIdentifier": site_no, "Parameter": parameter})["TimeSeriesDescriptions"]
+
+    @classmethod
+    def get_timeseries_data(cls, ts_unique_id: str, query_from, query_to) -> str:
+        return "".join(cls.stream_timeseries_data(ts_unique_id, query_from, query_to))
+
+    @classmethod
+    def get_gh_corrections_list(cls, ts_unique_id: str, query_from, query_to) -> str:
+        return cls._make_aq_request(cls.GET, "GetCorrectionList", {"TimeSeriesUniqueId": ts_unique_id})
+
+    @classmethod
+    def get_field_visits(cls, site_no: str, query_from, query_to) -> str:
+        return cls._make_aq_request(cls.GET, "GetFieldVisitDescriptionList", {"LocationIdentifier": site_no})
+
+    @classmethod
+    def get_field_visit_data(cls, field_visit_id: str) -> str:
+        return cls._make_aq_request(cls.GET, "GetFieldVisitData", {"FieldVisitIdentifier": field_visit_id})
+
+    @classmethod
+    def get_sensors(cls, site_no: str) -> str:
+        return cls._make_aq_request(cls.GET, "GetSensorsAndGages", {"LocationIdentifier": site_no})
+
+    @classmethod
+    def get_discharge_ratings_list(cls, site_no: str) -> str:
+        return cls._make_aq_request(cls.GET, "GetRatingModelDescriptionList", {"LocationIdentifier": site_no})
+
+    @classmethod
+    def get_discharge_rating_model_info(cls, rating_model_id: str, query_from = "", query_to = "") -> str:
+        return cls._make_aq_request(cls.GET, "GetRatingCurveList", {"RatingModelIdentifier": rating_model_id})
+
+    @classmethod
+    def get_discharge_rating_base_output_by_gh(cls, rating_model_id: str, gage_height: float, datetime) -> str:
+        return cls._make_aq_request(cls.GET, "GetRatingModelOutputValues", {"RatingModelIdentifier": rating_model_id, "InputValues": gage_height})
+
+
+class Fake_SIMs_Session(SIMsAPISession):
+    """
+    SIMsAPISession answering the station description pages with canned text.
+    """
+    @classmethod
+    def configure_logging(cls):
+        pass
+
+    @classmethod
+    def _make_sims_request(cls, api_type: str, params):
+        return f"{api_type} for {params.get('site_no', '')}"
+
+    @classmethod
+    def get_office_info_by_wsc(cls, wsc_id: int) -> str:
+        return cls._make_sims_request("GetOfficeInfo", {"wsc_id": wsc_id})
+
+    @classmethod
+    def get_sites_by_office(cls, wsc_id: int, office_id: int) -> str:
+        return cls._make_sims_request("GetSitesByOffice", {"wsc_id": wsc_id, "office_id": office_id})
+
+    @classmethod
+    def get_elements_by_site(cls, doc_type: str, site_no: str, agency_cd: str) -> str:
+        return cls._make_sims_request("GetElementsBySite", {"doc_type": doc_type, "site_no": site_no})
+
+    @classmethod
+    def get_sims_site_id(cls, site_no) -> str:
+        return cls._make_sims_request("GetSiteId", {"site_no": site_no})
+
+    @classmethod
+    def get_sims_levels_info(cls, site_no) -> str:
+        return cls._make_sims_request("GetLevelsInfo", {"site_no": site_no})
+
+    @classmethod
+    def get_sims_rating_info(cls, site_no) -> str:
+        return cls._make_sims_request("GetRatingInfo", {"site_no": site_no})
+
+
+def _submit() -> SiteV3.Site:
+    """
+    Helper method gathering the site as the Submit button does.
+    """
+    site = SiteV3.Site(SITE_NO, Fake_Aquarius_Session, Fake_SIMs_Session)
+    site.gather_records_info_from_dates(RECORD_START, RECORD_END)
+    return site
+
+
+def test_submit_of_one_site_year_stays_within_call_budget():
+    with API_Call_Ledger.expect_max_calls(SUBMIT_CALL_BUDGET, name="Submit"):
+        site = _submit()
+
+    assert len(site.field_visits) == VISIT_COUNT
+    assert site.gage_height_timeseries_list[0].record_dataset.has_data()
+
+
+def test_field_visit_data_is_requested_once_per_visit():
+    with API_Call_Ledger.expect_max_calls(VISIT_COUNT, "GetFieldVisitData", name="Submit"):
+        _submit()
+
+
+def test_date_change_reuses_gathered_water_years():
+    live_site = _submit()
+    site = live_site.working_copy()
+    with API_Call_Ledger.scope("Date change") as ledger:
+        site.refresh_records_info_for_dates(RECORD_START + timedelta(days=30), RECORD_END)
+
+    # Only the new record period is pulled, the water year dataset is kept
+    assert ledger.calls("GetTimeSeriesCorrectedData") <= 2 * len(site.gage_height_timeseries_list + site.discharge_timeseries_list)
+    assert ledger.calls("GetLocationData") == 0
+    assert ledger.calls("GetSensorsAndGages") == 0
+    assert site.gage_height_timeseries_list[0].water_year_datasets["2023"] is live_site.gage_height_timeseries_list[0].water_year_datasets["2023"]
+    # The submitted site stays at its dates until the moved copy is accepted
+    assert live_site.gage_height_timeseries_list[0].record_dataset.dataset_start_date == RECORD_START
+    assert site.gage_height_timeseries_list[0].record_dataset.dataset_start_date == RECORD_START + timedelta(days=30)